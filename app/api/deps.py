@@ -1,20 +1,20 @@
 from typing import Annotated
-from sqlalchemy import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi import Depends, status, HTTPException
+from fastapi import Depends, Request, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError    
 
 import logging
-import jwt
 
-from app.core.config.database.db import get_db
+from app.core.config.database.db import AsyncSessionLocal, get_async_db, get_db
 from app.core.config.config import settings
+from app.core.config.llm.llm import LLMRegistry
 from app.core import security
 from app.models.user import UserRole, User
 from app.exceptions.exceptions import AppBaseException, ResourceNotFoundException
-from app.crud.user import UserCRUD
+from app.services.sentiment_worker import SentimentWorkerPool
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +23,23 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 LoginFormData = Annotated[OAuth2PasswordRequestForm, Depends()]
 
-def get_current_user(token: TokenDep, db: SessionDep) -> User:
+def get_llm_registry(request: Request) -> LLMRegistry:
+    return request.app.state.llm_registry
+
+LLMRegistryDep = Annotated[LLMRegistry, Depends(get_llm_registry)]
+
+def get_sentiment_workers(request: Request) -> SentimentWorkerPool:
+    return request.app.state.sentiment_workers
+
+SentimentWorkersDep = Annotated[SentimentWorkerPool, Depends(get_sentiment_workers)]
+
+async def get_current_user(token: TokenDep) -> User:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        user_data = payload.get("sub")
-        user_id = user_data.split('=')[1].strip("'")
+        user_id = security.decode_access_token(token)
     except InvalidTokenError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -47,16 +54,25 @@ def get_current_user(token: TokenDep, db: SessionDep) -> User:
         logger.error(f"Error while decoding token: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error",
+            detail="Internal server error",
         )
     
+    # Skip the database for users authenticated within the principal TTL
+    user = security.get_cached_principal(user_id)
+    if user is not None:
+        return user
+    generation = security.principal_generation(user_id)
+
     try:
-        
-        user = db.get(User, user_id)
-        
+        # Use a session of its own rather than the request one so that the connection
+        # is released before the route runs, sync routes never touch the async pool again
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+
         if user is None:
             raise ResourceNotFoundException("User not found")
         
+        security.cache_principal(user, generation)
         return user
     except ResourceNotFoundException as e:
         raise HTTPException(
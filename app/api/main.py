@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import user, login, post, user_admin
+from app.api.routes import user, login, post, user_admin, metrics
 
 main_router = APIRouter()
 
@@ -7,4 +7,5 @@ main_router.include_router(user.router)
 main_router.include_router(login.router)
 main_router.include_router(post.router)
 
-main_router.include_router(user_admin.router, prefix="/backoffice")
\ No newline at end of file
+main_router.include_router(user_admin.router, prefix="/backoffice")
+main_router.include_router(metrics.router, prefix="/backoffice")
\ No newline at end of file
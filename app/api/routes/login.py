@@ -2,13 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.api.deps import LoginFormData
 from app.schemas.user import UserLoginResponse
-from app.services.login import LoginService
-from app.exceptions.exceptions import UnauthorizedException, AppBaseException, AppBaseException
+from app.services.login import AsyncLoginService
+from app.exceptions.exceptions import ServiceBusyException, UnauthorizedException, AppBaseException, AppBaseException
 
 router = APIRouter(prefix="/login", tags=["Login"])
 
 @router.post("/access-token", response_model=UserLoginResponse)
-async def login(login_data: LoginFormData, login_service: LoginService = Depends()):
+async def login(login_data: LoginFormData, login_service: AsyncLoginService = Depends()):
     """
     ## Authenticate a user and generate an access token.
 
@@ -20,6 +20,7 @@ async def login(login_data: LoginFormData, login_service: LoginService = Depends
 
     ### Raises:
     - **HTTPException**: If the username or password is incorrect.
+    - **HTTPException**: If too many logins are already waiting for password verification. Status code: `503`.
     - **HTTPException**: If there is a database error.
 
     ### Response Body:
@@ -27,11 +28,14 @@ async def login(login_data: LoginFormData, login_service: LoginService = Depends
     - **token_type** (`str`): The type of the token, which is "bearer".
     """
     try:
-        return login_service.login(login_data=login_data)
+        return await login_service.login(login_data=login_data)
     
     except UnauthorizedException as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     
+    except ServiceBusyException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    
     except AppBaseException as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
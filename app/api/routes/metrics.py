@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_admin
+from app.core.config.database.db import async_engine, engine
+from app.core.config.database.pool_metrics import async_pool_metrics, pool_metrics
+from app.core.config.llm.embedding_cache import embedding_cache
+from app.core.config.llm.limiter import llm_limiter
+from app.core.config.llm.stream_metrics import stream_metrics
+from app.core.singleflight import async_llm_single_flight, llm_single_flight
+from app.services.question_answer.answer_cache import answer_cache
+from app.services.question_answer.rewrite import question_rewriter
+
+router = APIRouter(prefix="/metrics", tags=["Admin Metrics"], dependencies=[Depends(get_current_admin)])
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """
+    ## Returns the database connection pool metrics.
+
+    ### Response Body:
+    - **pool_size** (`int`): The number of connections kept open.
+    - **max_overflow** (`int`): The number of extra connections allowed above the pool size.
+    - **checked_out** (`int`): The connections currently in use.
+    - **checked_in** (`int`): The idle connections.
+    - **overflow** (`int`): The overflow connections currently open.
+    - **saturation** (`float`): The share of the pool capacity in use, between 0 and 1.
+    - **max_checked_out** (`int`): The most connections in use at once since startup.
+    - **checkout_timeouts** (`int`): The checkouts that gave up after `DB_POOL_TIMEOUT` seconds.
+    - **checkout_wait_seconds** (`dict`): Cumulative histogram of the time spent waiting for a connection.
+    """
+    return pool_metrics.snapshot(engine.pool)
+
+
+@router.get("/db-async-pool")
+def get_db_async_pool_metrics():
+    """
+    ## Returns the connection pool metrics of the async engine used by the async routes.
+
+    ### Response Body:
+    Same fields as `/metrics/db-pool`.
+    """
+    return async_pool_metrics.snapshot(async_engine.pool)
+
+
+@router.get("/embeddings")
+def get_embedding_cache_metrics():
+    """
+    ## Returns the embedding cache metrics.
+
+    ### Response Body:
+    - **memory_hits** (`int`): Texts found in the in-process cache.
+    - **db_hits** (`int`): Texts found in the `embedding_cache` table.
+    - **misses** (`int`): Distinct texts sent to the embedding API.
+    - **hit_rate** (`float`): The share of lookups served by either tier, between 0 and 1.
+    - **memory_entries** (`int`): The embeddings held in memory.
+    - **memory_bytes** (`int`): The size of the embeddings held in memory.
+    - **memory_max_bytes** (`int`): The memory budget, `EMBEDDING_CACHE_MAX_BYTES`.
+    """
+    return embedding_cache.snapshot()
+
+
+@router.get("/qa-rewrites")
+def get_qa_rewrite_metrics():
+    """
+    ## Returns how often the rephrasing of follow-up questions was skipped.
+
+    ### Response Body:
+    - **rewrites** (`int`): Questions rewritten by the LLM.
+    - **skipped** (`dict`): Skipped rewrites by reason: `empty_history`, `standalone` or `cached`.
+    - **llm_calls_saved** (`int`): The total of skipped rewrites.
+    - **saved_ratio** (`float`): The share of questions answered without a rewrite, between 0 and 1.
+    - **average_rewrite_seconds** (`float`): The average latency of a rewrite call.
+    - **estimated_seconds_saved** (`float`): The skipped rewrites times the average rewrite latency.
+    """
+    return question_rewriter.snapshot()
+
+
+@router.get("/llm-streams")
+def get_llm_stream_metrics():
+    """
+    ## Returns the latency of the streamed LLM responses.
+
+    ### Response Body:
+    One entry per stream: `chat`, `summary` and `summary_cached` for summaries served from the cache. Each has:
+    - **time_to_first_token_seconds** (`dict`): Cumulative histogram of the time until the first token was sent.
+    - **total_seconds** (`dict`): Cumulative histogram of the time until the response was complete.
+    """
+    return stream_metrics.snapshot()
+
+
+@router.get("/llm-limiter")
+def get_llm_limiter_metrics():
+    """
+    ## Returns the state of the limiter of the async LLM calls.
+
+    ### Response Body:
+    - **max_concurrency** (`int`): The calls allowed in flight per provider, `LLM_MAX_CONCURRENCY`.
+    - **queue_timeout_seconds** (`float`): How long a call waits for a slot, `LLM_QUEUE_TIMEOUT_SECONDS`.
+    - **providers** (`dict`): Per provider, the calls `in_flight`, `waiting` for a slot and `rejected` with a 503.
+    - **queue_wait_seconds** (`dict`): Cumulative histogram of the time spent waiting for a slot.
+    """
+    return llm_limiter.snapshot()
+
+
+@router.get("/llm-single-flight")
+def get_llm_single_flight_metrics():
+    """
+    ## Returns how many identical concurrent LLM calls were coalesced.
+
+    ### Response Body:
+    - **sync** (`dict`): The background summaries computed in threads.
+    - **async** (`dict`): The summaries and suggestions of the async routes.
+
+    Each has the `calls` that reached the model, the `shared` calls that reused an in-flight call
+    and the calls currently `in_flight`.
+    """
+    return {"sync": llm_single_flight.snapshot(), "async": async_llm_single_flight.snapshot()}
+
+
+@router.get("/qa-answer-cache")
+def get_qa_answer_cache_metrics():
+    """
+    ## Returns the semantic answer cache metrics.
+
+    ### Response Body:
+    - **hits** (`int`): First-turn questions answered from the cache.
+    - **misses** (`int`): First-turn questions answered by the LLM.
+    - **hit_rate** (`float`): The share of first-turn questions answered from the cache, between 0 and 1.
+    - **posts** (`int`): The posts with cached answers.
+    - **threshold** (`float`): The minimum question similarity, `QA_ANSWER_CACHE_THRESHOLD`.
+    """
+    return answer_cache.snapshot()
@@ -1,18 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
 from uuid import UUID
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.api.deps import get_current_author, CurrentUser, get_current_user
-from app.exceptions.exceptions import AppBaseException, ForbiddenException, ResourceNotFoundException
-from app.schemas.post import PostCreate, PostListResponse, PostQARequest, PostQAResponse, PostResponse, PostSuggestionsRequest, PostSuggestionsResponse, PostSummaryResponse, PostUpdate
-from app.schemas.comment import CommentCreateRequest, CommentResponse, CommentResponseWithReplies
+from app.core.sse import SSE_HEADERS, sse_token_stream
+from app.exceptions.exceptions import AppBaseException, ForbiddenException, InvalidInputException, ResourceNotFoundException, ServiceBusyException
+from app.schemas.post import PostCreate, PostListPage, PostQARequest, PostQAResponse, PostResponse, PostSuggestionsRequest, PostSuggestionsResponse, PostSummaryResponse, PostUpdate
+from app.schemas.comment import CommentCreateRequest, CommentResponse, CommentThreadPage
 from app.services.comment import CommentService
-from app.services.post import PostService
-from app.services.question_answer.question_answer import QuestionAnswerService
-from app.services.suggestion import SuggestionService
-from app.services.summarization import SummarizationService
+from app.services.post import AsyncPostService, PostService
 
 router = APIRouter(prefix="/posts")
 
@@ -43,7 +41,7 @@ def create_post(post_data: PostCreate, author: CurrentUser, post_service: PostSe
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to fetch posts, please try again later or contact support")
 
 @router.get("/{post_id}", response_model=PostResponse, tags=["Public Post"])
-def get_post(post_id: UUID, post_service: PostService = Depends()):
+async def get_post(post_id: UUID, post_service: AsyncPostService = Depends()):
     """
     ## Fetches a post by ID.
 
@@ -66,18 +64,19 @@ def get_post(post_id: UUID, post_service: PostService = Depends()):
     - **author_id** (`uuid.UUID`): The ID of the author of the fetched post.
     """
     try:
-        return post_service.get_post(post_id=post_id)
+        return await post_service.get_post(post_id=post_id)
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to fetch post, please try again later or contact support")
 
 @router.put("/{post_id}", response_model=PostResponse, dependencies=[Depends(get_current_author)], tags=["Author"])
-def update_post(post_id: UUID, post_data: PostUpdate, post_service: PostService = Depends()):
+def update_post(post_id: UUID, post_data: PostUpdate, current_user: CurrentUser, post_service: PostService = Depends()):
     """
     ## Updates a post by ID.
 
     This route takes a post ID as a path parameter and a JSON body that contains the updated post data.
+    Authors can only update their own posts, published or not.
 
     ### Path Parameters:
     - **post_id** (`uuid.UUID`): The ID of the post to update.
@@ -97,10 +96,10 @@ def update_post(post_id: UUID, post_data: PostUpdate, post_service: PostService
     - **author_id** (`uuid.UUID`): The ID of the author of the updated post.
     """
     try:
-        return post_service.update_post(post_id=post_id, post_data=post_data)
+        return post_service.update_post(post_id=post_id, post_data=post_data, current_user=current_user)
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to update post, please try again later or contact support")
 
 @router.delete("/{post_id}", tags=["Author"], response_model=PostResponse)
@@ -126,28 +125,36 @@ def delete_post(post_id: UUID, current_user: CurrentUser, post_service: PostServ
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ForbiddenException as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to delete post, please try again later or contact support")
 
-@router.get("/", response_model=List[PostListResponse], tags=["Public Post"])
-def get_posts(post_service: PostService = Depends()):
+@router.get("/", response_model=PostListPage, tags=["Public Post"])
+async def get_posts(limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None, post_service: AsyncPostService = Depends()):
     """
-    ## Fetches all posts.
+    ## Fetches a page of published posts, newest first.
 
-    This route does not take any parameters.
+    ### Query Parameters:
+    - **limit** (`int`): The maximum number of posts to return, between 1 and 100. Defaults to 20.
+    - **cursor** (`Optional[str]`): The `next_cursor` returned with the previous page.
+
+    ### Raises:
+    - **HTTPException**: If the cursor is invalid.
 
     ### Response Body:
-    - **List[PostResponse]**: A list of all published posts.
+    - **items** (`List[PostListResponse]`): The published posts of this page.
         - **id** (`uuid.UUID`): The ID of the post.
         - **title** (`str`): The title of the post.
-        - **content** (`str`): The content of the post.
         - **tags_list** (`Optional[List[str]]`): The list of tags for the post.
         - **status** (`PostStatus`): The status of the post.
         - **author_id** (`uuid.UUID`): The ID of the author of the post.
+        - **author** (`UserResponse`): The author of the post.
+    - **next_cursor** (`Optional[str]`): The cursor of the next page, or `null` on the last page.
     """
     try:
-        return post_service.get_posts()
-    except AppBaseException as e:
+        return await post_service.get_posts(limit=limit, cursor=cursor)
+    except InvalidInputException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to fetch posts, please try again later or contact support")
 
 @router.post("/{post_id}/comments", response_model=CommentResponse, tags=["Comment"])
@@ -175,37 +182,55 @@ def create_comment(post_id: UUID, comment_data: CommentCreateRequest, current_us
     """
     try:
         return comment_service.create_comment(post_id=post_id, comment_data=comment_data, author=current_user)
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to add comment, please try again later or contact support")
 
-@router.get("/{post_id}/comments", response_model=List[CommentResponseWithReplies], tags=["Comment"], dependencies=[Depends(get_current_user)])
-def get_comments(post_id: UUID, comment_service: CommentService = Depends()):
+@router.get("/{post_id}/comments", response_model=CommentThreadPage, tags=["Comment"], dependencies=[Depends(get_current_user)])
+def get_comments(
+    post_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    depth: Optional[int] = Query(None, ge=0),
+    comment_service: CommentService = Depends(),
+):
     """
-    ## Fetches all comments on a post.
+    ## Fetches the comment threads of a post.
 
-    This route takes a post ID as a path parameter.
+    This route takes a post ID as a path parameter. Top-level comments are paginated, oldest first,
+    and each of them is returned with its nested replies.
 
     ### Path Parameters:
     - **post_id** (`uuid.UUID`): The ID of the post to fetch comments for.
 
+    ### Query Parameters:
+    - **limit** (`int`): The maximum number of top-level comments to return, between 1 and 100. Defaults to 20.
+    - **cursor** (`Optional[str]`): The `next_cursor` returned with the previous page.
+    - **depth** (`Optional[int]`): The deepest reply level to return, `0` for top-level comments only. Unlimited by default.
+
     ### Raises:
     - **HTTPException**: If the post ID is not a valid UUID.
     - **HTTPException**: If the post is not found.
+    - **HTTPException**: If the cursor is invalid.
 
     ### Response:
-    - **List[CommentResponse]**: A list of comments on the post.
+    - **items** (`List[CommentResponseWithReplies]`): The top-level comments of this page.
         - **id** (`uuid.UUID`): The ID of the comment.
         - **content** (`str`): The content of the comment.
         - **post_id** (`uuid.UUID`): The ID of the post the comment belongs to.
-        - **author_id** (`uuid.UUID`): The ID of the author of the comment.
+        - **commenter_id** (`uuid.UUID`): The ID of the author of the comment.
+        - **replies** (`List[CommentResponseWithReplies]`): The replies to the comment, nested the same way.
+    - **next_cursor** (`Optional[str]`): The cursor of the next page, or `null` on the last page.
     """
     try:
-        return comment_service.get_post_comments(post_id=post_id)
+        return comment_service.get_post_comments(post_id=post_id, limit=limit, cursor=cursor, max_depth=depth)
     
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     
-    except AppBaseException as e:
+    except InvalidInputException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to fetch comments, please try again later or contact support")
 
 @router.post("/comments/{comment_id}/reply", response_model=CommentResponse, tags=["Comment"])
@@ -239,7 +264,7 @@ def reply_to_comment(comment_id: UUID, comment_data: CommentCreateRequest, curre
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to reply to comment, please try again later or contact support")
 
 @router.delete("/comments/{comment_id}", tags=["Comment"])
@@ -268,7 +293,7 @@ def delete_comment(comment_id: UUID, current_user: CurrentUser, comment_service:
     except ForbiddenException as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to delete comment, please try again later or contact support")
 
 @router.put("/comments/{comment_id}", response_model=CommentResponse, tags=["Comment"])
@@ -304,11 +329,11 @@ def update_comment(comment_id: UUID, comment_data: CommentCreateRequest, current
     except ForbiddenException as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     
-    except AppBaseException as e:
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to update comment, please try again later or contact support")
 
 @router.get("/{post_id}/summarize", response_model=PostSummaryResponse, tags=["LLM"])
-def summarize_post(post_id: UUID, post_service: PostService = Depends()):
+async def summarize_post(post_id: UUID, post_service: AsyncPostService = Depends()):
     """
     ## Summarizes a post by ID.
 
@@ -321,16 +346,41 @@ def summarize_post(post_id: UUID, post_service: PostService = Depends()):
     - **summary** (`str`): The summary of the post.
     """
     try:
-        return post_service.summarize_post(post_id=post_id)
+        return await post_service.summarize_post(post_id=post_id)
     
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServiceBusyException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     
-    except AppBaseException as e:
+    except AppBaseException:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to summarize post, please try again later or contact support")
+
+@router.get("/{post_id}/summarize/stream", tags=["LLM"])
+async def summarize_post_stream(post_id: UUID, post_service: AsyncPostService = Depends()):
+    """
+    ## Summarizes a post by ID, streaming the summary as Server-Sent Events.
+
+    This route takes a post ID as a path parameter.
+
+    ### Path Parameters:
+    - **post_id** (`uuid.UUID`): The ID of the post to summarize.
+
+    ### Events:
+    - **token**: `{"text": str}`, the next part of the summary.
+    - **done**: `{}`, the summary is complete.
+    - **error**: `{"detail": str}`, the summary could not be completed.
+    """
+    try:
+        tokens = await post_service.stream_summary(post_id=post_id)
+    except ResourceNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to summarize post, please try again later or contact support")
+    return StreamingResponse(sse_token_stream(tokens), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.post("/{post_id}/chat", tags=["LLM"], response_model=PostQAResponse)
-def chat_with_post(post_id: UUID, question_data: PostQARequest, current_user: CurrentUser, post_service: PostService = Depends()):
+async def chat_with_post(post_id: UUID, question_data: PostQARequest, current_user: CurrentUser, post_service: AsyncPostService = Depends()):
     """
     ## Chats with a post by ID.
 
@@ -343,15 +393,44 @@ def chat_with_post(post_id: UUID, question_data: PostQARequest, current_user: Cu
     - **question** (`str`): The question to ask the post.
     """
     try:
-        return post_service.chat_with_post(post_id=post_id, question=question_data.question, current_user=current_user)
+        return await post_service.chat_with_post(post_id=post_id, question=question_data.question, current_user=current_user)
     
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    except AppBaseException as e:
+    except ServiceBusyException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    except AppBaseException:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to answer question, please try again later or contact support")
+
+@router.post("/{post_id}/chat/stream", tags=["LLM"])
+async def chat_with_post_stream(post_id: UUID, question_data: PostQARequest, current_user: CurrentUser, post_service: AsyncPostService = Depends()):
+    """
+    ## Chats with a post by ID, streaming the answer as Server-Sent Events.
+
+    This route takes a post ID as a path parameter and a JSON body that contains the question data.
+    The question and the answer are added to the chat history once the answer is complete.
+
+    ### Path Parameters:
+    - **post_id** (`uuid.UUID`): The ID of the post to chat with.
+
+    ### Request Body:
+    - **question** (`str`): The question to ask the post.
+
+    ### Events:
+    - **token**: `{"text": str}`, the next part of the answer.
+    - **done**: `{}`, the answer is complete.
+    - **error**: `{"detail": str}`, the answer could not be completed.
+    """
+    try:
+        tokens = await post_service.stream_chat_with_post(post_id=post_id, question=question_data.question, current_user=current_user)
+    except ResourceNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to answer question, please try again later or contact support")
+    return StreamingResponse(sse_token_stream(tokens), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.post("/suggest", response_model=PostSuggestionsResponse, dependencies=[Depends(get_current_author)], tags=["LLM"])
-def suggest_title_tags(question_data: PostSuggestionsRequest, current_user: CurrentUser, post_service: PostService = Depends()):
+async def suggest_title_tags(question_data: PostSuggestionsRequest, current_user: CurrentUser, post_service: AsyncPostService = Depends()):
     """
     ## Suggests a title and tags for a post.
 
@@ -365,7 +444,9 @@ def suggest_title_tags(question_data: PostSuggestionsRequest, current_user: Curr
     - **tags** (`List[str]`): The suggested tags for the post.
     """
     try:
-        return post_service.suggest_title_tags(content=question_data.content)
-    except AppBaseException as e:
+        return await post_service.suggest_title_tags(content=question_data.content)
+    except ServiceBusyException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to suggest post title and tags, please try again later or contact support")
     
\ No newline at end of file
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.api.deps import SessionDep, CurrentUser
+from app.api.deps import CurrentUser
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.crud import user as user_crud
-from app.services.user import UserService
-from app.exceptions.exceptions import ResourceNotFoundException, AppBaseException, ResourceAlreadyExistsException
+from app.services.user import AsyncUserService
+from app.exceptions.exceptions import ResourceNotFoundException, AppBaseException, ResourceAlreadyExistsException, ServiceBusyException
 
 router = APIRouter(prefix="/users", tags=["Reader"])
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(user_data: UserCreate, user_service: UserService = Depends()):
+async def create_user(user_data: UserCreate, user_service: AsyncUserService = Depends()):
     """
     ## Creates a new user.
 
@@ -25,6 +24,7 @@ async def create_user(user_data: UserCreate, user_service: UserService = Depends
 
     ### Raises:
     - **HTTPException**: If the email is already registered.
+    - **HTTPException**: If too many sign ups are already waiting for password hashing. Status code: `503`.
     - **HTTPException**: If there is a database error.
 
     ### Response Body:
@@ -37,11 +37,14 @@ async def create_user(user_data: UserCreate, user_service: UserService = Depends
     """
 
     try:
-        return user_service.create_user(user_data=user_data)
+        return await user_service.create_user(user_data=user_data)
     
     except ResourceAlreadyExistsException as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
+    except ServiceBusyException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    
     except AppBaseException:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Not able to create user. Please try again later or contact support.")
 
@@ -65,7 +68,7 @@ async def read_user_me(current_user: CurrentUser):
 
 
 @router.patch("/me", response_model=UserResponse)
-async def update_user(current_user: CurrentUser, update_data: UserUpdate, user_service: UserService = Depends()):
+async def update_user(current_user: CurrentUser, update_data: UserUpdate, user_service: AsyncUserService = Depends()):
     """
     ## Updates the current authenticated user.
 
@@ -88,7 +91,7 @@ async def update_user(current_user: CurrentUser, update_data: UserUpdate, user_s
     - **status** (`UserStatus`): The status of the updated user.
     """
     try:
-        return user_service.update_user(user=current_user, update_data=update_data)
+        return await user_service.update_user(user=current_user, update_data=update_data)
     
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -3,16 +3,16 @@ import uuid
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 
-from app.api.deps import SessionDep, CurrentUser, get_current_admin
+from app.api.deps import CurrentUser, get_current_admin
 from app.exceptions.exceptions import AppBaseException, ForbiddenException, ResourceAlreadyExistsException, ResourceNotFoundException
 from app.models.user import UserRole, UserStatus
 from app.schemas.user import UserResponse
-from app.services.user import UserService
+from app.services.user import AsyncUserService
 
 router = APIRouter(prefix="/users", tags=["Admin Users"])
 
 @router.patch("/{user_id}/activate", response_model=UserResponse, dependencies=[Depends(get_current_admin)])
-async def activate_user(curent_admin: CurrentUser, user_id: uuid.UUID, user_service: UserService = Depends()):
+async def activate_user(curent_admin: CurrentUser, user_id: uuid.UUID, user_service: AsyncUserService = Depends()):
     """
     ## Activates a user.
 
@@ -36,7 +36,7 @@ async def activate_user(curent_admin: CurrentUser, user_id: uuid.UUID, user_serv
     - **status** (`UserStatus`): The status of the activated user.
     """
     try:
-        user = user_service.activate_user(user_id, curent_admin)
+        user = await user_service.activate_user(user_id, curent_admin)
         return user
     except ResourceNotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -51,7 +51,7 @@ async def activate_user(curent_admin: CurrentUser, user_id: uuid.UUID, user_serv
 
 
 @router.get("/", response_model=List[UserResponse], dependencies=[Depends(get_current_admin)])
-async def get_all_users(user_service: UserService = Depends()):
+async def get_all_users(user_service: AsyncUserService = Depends()):
     """
     ## Retrieves all users.
 
@@ -67,7 +67,7 @@ async def get_all_users(user_service: UserService = Depends()):
         - **status** (`UserStatus`): The status of the user.
     """
     try:
-        users = user_service.get_users()
+        users = await user_service.get_users()
         return users
     except AppBaseException as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to get users, please try again later or contact support") from e
@@ -0,0 +1,148 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def hash_text(text: str) -> str:
+    """
+    Return the hex encoded sha256 digest of a text.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The sha256 hex digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    A small thread-safe least-recently-used cache, whose entries can optionally expire.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept in the cache.
+        ttl (Optional[float]): The default number of seconds an entry stays valid, or None to keep entries until evicted.
+        max_bytes (Optional[int]): The maximum total size of the values, measured with sizeof.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, max_bytes: Optional[int] = None, sizeof: Callable[[Any], int] = len):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries kept in the cache.
+            ttl (Optional[float]): The default number of seconds an entry stays valid.
+            max_bytes (Optional[int]): The maximum total size of the values, or None for no byte budget.
+            sizeof (Callable[[Any], int]): Returns the size of a value in bytes, used with max_bytes.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.current_bytes = 0
+        # key -> (expires_at, value, size), expires_at is a time.monotonic() deadline or None
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    def _remove(self, key: Hashable):
+        # Callers hold the lock
+        entry = self._data.pop(key)
+        self.current_bytes -= entry[2]
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the value stored for a key and mark it as recently used.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): The value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or the default.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            expires_at, value, _ = self._data[key]
+            if self._expired(expires_at):
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entries when the cache is full or over its byte budget.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+            ttl (Optional[float]): The number of seconds the entry stays valid, defaults to the cache ttl.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, value, size)
+            self.current_bytes += size
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self.current_bytes > self.max_bytes):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove a key from the cache.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): The value returned when the key is missing or expired.
+
+        Returns:
+            Any: The removed value, or the default.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            expires_at, value, _ = self._remove(key)
+            return default if self._expired(expires_at) else value
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key matches a predicate.
+
+        Args:
+            predicate (Callable[[Hashable], bool]): Returns True for the keys to remove.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data and not self._expired(self._data[key][0])
+
+    def __len__(self) -> int:
+        # Expired entries are counted until they are accessed or evicted
+        with self._lock:
+            return len(self._data)
@@ -20,9 +20,48 @@ class Settings(BaseSettings):
 
     GROQ_MODEL_NAME: str
     GROQ_API_KEY: str
+    # Async LLM calls in flight per provider, and how long a call waits for a slot before a 503
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 5
 
-    HUGGINGFACE_API_KEY: str
+    # Only needed by the huggingface_api embedding backend
+    HUGGINGFACE_API_KEY: str = ""
     HUGGINGFACE_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-l6-v2"
+    # huggingface_api calls the HuggingFace Inference API, local runs the model in-process on the CPU
+    # with sentence-transformers (pip install .[local-embeddings]). Posts are re-embedded when it changes.
+    EMBEDDING_BACKEND: str = "huggingface_api"
+    EMBEDDING_LOCAL_THREADS: int = 4
+    # Texts of concurrent requests embedded together, and how long a batch waits for more of them
+    EMBEDDING_LOCAL_BATCH_SIZE: int = 32
+    EMBEDDING_LOCAL_BATCH_WAIT_MS: float = 5
+    # Embeddings are cached in memory within this budget and in the embedding_cache table
+    EMBEDDING_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    EMBEDDING_CACHE_PERSIST: bool = True
+
+    # Number of post summaries kept in the in-process cache in front of the post_summaries table
+    SUMMARY_CACHE_SIZE: int = 1024
+    # Posts longer than this estimate are summarized section by section, then the section summaries are combined
+    SUMMARY_LONG_POST_TOKENS: int = 6000
+    # Section summaries generated at once, and summaries combined per reduce step
+    SUMMARY_MAP_CONCURRENCY: int = 4
+    SUMMARY_REDUCE_FAN_IN: int = 8
+    # Number of section and combined summaries kept, by hash of their input
+    SUMMARY_CHUNK_CACHE_SIZE: int = 4096
+
+    # Background sentiment analysis of comments
+    SENTIMENT_WORKERS: int = 2
+    SENTIMENT_QUEUE_SIZE: int = 1000
+    SENTIMENT_MAX_RETRIES: int = 3
+    SENTIMENT_RETRY_BACKOFF_SECONDS: float = 1.0
+    # How often unanalyzed comments are queued again, e.g. the ones dropped while the queue was full
+    SENTIMENT_RESCAN_INTERVAL_SECONDS: float = 60.0
+    # How long a worker owns the comments it claimed before another one may retry them
+    SENTIMENT_CLAIM_LEASE_SECONDS: float = 300.0
+    # Number of comments classified in a single prompt and parallel calls of the fallback path
+    SENTIMENT_BATCH_SIZE: int = 20
+    SENTIMENT_MAX_CONCURRENCY: int = 4
+    # SHOW or HIDE comments whose sentiment has not been analyzed yet
+    UNANALYZED_COMMENTS_POLICY: str = "SHOW"
 
     def __init__(self, **values):
         super().__init__(**values)
@@ -33,6 +72,54 @@ class Settings(BaseSettings):
     
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
 
+    # Threads hashing and verifying passwords off the event loop, and how many calls may wait for them
+    # before new logins and sign ups are turned away with a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # In-process caches of decoded access tokens and authenticated users. Users are invalidated when they
+    # change in this process, the TTL bounds how long other workers may serve a stale copy.
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_PRINCIPAL_TTL_SECONDS: float = 60
+
+    # QA chat sessions, one per user and post. Old turns beyond the token window are dropped,
+    # idle or least recently used sessions are evicted.
+    # memory keeps them in the worker process, sql in the chat_messages table shared by every worker
+    CHAT_HISTORY_BACKEND: str = "memory"
+    CHAT_HISTORY_MAX_TOKENS: int = 2000
+    # sql backend: turns read per question and kept by the compaction, which runs every interval
+    CHAT_HISTORY_MAX_TURNS: int = 10
+    CHAT_HISTORY_COMPACT_INTERVAL_SECONDS: float = 10 * 60
+    CHAT_MAX_SESSIONS: int = 10000
+    CHAT_SESSION_TTL_SECONDS: float = 60 * 60
+    CHAT_HISTORY_MAX_BYTES: int = 64 * 1024 * 1024
+    # Standalone rewrites of follow-up questions, cached by chat history and question
+    QA_REWRITE_CACHE_SIZE: int = 4096
+    QA_REWRITE_CACHE_TTL_SECONDS: float = 60 * 60
+    # Answers to first-turn questions reused for similar questions on the same post content
+    QA_ANSWER_CACHE_THRESHOLD: float = 0.92
+    QA_ANSWER_CACHE_MAX_POSTS: int = 1000
+    QA_ANSWER_CACHE_ENTRIES_PER_POST: int = 50
+
+    # Access log written by the LoggingMiddleware through a background thread
+    REQUEST_LOG_FILE: str = "request.log"
+    REQUEST_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    REQUEST_LOG_BACKUP_COUNT: int = 5
+    # Share of requests whose body is logged, and how many bytes of it
+    REQUEST_LOG_BODY_SAMPLE_RATE: float = 0.0
+    REQUEST_LOG_BODY_MAX_BYTES: int = 2048
+
+
+    # SQLAlchemy connection pool. Sync routes run in a threadpool of 40 threads, size the pool to match.
+    # The async engine gets a pool of the same size.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Used only when DATABASE_TYPE is SQLITE
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_DATABASE_PATH: str = "./test.db"
 
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
@@ -44,7 +131,7 @@ class Settings(BaseSettings):
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
         if self.DATABASE_TYPE == "SQLITE":
-            return "sqlite:///./test.db"
+            return f"sqlite:///{self.SQLITE_DATABASE_PATH}"
         return f"postgresql+psycopg://{quote_plus(self.POSTGRES_USER)}:{quote_plus(self.POSTGRES_PASSWORD)}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         # return PostgresDsn.build(
         #     scheme="postgresql+psycopg",
@@ -55,5 +142,13 @@ class Settings(BaseSettings):
         #     path=f"/{self.POSTGRES_DB}",
         # )
 
+    @computed_field
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        if self.DATABASE_TYPE == "SQLITE":
+            return f"sqlite+aiosqlite:///{self.SQLITE_DATABASE_PATH}"
+        # psycopg 3 serves both engines, create_async_engine picks its async connection class
+        return self.SQLALCHEMY_DATABASE_URI
+
 
 settings = Settings()
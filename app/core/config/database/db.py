@@ -1,21 +1,72 @@
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, with_loader_criteria
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, with_loader_criteria
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.models.base_model_mixin import BaseModelMixin
+from app.core.config.database.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
 
 from ..config import settings
 
 Base = declarative_base()
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, echo=False)
+IS_SQLITE = settings.DATABASE_TYPE == "SQLITE"
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    echo=False,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    # Pooled SQLite connections are handed to whichever threadpool thread serves the request
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+)
+
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    echo=False,
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run while a writer holds the database, busy_timeout waits for locks instead of failing
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+class SoftDeleteSession(Session):
+    """
+    Session class shared by the sync and async session factories so both exclude soft deleted records.
+    """
+
 
 # Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=SoftDeleteSession)
+
+# AsyncSession runs the ORM on a SoftDeleteSession underneath. Attributes are not expired on commit
+# since lazy loading them again is not possible outside of an await.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession, sync_session_class=SoftDeleteSession
+)
 
-# Function to attach to the do_orm_execute event of the SessionLocal
+# Function to attach to the do_orm_execute event of the SoftDeleteSession
 # This function will add a filter to the query to exclude soft deleted records
-@event.listens_for(SessionLocal, "do_orm_execute")
+@event.listens_for(SoftDeleteSession, "do_orm_execute")
 def _add_filtering_criteria(execute_state):
     skip_filter = execute_state.execution_options.get("skip_filter", False)
 
@@ -35,3 +86,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Function to get the async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
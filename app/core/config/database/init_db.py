@@ -11,6 +11,11 @@ from app.core.config.config import settings
 from app.models.user import User, UserRole
 from app.models.post import Post
 from app.models.comment import Comment
+from app.models.post_summary import PostSummary
+from app.models.post_index_status import PostIndexStatus
+from app.models.post_chunk import PostChunk
+from app.models.embedding_cache import EmbeddingCacheEntry
+from app.models.chat_message import ChatMessage
 
 from app.crud import user as user_crud
 from app.schemas.user import UserCreate
@@ -0,0 +1,125 @@
+import sys
+import os
+
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+
+from sqlalchemy import DateTime, Uuid, inspect, text
+from sqlalchemy.schema import AddConstraint
+
+from app.core.config.database.db import engine, Base
+
+from app.models.user import User
+from app.models.post import Post
+from app.models.comment import Comment
+from app.models.post_summary import PostSummary
+from app.models.post_index_status import PostIndexStatus
+from app.models.post_chunk import PostChunk
+from app.models.embedding_cache import EmbeddingCacheEntry
+from app.models.chat_message import ChatMessage
+
+
+def _uuid_columns(table):
+    return [column.name for column in table.columns if isinstance(column.type.dialect_impl(engine.dialect), Uuid)]
+
+
+def migrate_uuid_columns(connection):
+    """
+    Convert the id and foreign key columns created as varchar to native uuid columns on PostgreSQL.
+
+    Foreign keys are dropped first since PostgreSQL refuses to change the type of a referenced column,
+    and recreated from the model metadata once every column is converted.
+    """
+    inspector = inspect(connection)
+    pending = {}
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing_types = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+        columns = [name for name in _uuid_columns(table) if not isinstance(existing_types.get(name), Uuid)]
+        if columns:
+            pending[table] = columns
+
+    if not pending:
+        print("Id columns already use the uuid type")
+        return
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        for foreign_key in inspector.get_foreign_keys(table.name):
+            if foreign_key["name"]:
+                connection.execute(text(f'ALTER TABLE "{table.name}" DROP CONSTRAINT "{foreign_key["name"]}"'))
+
+    for table, columns in pending.items():
+        for column in columns:
+            print(f"Converting {table.name}.{column} to uuid")
+            connection.execute(text(
+                f'ALTER TABLE "{table.name}" ALTER COLUMN "{column}" TYPE uuid USING "{column}"::uuid'
+            ))
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        for constraint in table.foreign_key_constraints:
+            connection.execute(AddConstraint(constraint))
+
+
+def add_missing_columns(connection):
+    """
+    Add the nullable columns declared on the models that do not exist yet. create_all skips existing tables.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            print(f"Adding column {table.name}.{column.name}")
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+
+
+def normalize_sqlite_timestamps(connection):
+    """
+    Add the missing fraction to the timestamps stored by func.now() on SQLite, e.g. '2025-01-01 10:00:00'.
+
+    SQLAlchemy binds datetimes with microseconds and SQLite compares them as strings, so keyset pagination
+    skipped or repeated the rows created within the same second.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        for column in table.columns:
+            if isinstance(column.type, DateTime):
+                connection.execute(text(
+                    f'UPDATE "{table.name}" SET "{column.name}" = "{column.name}" || \'.000000\' '
+                    f'WHERE length("{column.name}") = 19'
+                ))
+
+
+def create_missing_indexes(connection):
+    """
+    Create the indexes declared on the models that do not exist yet. create_all skips existing tables.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+
+if __name__ == "__main__":
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            migrate_uuid_columns(connection)
+        # New tables reference the converted columns, so they are created afterwards
+        Base.metadata.create_all(bind=connection)
+        add_missing_columns(connection)
+        if connection.dialect.name == "sqlite":
+            normalize_sqlite_timestamps(connection)
+        create_missing_indexes(connection)
+
+    print("Database migrated successfully!")
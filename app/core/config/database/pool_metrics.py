@@ -0,0 +1,105 @@
+import bisect
+import threading
+import time
+from typing import Dict, Sequence
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class Histogram:
+    """
+    A thread-safe cumulative histogram with fixed bucket upper bounds, in the Prometheus style.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self._count
+            return {"buckets": buckets, "sum": self._sum, "count": self._count}
+
+
+class PoolMetrics:
+    """
+    Connection pool metrics: how long checkouts wait for a connection and how saturated the pool is.
+    """
+
+    def __init__(self):
+        self.checkout_wait_seconds = Histogram(buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+        self.checkout_timeouts = 0
+        self.max_checked_out = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait_seconds: float, checked_out: int):
+        self.checkout_wait_seconds.observe(wait_seconds)
+        with self._lock:
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+
+    def record_timeout(self):
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def snapshot(self, pool: QueuePool) -> Dict:
+        """
+        Return the current gauges of a pool together with the collected histograms and counters.
+        """
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "saturation": checked_out / capacity if capacity else 0.0,
+            "max_checked_out": self.max_checked_out,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_wait_seconds": self.checkout_wait_seconds.snapshot(),
+        }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long every checkout waits for a connection.
+    """
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    The instrumented pool of the async engine, its checkouts wait on an asyncio queue instead of a thread lock.
+    """
+
+    metrics = async_pool_metrics
@@ -0,0 +1,65 @@
+import threading
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config.database.db import engine as default_engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block of code issues more SQL statements than its budget allows.
+    """
+
+
+class QueryCounter:
+    """
+    Context manager that records the SQL statements an engine executes, e.g. to catch N+1 queries.
+
+    Every statement executed by the engine while the block is active is counted, including the ones
+    issued from the threadpool that runs sync route handlers, so run it without concurrent traffic.
+
+    Example:
+        with QueryCounter(budget=2):
+            client.get("/api/v1/posts/")
+
+    Attributes:
+        statements (List[str]): The executed statements.
+        budget (Optional[int]): The maximum number of statements allowed, or None to only record them.
+    """
+
+    def __init__(self, budget: Optional[int] = None, engine: Engine = default_engine):
+        """
+        Initialize the counter.
+
+        Args:
+            budget (Optional[int]): The maximum number of statements allowed inside the block.
+            engine (Engine): The engine to watch. Pass AsyncEngine.sync_engine for async engines.
+        """
+        self.budget = budget
+        self.engine = engine
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        if exc_type is None and self.budget is not None and self.count > self.budget:
+            statements = "\n".join(f"{i + 1}. {statement}" for i, statement in enumerate(self.statements))
+            raise QueryBudgetExceeded(
+                f"Expected at most {self.budget} SQL statements, {self.count} were executed:\n{statements}"
+            )
+        return False
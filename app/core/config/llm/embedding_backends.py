@@ -0,0 +1,192 @@
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from app.core.config.config import settings
+from app.exceptions.exceptions import EmbeddingInitException
+
+logger = logging.getLogger(__name__)
+
+HUGGINGFACE_API_BACKEND = "huggingface_api"
+LOCAL_BACKEND = "local"
+
+
+class EmbeddingBackend(ABC):
+    """
+    Computes embeddings. Implementations are shared by every EmbeddingService using the same model.
+
+    Attributes:
+        cache_key (str): Identifies the vectors this backend produces in the embedding cache.
+    """
+
+    cache_key: str
+
+    @abstractmethod
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        pass
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.embed_documents([query])[0]
+
+
+class HuggingFaceAPIBackend(EmbeddingBackend):
+    """
+    Embeds through the remote HuggingFace Inference API.
+    """
+
+    def __init__(self, model: str, api_key: str):
+        from langchain_community.embeddings import HuggingFaceInferenceAPIEmbeddings
+
+        self.cache_key = model
+        self.embedding_model = HuggingFaceInferenceAPIEmbeddings(model_name=model, api_key=api_key)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_model.embed_documents(texts)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.embedding_model.embed_query(query)
+
+
+class MicroBatcher:
+    """
+    Merges the texts of concurrent callers into batches run by a single worker thread.
+
+    A batch is started as soon as one request is queued and takes the requests arriving within max_wait seconds,
+    up to max_batch_size texts, so a burst of chats costs one forward pass instead of one each.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]], max_batch_size: int, max_wait: float, name: str = "embedding-batcher"):
+        self.encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts together with whatever other callers submit meanwhile, blocking until done.
+        """
+        if not texts:
+            return []
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[List[str], Future]]:
+        batch = [self._queue.get()]
+        count = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            count += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = self.encode(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+
+class LocalSentenceTransformerBackend(EmbeddingBackend):
+    """
+    Embeds in-process on the CPU with sentence-transformers, which is an optional dependency.
+
+    The model is loaded on the first embedding, not at startup, and concurrent requests are micro-batched.
+    """
+
+    def __init__(self, model: str, threads: int, max_batch_size: int, max_wait: float):
+        self.model_name = model
+        self.cache_key = f"{model}@local"
+        self.threads = threads
+        self._model = None
+        self._load_lock = threading.Lock()
+        self.batcher = MicroBatcher(self._encode, max_batch_size=max_batch_size, max_wait=max_wait, name="local-embeddings")
+
+    def _load(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    try:
+                        import torch
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError as e:
+                        raise EmbeddingInitException(
+                            "The local embedding backend needs sentence-transformers, install the local-embeddings extra"
+                        ) from e
+                    torch.set_num_threads(self.threads)
+                    logger.info(f"Loading embedding model {self.model_name} on CPU with {self.threads} threads")
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        return self._load().encode(texts, batch_size=self.batcher.max_batch_size, convert_to_numpy=True).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.batcher.submit(texts)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_embedding_backend(backend: str, model: str, api_key: str) -> EmbeddingBackend:
+    """
+    Return the shared embedding backend for a backend name and model, creating it on first use.
+
+    Args:
+        backend (str): huggingface_api or local.
+        model (str): The embedding model name.
+        api_key (str): The HuggingFace API key, used by the huggingface_api backend.
+
+    Returns:
+        EmbeddingBackend: The backend.
+
+    Raises:
+        EmbeddingInitException: If the backend is unknown or can not be created.
+    """
+    key = (backend, model)
+    with _backends_lock:
+        if key not in _backends:
+            if backend == HUGGINGFACE_API_BACKEND:
+                _backends[key] = HuggingFaceAPIBackend(model=model, api_key=api_key)
+            elif backend == LOCAL_BACKEND:
+                _backends[key] = LocalSentenceTransformerBackend(
+                    model=model,
+                    threads=settings.EMBEDDING_LOCAL_THREADS,
+                    max_batch_size=settings.EMBEDDING_LOCAL_BATCH_SIZE,
+                    max_wait=settings.EMBEDDING_LOCAL_BATCH_WAIT_MS / 1000,
+                )
+            else:
+                raise EmbeddingInitException(f"Unknown embedding backend {backend}")
+        return _backends[key]
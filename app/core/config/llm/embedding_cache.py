@@ -0,0 +1,134 @@
+import logging
+import threading
+from array import array
+from typing import Callable, Dict, List
+
+from app.core.cache import LRUCache, hash_text
+from app.core.config.config import settings
+from app.core.config.database.db import SessionLocal
+from app.crud.embedding_cache import EmbeddingCacheCRUD
+from app.exceptions.exceptions import DatabaseExeption
+
+logger = logging.getLogger(__name__)
+
+
+def pack_embedding(embedding: List[float]) -> bytes:
+    return array("f", embedding).tobytes()
+
+
+def unpack_embedding(blob: bytes) -> List[float]:
+    embedding = array("f")
+    embedding.frombytes(blob)
+    return embedding.tolist()
+
+
+class EmbeddingCache:
+    """
+    Two tier content-addressed cache of embeddings, keyed by (model, sha256(text)).
+
+    The first tier is an in-process LRU bounded by a byte budget, the second the embedding_cache table.
+    Both hold float32 blobs, a 384 dimensions embedding takes 1.5KB. A failing database only turns the
+    second tier into misses.
+
+    Attributes:
+        persist (bool): Whether the database tier is used.
+    """
+
+    def __init__(self, max_bytes: int, persist: bool = True):
+        """
+        Args:
+            max_bytes (int): The memory budget of the in-process tier.
+            persist (bool): Whether to read and write the embedding_cache table.
+        """
+        self.memory = LRUCache(maxsize=max(1, max_bytes // 1024), max_bytes=max_bytes)
+        self.persist = persist
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, model: str, texts: List[str], compute: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Return the embedding of every text, calling compute once with only the distinct texts found in neither tier.
+
+        Args:
+            model (str): The embedding model name.
+            texts (List[str]): The texts to embed.
+            compute (Callable[[List[str]], List[List[float]]]): Embeds a batch of texts.
+
+        Returns:
+            List[List[float]]: The embeddings, in the order of the texts.
+        """
+        hashes = [hash_text(text) for text in texts]
+        blobs: Dict[str, bytes] = {}
+        for text_hash in set(hashes):
+            blob = self.memory.get((model, text_hash))
+            if blob is not None:
+                blobs[text_hash] = blob
+        memory_hits = len(blobs)
+
+        missing = [text_hash for text_hash in set(hashes) if text_hash not in blobs]
+        stored = self._load(model, missing)
+        for text_hash, blob in stored.items():
+            self.memory.set((model, text_hash), blob)
+        blobs.update(stored)
+
+        to_compute: Dict[str, str] = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in blobs:
+                to_compute.setdefault(text_hash, text)
+        if to_compute:
+            embeddings = compute(list(to_compute.values()))
+            computed = {text_hash: pack_embedding(embedding) for text_hash, embedding in zip(to_compute, embeddings)}
+            for text_hash, blob in computed.items():
+                self.memory.set((model, text_hash), blob)
+            self._save(model, computed)
+            blobs.update(computed)
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.db_hits += len(stored)
+            self.misses += len(to_compute)
+        return [unpack_embedding(blobs[text_hash]) for text_hash in hashes]
+
+    def _load(self, model: str, text_hashes: List[str]) -> Dict[str, bytes]:
+        if not self.persist or not text_hashes:
+            return {}
+        db = SessionLocal()
+        try:
+            return EmbeddingCacheCRUD(db=db).get_embeddings(model, text_hashes)
+        except DatabaseExeption:
+            logger.warning(f"Failed to read {len(text_hashes)} cached embeddings")
+            return {}
+        finally:
+            db.close()
+
+    def _save(self, model: str, blobs: Dict[str, bytes]):
+        if not self.persist or not blobs:
+            return
+        db = SessionLocal()
+        try:
+            EmbeddingCacheCRUD(db=db).save_embeddings(model, blobs)
+        except DatabaseExeption:
+            logger.warning(f"Failed to store {len(blobs)} embeddings")
+        finally:
+            db.close()
+
+    def snapshot(self) -> Dict:
+        """
+        Return the hit counters of both tiers and the memory usage.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory.current_bytes,
+                "memory_max_bytes": self.memory.max_bytes,
+            }
+
+
+embedding_cache = EmbeddingCache(max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES, persist=settings.EMBEDDING_CACHE_PERSIST)
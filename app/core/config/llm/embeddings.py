@@ -1,34 +1,33 @@
-from typing import List
-from langchain_community.embeddings import (
-    HuggingFaceInferenceAPIEmbeddings,
-)
+from typing import List, Optional
 
+from app.core.config.config import settings
+from app.core.config.llm.embedding_backends import EmbeddingBackend, get_embedding_backend
+from app.core.config.llm.embedding_cache import EmbeddingCache, embedding_cache
 from app.exceptions.exceptions import EmbedDocException, EmbeddingInitException
 
 class EmbeddingService:
-    def __init__(self, model: str, api_key: str):
+    def __init__(self, model: str, api_key: str, cache: EmbeddingCache = embedding_cache, backend: Optional[str] = None):
+        self.model = model
+        self.cache = cache
         try:
-            self.embedding_model = HuggingFaceInferenceAPIEmbeddings(
-                model_name=model,
-                api_key=api_key,
-                )         
+            self.backend: EmbeddingBackend = get_embedding_backend(backend or settings.EMBEDDING_BACKEND, model, api_key)
+        except EmbeddingInitException:
+            raise
         except Exception as e:
             raise EmbeddingInitException("Failed to initialize Embedding Service") from e
     
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         try:
-            embeddings = self.embedding_model.embed_documents(texts)
-            return embeddings
+            # Only the texts that were never embedded with this model reach the backend
+            return self.cache.get_or_compute(self.backend.cache_key, texts, self.backend.embed_documents)
         except Exception as e:
             raise EmbedDocException("Failed to embed documents") from e
 
     def embed_query(self, query: str) -> list[float]:
         """Generates an embedding for a query with proper flattening"""
         try:
-            embedding = self.embedding_model.embed_query(query)
-            return embedding
+            return self.cache.get_or_compute(
+                self.backend.cache_key, [query], lambda queries: [self.backend.embed_query(queries[0])]
+            )[0]
         except Exception as e:
             raise EmbedDocException("Failed to embed query") from e
-    
-
-
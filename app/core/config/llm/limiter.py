@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+from app.core.config.config import settings
+from app.core.config.database.pool_metrics import Histogram
+from app.exceptions.exceptions import ServiceBusyException
+
+
+class LLMConcurrencyLimiter:
+    """
+    Caps the LLM calls in flight per provider, so a slow provider queues requests instead of piling them up.
+
+    Calls wait at most queue_timeout seconds for a slot, then fail with a ServiceBusyException. Use it from
+    the event loop of the application, the semaphores are bound to the loop that first uses them.
+
+    Attributes:
+        max_concurrency (int): The maximum number of calls in flight per provider.
+        queue_timeout (float): How long a call waits for a slot, in seconds.
+    """
+
+    def __init__(self, max_concurrency: int, queue_timeout: float):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency (int): The maximum number of calls in flight per provider.
+            queue_timeout (float): How long a call waits for a slot, in seconds.
+        """
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+        self.queue_wait_seconds = Histogram(buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+        self._lock = threading.Lock()
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                self._semaphores[provider] = asyncio.Semaphore(self.max_concurrency)
+                self._in_flight[provider] = 0
+                self._waiting[provider] = 0
+                self._rejected[provider] = 0
+            return self._semaphores[provider]
+
+    def _count(self, counters: Dict[str, int], provider: str, delta: int):
+        with self._lock:
+            counters[provider] += delta
+
+    @staticmethod
+    def _give_back(acquire: asyncio.Future, semaphore: asyncio.Semaphore):
+        # The acquire may already hold the permit, or get it before its cancellation lands
+        acquire.add_done_callback(lambda task: task.cancelled() or task.exception() or semaphore.release())
+        acquire.cancel()
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """
+        Hold one of the provider's slots for the duration of the block.
+
+        Args:
+            provider (str): The LLM provider, e.g. "groq".
+
+        Raises:
+            ServiceBusyException: If no slot was free within queue_timeout seconds.
+        """
+        semaphore = self._semaphore(provider)
+        start = time.perf_counter()
+        self._count(self._waiting, provider, 1)
+        # Not asyncio.wait_for: on Python 3.10 it returns when the acquire wins the race with a cancellation
+        # or a timeout, so a cancelled call would still take a slot and go on to call the provider
+        acquire = asyncio.ensure_future(semaphore.acquire())
+        try:
+            done, _ = await asyncio.wait({acquire}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._give_back(acquire, semaphore)
+            raise
+        finally:
+            self._count(self._waiting, provider, -1)
+        if not done:
+            self._give_back(acquire, semaphore)
+            self._count(self._rejected, provider, 1)
+            raise ServiceBusyException("Too many LLM requests in progress, please try again later")
+        self.queue_wait_seconds.observe(time.perf_counter() - start)
+
+        self._count(self._in_flight, provider, 1)
+        try:
+            yield
+        finally:
+            self._count(self._in_flight, provider, -1)
+            semaphore.release()
+
+    def snapshot(self) -> Dict:
+        """
+        Return the calls in flight, waiting and rejected per provider and the queue wait histogram.
+        """
+        with self._lock:
+            providers = {
+                provider: {
+                    "in_flight": self._in_flight[provider],
+                    "waiting": self._waiting[provider],
+                    "rejected": self._rejected[provider],
+                }
+                for provider in self._semaphores
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_timeout_seconds": self.queue_timeout,
+            "providers": providers,
+            "queue_wait_seconds": self.queue_wait_seconds.snapshot(),
+        }
+
+
+llm_limiter = LLMConcurrencyLimiter(max_concurrency=settings.LLM_MAX_CONCURRENCY, queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS)
@@ -1,5 +1,8 @@
 import logging
+import threading
+from typing import Callable, Dict, Iterable, Tuple
 
+from langchain_core.runnables import Runnable
 from langchain_groq import ChatGroq
 
 from app.core.config.config import settings
@@ -7,6 +10,9 @@ from app.exceptions.exceptions import LLMInitException
 
 logger = logging.getLogger(__name__)
 class LLMService:
+    # The concurrency limit of async calls is shared by every client of a provider
+    provider = "groq"
+
     def __init__(self, temperature: float = 0):
         try:
             self.llm = ChatGroq(
@@ -31,3 +37,106 @@ class LLMService:
             # Handle any other exceptions
             print(f"Failed to invoke ChatGroq: {e}")
             return "Failed to generate a response."
+
+
+class LLMRegistry:
+    """
+    Process-wide registry of long-lived LLM clients and the prompt chains built on top of them.
+
+    Clients are keyed by (model, temperature) so every service asking for the same configuration
+    shares one ChatGroq instance and its HTTP connection pool. Chains are keyed by a caller supplied
+    name plus the client key, so a prompt | llm | parser pipeline is only composed once.
+    """
+
+    def __init__(self, model: str = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            model (str): The model name used for every client. Defaults to settings.GROQ_MODEL_NAME.
+        """
+        self.model = model or settings.GROQ_MODEL_NAME
+        self._clients: Dict[Tuple[str, float], LLMService] = {}
+        self._chains: Dict[Tuple[str, str, float], Runnable] = {}
+        self._lock = threading.Lock()
+
+    def get(self, temperature: float = 0) -> LLMService:
+        """
+        Return the shared LLMService for the given temperature, creating it on first use.
+
+        Args:
+            temperature (float): The sampling temperature of the client.
+
+        Returns:
+            LLMService: The shared LLM service.
+
+        Raises:
+            LLMInitException: If the client can not be created.
+        """
+        key = (self.model, float(temperature))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                logger.info("Creating LLM client for model %s with temperature %s", *key)
+                client = LLMService(temperature=temperature)
+                self._clients[key] = client
+            return client
+
+    def get_chain(self, name: str, temperature: float, build: Callable[[LLMService], Runnable]) -> Runnable:
+        """
+        Return a cached chain, building it with the shared client on first use.
+
+        Args:
+            name (str): A unique name for the chain, e.g. "summary".
+            temperature (float): The temperature of the client the chain runs on.
+            build (Callable[[LLMService], Runnable]): Builds the chain from the LLM service.
+
+        Returns:
+            Runnable: The shared chain.
+
+        Raises:
+            LLMInitException: If the client can not be created.
+        """
+        key = (name, self.model, float(temperature))
+        chain = self._chains.get(key)
+        if chain is not None:
+            return chain
+
+        llm_service = self.get(temperature)
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                chain = build(llm_service)
+                self._chains[key] = chain
+            return chain
+
+    def warm_up(self, temperatures: Iterable[float]):
+        """
+        Eagerly create clients so the first requests do not pay the construction cost.
+
+        Args:
+            temperatures (Iterable[float]): The temperatures used by the services.
+        """
+        for temperature in temperatures:
+            try:
+                self.get(temperature)
+            except LLMInitException:
+                logger.warning("LLM client with temperature %s is not available", temperature)
+
+    def clear(self):
+        """
+        Drop every client and chain held by the registry.
+        """
+        with self._lock:
+            self._clients.clear()
+            self._chains.clear()
+
+
+# Temperatures used by the LLM backed services, warmed up at application startup.
+LLM_TEMPERATURES = (0, 0.3, 0.7)
+
+llm_registry = LLMRegistry()
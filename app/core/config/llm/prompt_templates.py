@@ -3,6 +3,11 @@ from langchain.prompts import ChatPromptTemplate
 
 from app.models.comment import SentimentEnum
 
+# Bump whenever a summary prompt changes so cached summaries are regenerated
+SUMMARY_PROMPT_VERSION = "v1"
+# Part of the key concurrent identical suggestion requests are coalesced on
+SUGGESTION_PROMPT_VERSION = "v1"
+
 def summary_prompt_template():
     system_message = SystemMessage(
         content="You are an AI assistant that summarizes blog posts. "
@@ -25,6 +30,48 @@ def summary_prompt_template():
     return raw_prompt
 
 
+def chunk_summary_prompt_template():
+    system_message = SystemMessage(
+        content="You are an AI assistant that summarizes a section of a long blog post. "
+                "You are given the section in the format of <Section> and </Section>. "
+                "Your task is to summarize the key points of the section in 100 words or less. "
+                "Respond only with the summary, without headings or formatting. "
+                "Do not include information from your own knowledge; only summarize the section."
+        )
+
+    human_message = HumanMessage(
+        content="<Section>{content}</Section>"
+        )
+
+    raw_prompt = ChatPromptTemplate.from_messages([
+        ("system", system_message.content),
+        ("user", human_message.content)
+        ])
+
+    return raw_prompt
+
+
+def combine_summaries_prompt_template():
+    system_message = SystemMessage(
+        content="You are an AI assistant that summarizes a long blog post from the summaries of its consecutive sections. "
+                "You are given the section summaries in order, in the format of <Summaries> and </Summaries>. "
+                "Your task is to combine them into a single summary of 200 words or less that keeps the key points in order. "
+                "Respond only with the summary, without headings or formatting. "
+                "Do not include information from your own knowledge; only use the given summaries."
+        )
+
+    human_message = HumanMessage(
+        content="<Summaries>{content}</Summaries>"
+        )
+
+    raw_prompt = ChatPromptTemplate.from_messages([
+        ("system", system_message.content),
+        ("user", human_message.content)
+        ])
+
+    return raw_prompt
+
+
 def suggestion_prompt_template():
     system_message = SystemMessage(
         content="You are an AI assistant that generates title and tags suggestions for blog posts. "
@@ -61,4 +108,23 @@ def comment_analysis_template():
         ("user", human_message.content)      
         ])
     
-    return raw_prompt
\ No newline at end of file
+    return raw_prompt
+
+def comment_batch_analysis_template():
+    system_message = SystemMessage(
+        content="You are a sentiment analysis AI that classifies user comments into three categories:"
+                "positive: The comment expresses a favorable opinion about the post."
+                "negative: The comment expresses an unfavorable opinion about the post."
+                "inappropriate: The comment contains offensive, harmful, or inappropriate language."
+                "You are given several comments, each in the format of <Comment id=\"...\"> and </Comment>. "
+                "Your task is to analyze every comment on its own and respond **only** with a valid JSON array "
+                "containing one object per comment with two keys: 'id', the id of the comment, and 'sentiment', "
+                f"one of the three categories: '{SentimentEnum.POSITIVE}', '{SentimentEnum.NEGATIVE}', or '{SentimentEnum.INAPPROPRIATE}'.")
+    human_message = HumanMessage(content="{comments}")
+
+    raw_prompt = ChatPromptTemplate.from_messages([
+        ("system", system_message.content),  
+        ("user", human_message.content)      
+        ])
+    
+    return raw_prompt
@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+from typing import AsyncIterator, Dict
+
+from app.core.config.database.pool_metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30, 60)
+
+
+class StreamMetrics:
+    """
+    Latency of the streamed LLM responses, per stream name: the time until the first token and until the last one.
+    """
+
+    def __init__(self):
+        self._streams: Dict[str, Dict[str, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def _histograms(self, name: str) -> Dict[str, Histogram]:
+        with self._lock:
+            if name not in self._streams:
+                self._streams[name] = {
+                    "time_to_first_token_seconds": Histogram(buckets=_LATENCY_BUCKETS),
+                    "total_seconds": Histogram(buckets=_LATENCY_BUCKETS),
+                }
+            return self._streams[name]
+
+    async def measure(self, name: str, tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Pass the tokens of a stream through, recording its latency once it is fully consumed.
+
+        Args:
+            name (str): The name the latency is reported under.
+            tokens (AsyncIterator[str]): The streamed tokens.
+
+        Yields:
+            str: The tokens, unchanged.
+        """
+        histograms = self._histograms(name)
+        start = time.perf_counter()
+        first_token = None
+        async for token in tokens:
+            if first_token is None:
+                first_token = time.perf_counter() - start
+                histograms["time_to_first_token_seconds"].observe(first_token)
+            yield token
+        total = time.perf_counter() - start
+        histograms["total_seconds"].observe(total)
+        logger.info(f"Streamed {name} in {total:.3f}s, first token after {first_token or total:.3f}s")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            streams = dict(self._streams)
+        return {
+            name: {metric: histogram.snapshot() for metric, histogram in histograms.items()}
+            for name, histograms in streams.items()
+        }
+
+
+stream_metrics = StreamMetrics()
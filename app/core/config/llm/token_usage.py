@@ -1,4 +1,5 @@
 import logging
+import threading
 from langchain_core.callbacks import BaseCallbackHandler
 
 class TokenUsageHandler(BaseCallbackHandler):
@@ -6,15 +7,19 @@ class TokenUsageHandler(BaseCallbackHandler):
         self.input_tokens = 0
         self.output_tokens = 0
         self.total_tokens = 0
+        # Batched calls report their usage from several threads
+        self._lock = threading.Lock()
 
     def on_llm_end(self, response, **kwargs):
        # Assuming 'result' is the object you received
-        usage_metadata = response.generations[0][0].message.response_metadata['token_usage']
+        # Streamed responses may not report the usage
+        usage_metadata = response.generations[0][0].message.response_metadata.get('token_usage')
 
         if usage_metadata:
-            self.input_tokens = usage_metadata['prompt_tokens']
-            self.output_tokens = usage_metadata['completion_tokens']
-            self.total_tokens = usage_metadata['total_tokens']
+            with self._lock:
+                self.input_tokens += usage_metadata['prompt_tokens']
+                self.output_tokens += usage_metadata['completion_tokens']
+                self.total_tokens += usage_metadata['total_tokens']
             
     def log_token_usage(self, logger: logging.Logger):
         logger.info(f"Input Tokens: {self.input_tokens}")
@@ -1,21 +1,50 @@
-from typing import List
+import threading
+from typing import Dict, Iterable, List, Optional
 from langchain_postgres import PGVector
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config.config import settings
 from app.core.config.llm.embeddings import EmbeddingService
 from app.exceptions.exceptions import VectorStoreInitException, VectorStoreOpException
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def create_text_splitter() -> RecursiveCharacterTextSplitter:
+    """
+    The splitter of post content, shared by the vector store chunks and the long post summaries.
+    """
+    return RecursiveCharacterTextSplitter(chunk_size=700, chunk_overlap=100)
+
+
+class _ThreadpoolRetriever(BaseRetriever):
+    """
+    Runs the searches of a retriever in the threadpool when it is called from async code.
+
+    The PGVector store is created in sync mode, its async search needs an async engine it does not have.
+    """
+
+    retriever: BaseRetriever
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return await run_in_threadpool(self.retriever.invoke, query)
+
+
 class VectorStoreService:
     def __init__(self, connection_string: str, embedding_service: EmbeddingService, collection_name: str = "blog_posts"):
         try:
             self.connection_string = connection_string
             self.embedding_service = embedding_service
             self.collection_name = collection_name    
-            self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=700, chunk_overlap=100)
+            self.text_splitter = create_text_splitter()
 
             self.vector_store = PGVector(
                 collection_name=self.collection_name,
@@ -27,35 +56,91 @@ class VectorStoreService:
             logger.exception(f"Failed to initialize VectorStoreService: {str(e)}")
             raise VectorStoreInitException("VectorStoreService initialization failed") from e
 
-    def store_blog_post(self, blog_post_id: str, content: str):
-        """Adds a blog post's content to PGVector only if the blog_post_id doesn't already exist."""
+    @staticmethod
+    def chunk_id(blog_post_id: str, chunk_index: int) -> str:
+        """Deterministic id of a chunk, so re-indexing a post overwrites its chunks in place."""
+        return f"{blog_post_id}:{chunk_index}"
+
+    def split_blog_post(self, content: str) -> List[str]:
+        return self.text_splitter.split_text(content)
+
+    def upsert_chunks(self, blog_post_id: str, chunks: Dict[int, str]):
+        """
+        Embeds and stores chunks of a blog post, overwriting the chunks stored under the same indexes.
+
+        Args:
+            blog_post_id (str): The ID of the blog post.
+            chunks (Dict[int, str]): The text of every chunk to store by chunk index.
+
+        Raises:
+            VectorStoreOpException: If the chunks can not be embedded or stored.
+        """
+        blog_post_id = str(blog_post_id)
+        if not chunks:
+            return
         try:
-            # Check if any document already exists for this blog_post_id
-            existing_docs = self.vector_store.similarity_search(
-                query="",  # Empty query to just check existence
-                k=1,
-                filter={"blog_post_id": blog_post_id}
+            self.vector_store.add_documents(
+                documents=[
+                    Document(page_content=text, metadata={"blog_post_id": blog_post_id, "chunk_index": i})
+                    for i, text in chunks.items()
+                ],
+                ids=[self.chunk_id(blog_post_id, i) for i in chunks],
             )
-            
-            if existing_docs:
-                return
-
-            texts = self.text_splitter.split_text(content)
-            documents_to_add = [
-                Document(page_content=text, metadata={"blog_post_id": str(blog_post_id), "chunk_index": i})
-                for i, text in enumerate(texts)
-            ]
-            self.vector_store.add_documents(documents=documents_to_add)
         except Exception as e:
-            logger.exception(f"Failed to store blog post {blog_post_id}: {str(e)}")
-            raise VectorStoreOpException("Failed to store blog post") from e
+            logger.exception(f"Failed to store chunks of blog post {blog_post_id}: {str(e)}")
+            raise VectorStoreOpException("Failed to store blog post chunks") from e
+
+    def delete_chunks(self, blog_post_id: str, chunk_indexes: Iterable[int]):
+        """
+        Deletes chunks of a blog post.
+
+        Raises:
+            VectorStoreOpException: If the chunks can not be deleted.
+        """
+        ids = [self.chunk_id(str(blog_post_id), i) for i in chunk_indexes]
+        if not ids:
+            return
+        try:
+            self.vector_store.delete(ids=ids)
+        except Exception as e:
+            logger.exception(f"Failed to delete chunks of blog post {blog_post_id}: {str(e)}")
+            raise VectorStoreOpException("Failed to delete blog post chunks") from e
+
+    def index_blog_post(self, blog_post_id: str, content: str, previous_chunk_count: int = 0) -> int:
+        """
+        Splits and embeds a whole blog post, replacing the chunks stored for a previous version of it.
+
+        Args:
+            blog_post_id (str): The ID of the blog post.
+            content (str): The content of the blog post.
+            previous_chunk_count (int): How many chunks the previous version had, the extra ones are deleted.
+
+        Returns:
+            int: The number of stored chunks.
+
+        Raises:
+            VectorStoreOpException: If the chunks can not be embedded or stored.
+        """
+        texts = self.split_blog_post(content)
+        self.upsert_chunks(blog_post_id, dict(enumerate(texts)))
+        self.delete_chunks(blog_post_id, range(len(texts), previous_chunk_count))
+        return len(texts)
+
+    def delete_blog_post(self, blog_post_id: str, chunk_count: int):
+        """
+        Deletes the stored chunks of a blog post.
+
+        Raises:
+            VectorStoreOpException: If the chunks can not be deleted.
+        """
+        self.delete_chunks(blog_post_id, range(chunk_count))
 
     def get_retriever(self, blog_post_id: int):
-        """Returns a retriever that filters results to a specific blog post."""
+        """Returns a retriever that filters results to a specific blog post, usable from sync and async chains."""
         try:
-            return self.vector_store.as_retriever(
+            return _ThreadpoolRetriever(retriever=self.vector_store.as_retriever(
                 search_kwargs={ "k": 5 ,"filter": {"blog_post_id": str(blog_post_id)}}
-            )
+            ))
         except Exception as e:
             logger.exception(f"Failed to get retriever for blog post {blog_post_id}: {str(e)}")
             raise VectorStoreOpException("Failed to get retriever") from e
@@ -67,4 +152,28 @@ class VectorStoreService:
             return retriever.invoke(query)
         except Exception as e:
             logger.exception(f"Failed to query blog post {blog_post_id}: {str(e)}")
-            raise VectorStoreOpException("Failed to query blog post") from e
\ No newline at end of file
+            raise VectorStoreOpException("Failed to query blog post") from e
+
+
+_vector_store_service: Optional[VectorStoreService] = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store_service() -> VectorStoreService:
+    """
+    Return the process wide VectorStoreService, creating it and its embedding client on first use.
+
+    Raises:
+        EmbeddingInitException: If the embedding client can not be created.
+        VectorStoreInitException: If the vector store can not be created.
+    """
+    global _vector_store_service
+    if _vector_store_service is None:
+        with _vector_store_lock:
+            if _vector_store_service is None:
+                embedder = EmbeddingService(model=settings.HUGGINGFACE_EMBEDDING_MODEL, api_key=settings.HUGGINGFACE_API_KEY)
+                _vector_store_service = VectorStoreService(
+                    connection_string=settings.SQLALCHEMY_DATABASE_URI,
+                    embedding_service=embedder,
+                )
+    return _vector_store_service
@@ -1,6 +1,11 @@
 import logging
 import os
 import logging.config
+import logging.handlers
+import queue
+from typing import Optional
+
+from app.core.config.config import settings
 
 LOGGING_CONFIG = {
     "version": 1,
@@ -24,11 +29,6 @@ LOGGING_CONFIG = {
             "formatter": "access",
             "stream": "ext://sys.stdout",
         },
-        "request_file": {
-            "class": "logging.FileHandler",
-            "formatter": "default",
-            "filename": "/home/zaheer-ud-din/office-data/python-gen-ai-task/fast-api-blog-app-gen-ai/request.log",
-        },
     },
     "loggers": {
         "uvicorn.error": {
@@ -41,9 +41,10 @@ LOGGING_CONFIG = {
             "handlers": ["access"],
             "propagate": False,
         },
+        # Handled by a QueueHandler added in setup_logging
         "request": {
             "level": "INFO",
-            "handlers": ["request_file"],
+            "handlers": [],
             "propagate": False,
         },
     },
@@ -54,5 +55,47 @@ LOGGING_CONFIG = {
     },
 }
 
+_request_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _RequestLogQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue the records as they are, the writer thread formats them instead of the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 def setup_logging():
-    logging.config.dictConfig(LOGGING_CONFIG)
\ No newline at end of file
+    """
+    Configure logging. Request logs are only put on a queue by the request handling code, the file is
+    written and rotated by a QueueListener thread started with start_request_log_listener.
+    """
+    global _request_log_listener
+    logging.config.dictConfig(LOGGING_CONFIG)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        settings.REQUEST_LOG_FILE,
+        maxBytes=settings.REQUEST_LOG_MAX_BYTES,
+        backupCount=settings.REQUEST_LOG_BACKUP_COUNT,
+        delay=True,
+    )
+    file_handler.setFormatter(logging.Formatter(LOGGING_CONFIG["formatters"]["default"]["format"]))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    logging.getLogger("request").addHandler(_RequestLogQueueHandler(log_queue))
+    _request_log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+
+def start_request_log_listener():
+    if _request_log_listener is not None and _request_log_listener._thread is None:
+        _request_log_listener.start()
+
+
+def stop_request_log_listener():
+    """
+    Write the queued request logs and stop the writer thread.
+    """
+    if _request_log_listener is not None and _request_log_listener._thread is not None:
+        _request_log_listener.stop()
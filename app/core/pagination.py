@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+from app.exceptions.exceptions import InvalidInputException
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """
+    Encode the (created_at, id) keyset position of the last returned row into an opaque cursor.
+
+    Args:
+        created_at (datetime): The creation time of the last returned row.
+        id (str): The ID of the last returned row.
+
+    Returns:
+        str: The url safe cursor.
+    """
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        Tuple[datetime, str]: The (created_at, id) keyset position.
+
+    Raises:
+        InvalidInputException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(id)
+    except (binascii.Error, ValueError, TypeError, UnicodeError) as e:
+        raise InvalidInputException("Invalid cursor") from e
@@ -1,13 +1,26 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from app.schemas.user import TokenPayload
 
 import jwt
 
+from sqlalchemy import inspect
+
+from app.core.cache import LRUCache, hash_text
 from app.core.config.config import settings
+from app.exceptions.exceptions import ServiceBusyException
+from app.models.user import User
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,8 +31,169 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """
+    A dedicated, bounded thread pool for bcrypt so hashing never runs on the event loop.
+
+    bcrypt releases the GIL, so the workers hash in parallel with the event loop. Calls beyond the workers
+    wait in the executor queue up to max_pending in total, after that new calls fail fast with a
+    ServiceBusyException instead of piling up behind minutes of queued hashing.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        """
+        Args:
+            workers (int): The number of hashing threads.
+            max_pending (int): The maximum number of running and queued calls.
+        """
+        self.workers = workers
+        self.max_pending = max(workers, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """
+        Run a hashing function on the pool.
+
+        Raises:
+            ServiceBusyException: If max_pending calls are already running or queued.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusyException()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is freed when the thread is done, even if the awaiting request was cancelled meanwhile
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Async verify_password that runs on the password hashing pool.
+
+    Raises:
+        ServiceBusyException: If the password hashing pool is saturated.
+    """
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """
+    Async get_password_hash that runs on the password hashing pool.
+
+    Raises:
+        ServiceBusyException: If the password hashing pool is saturated.
+    """
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(payload: TokenPayload, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode = {"exp": expire, "sub": str(payload)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+# sha256 of the token -> user id, each entry expires together with its token
+token_cache = LRUCache(maxsize=settings.AUTH_CACHE_SIZE)
+# user id -> column values of the user, without the password hash
+principal_cache = LRUCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_PRINCIPAL_TTL_SECONDS)
+
+_PRINCIPAL_FIELDS = [attr.key for attr in inspect(User).column_attrs if attr.key != "password"]
+# user id -> number of invalidations, so that a load racing with an invalidation is not cached
+_principal_generations: Dict[str, int] = {}
+_principal_lock = threading.Lock()
+
+
+def decode_access_token(token: str) -> str:
+    """
+    Return the user id of an access token, decoding and verifying it only the first time it is seen.
+
+    Args:
+        token (str): The bearer token.
+
+    Returns:
+        str: The ID of the user the token was issued to.
+
+    Raises:
+        InvalidTokenError: If the token is invalid or expired.
+    """
+    key = hash_text(token)
+    user_id = token_cache.get(key)
+    if user_id is not None:
+        return user_id
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    user_data = payload.get("sub")
+    user_id = user_data.split('=')[1].strip("'")
+    token_cache.set(key, user_id, ttl=max(payload["exp"] - time.time(), 0))
+    return user_id
+
+
+def get_cached_principal(user_id: str) -> Optional[User]:
+    """
+    Return a detached copy of a recently authenticated user.
+
+    The copy is not attached to any session, load the user again before changing it.
+
+    Args:
+        user_id (str): The ID of the user.
+
+    Returns:
+        Optional[User]: The user, or None if it is not cached.
+    """
+    fields = principal_cache.get(str(user_id))
+    if fields is None:
+        return None
+    return User(**fields)
+
+
+def principal_generation(user_id: str) -> int:
+    """
+    Return the invalidation generation of a user, read it before loading the user to cache.
+
+    Args:
+        user_id (str): The ID of the user.
+
+    Returns:
+        int: The number of times the user was invalidated.
+    """
+    return _principal_generations.get(str(user_id), 0)
+
+
+def cache_principal(user: User, generation: int):
+    """
+    Cache an authenticated user for the following requests, unless it was invalidated while it was loaded.
+
+    Args:
+        user (User): The user loaded from the database.
+        generation (int): The principal_generation read before the user was loaded.
+    """
+    fields = {key: getattr(user, key) for key in _PRINCIPAL_FIELDS}
+    with _principal_lock:
+        if _principal_generations.get(str(user.id), 0) != generation:
+            return
+        principal_cache.set(str(user.id), fields)
+
+
+def invalidate_principal(user_id: str):
+    """
+    Drop a user from the principal cache, e.g. after it was updated, activated or deleted.
+
+    Loads of the user started before the invalidation are not cached anymore.
+
+    Args:
+        user_id (str): The ID of the user.
+    """
+    with _principal_lock:
+        _principal_generations[str(user_id)] = _principal_generations.get(str(user_id), 0) + 1
+        principal_cache.pop(str(user_id))
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key across threads: the first caller runs the function,
+    the others wait for it and share its result or its exception.
+
+    Nothing is cached, a call made after the previous one finished runs the function again.
+
+    Attributes:
+        calls (int): The calls that ran the function.
+        shared (int): The calls that waited for another caller instead.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, unless a call with the same key is already in flight, then wait for its result.
+
+        Args:
+            key (Hashable): Identifies identical work, e.g. (operation, prompt version, input hash).
+            fn (Callable[[], Any]): The work.
+
+        Returns:
+            Any: The result of fn.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent awaits with the same key on the event loop: the work runs once in its own task
+    and every caller awaits that task.
+
+    A caller that is cancelled stops waiting without cancelling the work of the others. The work is
+    only cancelled once every caller waiting for it was cancelled.
+
+    Attributes:
+        calls (int): The calls that started the work.
+        shared (int): The calls that joined work already in flight.
+    """
+
+    def __init__(self):
+        # key -> [task, number of callers waiting for it]
+        self._calls: Dict[Hashable, List] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def _forget(self, key: Hashable, entry: List):
+        if self._calls.get(key) is entry:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn(), unless a call with the same key is already in flight, then await its result.
+
+        Args:
+            key (Hashable): Identifies identical work, e.g. (operation, prompt version, input hash).
+            fn (Callable[[], Awaitable[Any]]): Creates the awaitable doing the work.
+
+        Returns:
+            Any: The result of the work.
+        """
+        entry = self._calls.get(key)
+        if entry is None:
+            entry = self._calls[key] = [asyncio.ensure_future(fn()), 0]
+            entry[0].add_done_callback(lambda _: self._forget(key, entry))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # Every caller gave up, later callers start the work again
+                self._forget(key, entry)
+                task.cancel()
+
+    def snapshot(self) -> Dict:
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+# Identical LLM calls in flight, from the threadpool and from the event loop
+llm_single_flight = SingleFlight()
+async_llm_single_flight = AsyncSingleFlight()
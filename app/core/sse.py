@@ -0,0 +1,50 @@
+import json
+import logging
+from typing import AsyncIterator
+
+from app.exceptions.exceptions import ServiceBusyException
+
+logger = logging.getLogger(__name__)
+
+# Headers keeping proxies from buffering the events
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    Format a Server-Sent Event.
+
+    Args:
+        event (str): The event type.
+        data (dict): The JSON encoded payload.
+
+    Returns:
+        str: The event, terminated by a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_token_stream(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Send every token as a token event, then a done event.
+
+    The status code is already sent when the first token arrives, so a failure is reported
+    as an error event and the stream ends.
+
+    Args:
+        tokens (AsyncIterator[str]): The streamed tokens.
+
+    Yields:
+        str: The formatted events.
+    """
+    try:
+        async for token in tokens:
+            yield sse_event("token", {"text": token})
+    except ServiceBusyException as e:
+        yield sse_event("error", {"detail": str(e)})
+        return
+    except Exception:
+        logger.exception("Stream failed")
+        yield sse_event("error", {"detail": "The response could not be completed, please try again later"})
+        return
+    yield sse_event("done", {})
@@ -0,0 +1,129 @@
+import logging
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.chat_message import ChatMessage
+from app.exceptions.exceptions import DatabaseExeption
+
+logger = logging.getLogger(__name__)
+
+class ChatMessageCRUD:
+    """
+    CRUD operations for ChatMessage model.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize ChatMessageCRUD with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        self.db = db
+
+    def add_messages(self, session_id: str, messages: List[Tuple[str, str]]):
+        """
+        Append messages to a chat session.
+
+        Args:
+            session_id (str): The ID of the chat session.
+            messages (List[Tuple[str, str]]): The (role, content) of every message, in order.
+
+        Raises:
+            DatabaseException: If there is an error while storing the messages.
+        """
+        try:
+            self.db.add_all([ChatMessage(session_id=session_id, role=role, content=content) for role, content in messages])
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while storing messages of chat session %s", session_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def get_last_messages(self, session_id: str, limit: int) -> List[Tuple[str, str]]:
+        """
+        Retrieve the most recent messages of a chat session.
+
+        Args:
+            session_id (str): The ID of the chat session.
+            limit (int): The maximum number of messages to return.
+
+        Returns:
+            List[Tuple[str, str]]: The (role, content) of the messages, oldest first.
+
+        Raises:
+            DatabaseException: If there is an error while fetching the messages.
+        """
+        try:
+            rows = self.db.execute(
+                select(ChatMessage.role, ChatMessage.content)
+                .filter(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.id.desc())
+                .limit(limit)
+            ).all()
+            return [(role, content) for role, content in reversed(rows)]
+        except Exception as e:
+            logger.exception("Database error while fetching messages of chat session %s", session_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def delete_session(self, session_id: str):
+        """
+        Delete every message of a chat session.
+
+        Args:
+            session_id (str): The ID of the chat session.
+
+        Raises:
+            DatabaseException: If there is an error while deleting the messages.
+        """
+        try:
+            self.db.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while deleting chat session %s", session_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def compact(self, keep_per_session: int, older_than: datetime) -> int:
+        """
+        Delete the sessions idle since a date and all but the most recent messages of the others.
+
+        A session is only deleted as a whole, an active conversation longer than the TTL keeps its early turns
+        until they fall out of the last keep_per_session messages.
+
+        Args:
+            keep_per_session (int): How many messages of every session to keep.
+            older_than (datetime): Sessions whose last message was created before this naive UTC time are deleted.
+
+        Returns:
+            int: The number of deleted messages.
+
+        Raises:
+            DatabaseException: If there is an error while deleting the messages.
+        """
+        idle_sessions = (
+            select(ChatMessage.session_id)
+            .group_by(ChatMessage.session_id)
+            .having(func.max(ChatMessage.created_at) < older_than)
+        )
+        ranked = select(
+            ChatMessage.id,
+            func.row_number().over(partition_by=ChatMessage.session_id, order_by=ChatMessage.id.desc()).label("position"),
+        ).subquery()
+        try:
+            result = self.db.execute(
+                delete(ChatMessage).where(
+                    or_(
+                        ChatMessage.session_id.in_(idle_sessions),
+                        ChatMessage.id.in_(select(ranked.c.id).where(ranked.c.position > keep_per_session)),
+                    )
+                )
+            )
+            self.db.commit()
+            return result.rowcount
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while compacting chat messages")
+            raise DatabaseExeption("Internal database error") from e
@@ -1,12 +1,36 @@
 import logging
-from sqlalchemy.orm import Session, joinedload
-from app.models.comment import Comment, SentimentEnum
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, func, literal, literal_column, or_, select, update
+from sqlalchemy.orm import Session, aliased
+from app.core.config.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.comment import Comment, SentimentEnum, UnanalyzedCommentsPolicy
+from app.models.types import utcnow
 from app.models.user import User
 from app.schemas.comment import CommentCreateRequest
 from app.exceptions.exceptions import DatabaseExeption
 
 logger = logging.getLogger(__name__)
 
+def visible_sentiment_filter(unanalyzed_policy: Optional[UnanalyzedCommentsPolicy] = None, model=Comment):
+    """
+    Build the filter that hides inappropriate comments and, depending on the policy, unanalyzed ones.
+
+    Args:
+        unanalyzed_policy (Optional[UnanalyzedCommentsPolicy]): The policy for comments still waiting
+            for sentiment analysis. Defaults to settings.UNANALYZED_COMMENTS_POLICY.
+        model: The Comment class or an alias of it.
+
+    Returns:
+        The SQL expression to filter comments with.
+    """
+    policy = UnanalyzedCommentsPolicy(unanalyzed_policy or settings.UNANALYZED_COMMENTS_POLICY)
+    if policy == UnanalyzedCommentsPolicy.HIDE:
+        return model.sentiment.notin_([SentimentEnum.INAPPROPRIATE, SentimentEnum.NOT_ANALYZED])
+    # Comments created before sentiments were analyzed in the background have no sentiment at all
+    return or_(model.sentiment.is_(None), model.sentiment != SentimentEnum.INAPPROPRIATE)
+
 class CommentCRUD:
     """
     CRUD operations for Comment model.
@@ -21,7 +45,7 @@ class CommentCRUD:
         """
         self.db = db
 
-    def create_comment(self, commenter: User, post_id: str, comment_data: CommentCreateRequest, sentiment = None) -> Comment:
+    def create_comment(self, commenter: User, post_id: str, comment_data: CommentCreateRequest, sentiment: SentimentEnum = SentimentEnum.NOT_ANALYZED) -> Comment:
         """
         Create a new comment.
         
@@ -29,6 +53,7 @@ class CommentCRUD:
             commenter (User): The user creating the comment.
             post_id (str): The ID of the post to comment on.
             comment_data (CommentCreateRequest): Data required to create a comment.
+            sentiment (SentimentEnum): The sentiment of the comment, analyzed later by default.
         
         Returns:
             Comment: The newly created comment.
@@ -51,25 +76,99 @@ class CommentCRUD:
             logger.exception("Database error while creating comment with data %s", comment_data)
             raise DatabaseExeption("Internal database error") from e
 
-    def get_post_comments(self, post_id: str) -> list[Comment]:
+    def get_post_comment_tree(
+        self,
+        post_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        unanalyzed_policy: Optional[UnanalyzedCommentsPolicy] = None,
+    ) -> Tuple[List[Tuple[Comment, int]], Optional[str]]:
         """
-        Retrieve all comments for a post.
+        Retrieve a page of top-level comments of a post together with all their visible replies.
+
+        The whole page is fetched with a single recursive CTE. Top-level comments are ordered by
+        (created_at, id), and a hidden comment hides its replies as well.
         
         Args:
             post_id (str): The ID of the post.
+            limit (int): The maximum number of top-level comments to return.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            max_depth (Optional[int]): The deepest reply level to load, 0 for top-level comments only.
+                Unlimited by default.
+            unanalyzed_policy (Optional[UnanalyzedCommentsPolicy]): Whether comments still waiting for
+                sentiment analysis are returned. Defaults to settings.UNANALYZED_COMMENTS_POLICY.
         
         Returns:
-            list[Comment]: A list of comments for the post.
+            Tuple[List[Tuple[Comment, int]], Optional[str]]: The comments with their depth, parents before
+                their replies, and the cursor of the next page, or None on the last page.
         
         Raises:
+            InvalidInputException: If the cursor is malformed.
             DatabaseException: If there is an error while fetching the comments.
         """
+        root_filters = [
+            Comment.post_id == post_id,
+            Comment.parent_comment_id.is_(None),
+            Comment.is_deleted.is_(False),
+            visible_sentiment_filter(unanalyzed_policy),
+        ]
+        if cursor:
+            created_at, comment_id = decode_cursor(cursor)
+            root_filters.append(
+                or_(Comment.created_at > created_at, and_(Comment.created_at == created_at, Comment.id > comment_id))
+            )
+
+        # One extra root tells whether there is a next page, its replies are not loaded
+        roots = (
+            select(
+                Comment.id,
+                func.row_number().over(order_by=(Comment.created_at, Comment.id)).label("root_number"),
+            )
+            .where(*root_filters)
+            .order_by(Comment.created_at, Comment.id)
+            .limit(limit + 1)
+            .subquery("roots")
+        )
+
+        tree = (
+            select(roots.c.id, literal(0).label("depth"), roots.c.root_number)
+            .cte("comment_tree", recursive=True)
+        )
+        reply = aliased(Comment, name="reply")
+        reply_filters = [
+            reply.is_deleted.is_(False),
+            visible_sentiment_filter(unanalyzed_policy, model=reply),
+            tree.c.root_number <= limit,
+        ]
+        if max_depth is not None:
+            reply_filters.append(tree.c.depth < max_depth)
+        tree = tree.union_all(
+            select(reply.id, tree.c.depth + 1, tree.c.root_number)
+            .join(tree, reply.parent_comment_id == tree.c.id)
+            .where(*reply_filters)
+        )
+
+        statement = (
+            select(Comment, tree.c.depth)
+            .join(tree, Comment.id == tree.c.id)
+            .order_by(tree.c.depth, tree.c.root_number, Comment.created_at, Comment.id)
+        )
         try:
-            return self.db.query(Comment).options(joinedload(Comment.replies)).filter(Comment.post_id == post_id, Comment.sentiment != SentimentEnum.INAPPROPRIATE).all()
+            rows = [(comment, depth) for comment, depth in self.db.execute(statement).all()]
         except Exception as e:
             logger.exception("Database error while fetching comments for post with id %s", post_id)
             raise DatabaseExeption("Internal database error") from e
 
+        top_level = [comment for comment, depth in rows if depth == 0]
+        if len(top_level) <= limit:
+            return rows, None
+
+        extra_root = top_level[limit]
+        rows = [(comment, depth) for comment, depth in rows if comment is not extra_root]
+        last_root = top_level[limit - 1]
+        return rows, encode_cursor(last_root.created_at, last_root.id)
+
     def get_comment(self, comment_id: str) -> Comment:
         """
         Retrieve a comment by its ID.
@@ -155,4 +254,105 @@ class CommentCRUD:
             logger.info("Replies deleted successfully for comment with id %s", comment_id)
         except Exception as e:
             logger.exception("Database error while deleting replies for comment with id %s", comment_id)
-            raise DatabaseExeption("Internal database error") from e
\ No newline at end of file
+            raise DatabaseExeption("Internal database error") from e
+
+    def update_sentiment(self, comment_id: str, sentiment: SentimentEnum) -> Optional[Comment]:
+        """
+        Store the analyzed sentiment of a comment.
+        
+        Args:
+            comment_id (str): The ID of the comment.
+            sentiment (SentimentEnum): The analyzed sentiment.
+        
+        Returns:
+            Optional[Comment]: The updated comment, or None if it no longer exists.
+        
+        Raises:
+            DatabaseException: If there is an error while updating the comment.
+        """
+        try:
+            comment = self.get_comment(comment_id)
+            if not comment:
+                return None
+            comment.sentiment = sentiment
+            self.db.commit()
+            return comment
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while updating sentiment of comment with id %s", comment_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def get_unanalyzed_comment_ids(self, limit: int) -> list[str]:
+        """
+        Retrieve the IDs of comments still waiting for sentiment analysis and not claimed by a worker, oldest first.
+        
+        Args:
+            limit (int): The maximum number of IDs to return.
+        
+        Returns:
+            list[str]: The comment IDs.
+        
+        Raises:
+            DatabaseException: If there is an error while fetching the comments.
+        """
+        try:
+            rows = (
+                self.db.query(Comment.id)
+                .filter(_unanalyzed(), _unclaimed(utcnow()))
+                .order_by(Comment.created_at)
+                .limit(limit)
+                .all()
+            )
+            return [row.id for row in rows]
+        except Exception as e:
+            logger.exception("Database error while fetching unanalyzed comments")
+            raise DatabaseExeption("Internal database error") from e
+
+    def claim_unanalyzed_comments(self, comment_ids: List[str], claim: str, lease_seconds: float) -> Dict[str, str]:
+        """
+        Claim comments for sentiment analysis, skipping the analyzed ones and the ones claimed by another worker.
+
+        The claim is a single conditional UPDATE, so two workers racing for the same comment can not both
+        win it. A claim expires after the lease, which lets another worker retry a comment whose worker died.
+
+        Args:
+            comment_ids (List[str]): The IDs of the comments to claim.
+            claim (str): A token unique to this claim.
+            lease_seconds (float): How long the claim holds.
+
+        Returns:
+            Dict[str, str]: The content of the claimed comments by comment ID.
+
+        Raises:
+            DatabaseException: If there is an error while claiming the comments.
+        """
+        if not comment_ids:
+            return {}
+        now = utcnow()
+        try:
+            self.db.execute(
+                update(Comment)
+                .where(Comment.id.in_(comment_ids), _unanalyzed(), _unclaimed(now))
+                .values(sentiment_claim=claim, sentiment_claimed_until=now + timedelta(seconds=lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            rows = self.db.execute(select(Comment.id, Comment.content).where(Comment.sentiment_claim == claim)).all()
+            return {str(row.id): row.content for row in rows}
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while claiming comments for sentiment analysis")
+            raise DatabaseExeption("Internal database error") from e
+
+
+def _unanalyzed():
+    # Spelled like the predicate of ix_comments_not_analyzed_created_at, with an inline literal,
+    # otherwise SQLite can not tell that the partial index covers the query
+    return or_(
+        Comment.sentiment == literal_column(f"'{SentimentEnum.NOT_ANALYZED.value}'"),
+        Comment.sentiment.is_(None),
+    )
+
+
+def _unclaimed(now: datetime):
+    return or_(Comment.sentiment_claimed_until.is_(None), Comment.sentiment_claimed_until < now)
@@ -0,0 +1,84 @@
+import logging
+from typing import Dict, Iterable
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.embedding_cache import EmbeddingCacheEntry
+from app.exceptions.exceptions import DatabaseExeption
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCacheCRUD:
+    """
+    CRUD operations for EmbeddingCacheEntry model.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize EmbeddingCacheCRUD with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        self.db = db
+
+    def get_embeddings(self, model: str, text_hashes: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Retrieve the stored embeddings of a batch of texts in one query.
+
+        Args:
+            model (str): The embedding model name.
+            text_hashes (Iterable[str]): The sha256 hashes of the texts.
+
+        Returns:
+            Dict[str, bytes]: The packed embeddings of the texts that were found, by text hash.
+
+        Raises:
+            DatabaseException: If there is an error while fetching the embeddings.
+        """
+        text_hashes = list(text_hashes)
+        if not text_hashes:
+            return {}
+        try:
+            rows = (
+                self.db.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding)
+                .filter(EmbeddingCacheEntry.model == model, EmbeddingCacheEntry.text_hash.in_(text_hashes))
+                .all()
+            )
+            return {text_hash: embedding for text_hash, embedding in rows}
+        except Exception as e:
+            logger.exception("Database error while fetching cached embeddings of model %s", model)
+            raise DatabaseExeption("Internal database error") from e
+
+    def save_embeddings(self, model: str, embeddings: Dict[str, bytes]):
+        """
+        Store packed embeddings by text hash in a single statement.
+
+        The embedding of a text never changes for a model, so rows already stored, e.g. by another worker
+        indexing the same text, are left as they are instead of failing on the primary key.
+
+        Args:
+            model (str): The embedding model name.
+            embeddings (Dict[str, bytes]): The packed embeddings by text hash.
+
+        Raises:
+            DatabaseException: If there is an error while storing the embeddings.
+        """
+        if not embeddings:
+            return
+        insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(EmbeddingCacheEntry).on_conflict_do_nothing(
+            index_elements=[EmbeddingCacheEntry.model, EmbeddingCacheEntry.text_hash]
+        )
+        rows = [
+            {"model": model, "text_hash": text_hash, "embedding": embedding}
+            for text_hash, embedding in embeddings.items()
+        ]
+        try:
+            self.db.execute(statement, rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while storing embeddings of model %s", model)
+            raise DatabaseExeption("Internal database error") from e
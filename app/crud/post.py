@@ -1,17 +1,63 @@
 import logging
 
+from typing import List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 
 from app.api.deps import CurrentUser
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.comment import Comment
 from app.models.post import Post, PostStatus
+from app.crud.post_summary import PostSummaryCRUD
 from app.schemas.post import PostCreate
 from app.exceptions.exceptions import DatabaseExeption
 
 
 logger = logging.getLogger(__name__)
 
+
+def _published_post_statement(post_id: UUID) -> Select:
+    return (
+        select(Post)
+        .options(joinedload(Post.author))
+        .filter(Post.id == str(post_id), Post.status == PostStatus.PUBLISHED)
+        .limit(1)
+    )
+
+
+def _published_posts_page_statement(limit: int, cursor: Optional[str] = None) -> Select:
+    """
+    Build the keyset query of a page of published posts, fetching one extra row to tell if another page follows.
+
+    Raises:
+        InvalidInputException: If the cursor is malformed.
+    """
+    statement = (
+        select(Post)
+        .options(
+            load_only(Post.id, Post.title, Post._tags, Post.status, Post.created_at, Post.updated_at, Post.author_id),
+            # One extra query for all authors of the page instead of one per post
+            selectinload(Post.author),
+        )
+        .filter(Post.status == PostStatus.PUBLISHED)
+    )
+    if cursor:
+        created_at, post_id = decode_cursor(cursor)
+        statement = statement.filter(
+            or_(Post.created_at < created_at, and_(Post.created_at == created_at, Post.id < post_id))
+        )
+    return statement.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+
+
+def _split_page(posts: List[Post], limit: int) -> Tuple[List[Post], Optional[str]]:
+    if len(posts) <= limit:
+        return posts, None
+    posts = posts[:limit]
+    return posts, encode_cursor(posts[-1].created_at, posts[-1].id)
+
+
 class PostCRUD:
     """
     CRUD operations for Post model.
@@ -66,33 +112,43 @@ class PostCRUD:
             DatabaseException: If there is an error while fetching the post.
         """
         try:
-            post = self.db.query(Post).filter(Post.id == str(post_id), Post.status == PostStatus.PUBLISHED).first()
-            return post
+            return self.db.execute(_published_post_statement(post_id)).scalars().first()
         except Exception as e:
             logger.exception(f"Database error while fetching post with id {post_id}")
             raise DatabaseExeption("Internal database error") from e
 
    
-    def update_post(self, post_id: UUID, post_data: PostCreate):
+    def update_post(self, post_id: UUID, post_data: PostCreate, author_id: UUID):
         """
-        Update an existing post.
+        Update an existing post of an author.
         
         Args:
             post_id (UUID): The ID of the post to update.
             post_data (PostCreate): Data to update the post with.
+            author_id (UUID): The ID of the author, the posts of other authors are not found.
         
         Returns:
-            Post: The updated post, or None if not found.
+            Post: The updated post, or None if the author has no post with this ID.
         
         Raises:
             DatabaseException: If there is an error while updating the post.
         """
         try:
-            post = self.get_post(post_id)
+            # Drafts can be updated too, e.g. to publish them, but only by their author
+            post = (
+                self.db.query(Post)
+                .options(joinedload(Post.author))
+                .filter(Post.id == str(post_id), Post.author_id == str(author_id))
+                .first()
+            )
             if not post:
                 return None;
+            old_content = post.content
             for field, value in post_data.model_dump(exclude_unset=True).items():
                 setattr(post, field, value)
+            if post.content != old_content:
+                # Stored summaries were generated from the old content
+                PostSummaryCRUD(db=self.db).delete_post_summaries(post.id, commit=False)
             self.db.commit()
             return post
         
@@ -101,22 +157,33 @@ class PostCRUD:
             raise DatabaseExeption("Internal database error") from e
 
    
-    def get_posts(self):
+    def get_posts(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Post], Optional[str]]:
         """
-        Retrieve all published posts.
+        Retrieve a page of published posts, newest first.
+
+        Pages are keyed on (created_at, id) so every page costs the same regardless of its position,
+        and the content column is not loaded since post listings never return it.
+        
+        Args:
+            limit (int): The maximum number of posts to return.
+            cursor (Optional[str]): The cursor returned with the previous page.
         
         Returns:
-            List[Post]: A list of all published posts.
+            Tuple[List[Post], Optional[str]]: The posts and the cursor of the next page, or None on the last page.
         
         Raises:
+            InvalidInputException: If the cursor is malformed.
             DatabaseException: If there is an error while fetching the posts.
         """
+        statement = _published_posts_page_statement(limit, cursor)
         try:
-            return self.db.query(Post).filter(Post.status == PostStatus.PUBLISHED).all()
+            posts = list(self.db.execute(statement).scalars().all())
         except Exception as e:
             logger.exception("Database error while fetching posts")
             raise DatabaseExeption("Internal database error") from e
 
+        return _split_page(posts, limit)
+
     
     def delete_post(self, post: Post):
         """
@@ -138,4 +205,63 @@ class PostCRUD:
         except Exception as e:
             logger.exception(f"Database error while deleting post {post.id}")
             raise DatabaseExeption("Internal database error") from e
-    
\ No newline at end of file
+
+
+class AsyncPostCRUD:
+    """
+    Read operations for the Post model on an async database session, used by the public post routes.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize AsyncPostCRUD with an async database session.
+        
+        Args:
+            db (AsyncSession): SQLAlchemy async database session.
+        """
+        self.db = db
+
+    async def get_post(self, post_id: UUID) -> Optional[Post]:
+        """
+        Retrieve a published post with its author by its ID.
+        
+        Args:
+            post_id (UUID): The ID of the post to retrieve.
+        
+        Returns:
+            Post: The post with the given ID, or None if not found.
+        
+        Raises:
+            DatabaseException: If there is an error while fetching the post.
+        """
+        try:
+            result = await self.db.execute(_published_post_statement(post_id))
+            return result.scalars().first()
+        except Exception as e:
+            logger.exception(f"Database error while fetching post with id {post_id}")
+            raise DatabaseExeption("Internal database error") from e
+
+    async def get_posts(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Post], Optional[str]]:
+        """
+        Retrieve a page of published posts, newest first. See PostCRUD.get_posts.
+        
+        Args:
+            limit (int): The maximum number of posts to return.
+            cursor (Optional[str]): The cursor returned with the previous page.
+        
+        Returns:
+            Tuple[List[Post], Optional[str]]: The posts and the cursor of the next page, or None on the last page.
+        
+        Raises:
+            InvalidInputException: If the cursor is malformed.
+            DatabaseException: If there is an error while fetching the posts.
+        """
+        statement = _published_posts_page_statement(limit, cursor)
+        try:
+            result = await self.db.execute(statement)
+            posts = list(result.scalars().all())
+        except Exception as e:
+            logger.exception("Database error while fetching posts")
+            raise DatabaseExeption("Internal database error") from e
+
+        return _split_page(posts, limit)
@@ -0,0 +1,140 @@
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from app.models.post_chunk import PostChunk
+from app.models.post_index_status import IndexStatus, PostIndexStatus
+from app.exceptions.exceptions import DatabaseExeption
+
+logger = logging.getLogger(__name__)
+
+class PostIndexCRUD:
+    """
+    CRUD operations for PostIndexStatus model.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize PostIndexCRUD with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        self.db = db
+
+    def get_status(self, post_id: str) -> Optional[PostIndexStatus]:
+        """
+        Retrieve the index status of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+
+        Returns:
+            Optional[PostIndexStatus]: The index status, or None if the post was never indexed.
+
+        Raises:
+            DatabaseException: If there is an error while fetching the status.
+        """
+        try:
+            return self.db.get(PostIndexStatus, str(post_id))
+        except Exception as e:
+            logger.exception("Database error while fetching index status of post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def save_status(self, post_id: str, status: IndexStatus, content_hash: Optional[str] = None, chunk_count: Optional[int] = None, error: Optional[str] = None) -> PostIndexStatus:
+        """
+        Create or update the index status of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+            status (IndexStatus): The new status.
+            content_hash (Optional[str]): The hash of the indexed content, kept unchanged if None.
+            chunk_count (Optional[int]): The number of stored chunks, kept unchanged if None.
+            error (Optional[str]): Why the indexing failed.
+
+        Returns:
+            PostIndexStatus: The saved status.
+
+        Raises:
+            DatabaseException: If there is an error while saving the status.
+        """
+        try:
+            index_status = self.db.get(PostIndexStatus, str(post_id))
+            if index_status is None:
+                index_status = PostIndexStatus(post_id=str(post_id), chunk_count=0)
+                self.db.add(index_status)
+            index_status.status = status.value
+            if content_hash is not None:
+                index_status.content_hash = content_hash
+            if chunk_count is not None:
+                index_status.chunk_count = chunk_count
+            index_status.error = error
+            self.db.commit()
+            return index_status
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while saving index status of post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def get_chunk_hashes(self, post_id: str) -> Dict[int, str]:
+        """
+        Retrieve the hashes of the chunks stored for a post.
+
+        Args:
+            post_id (str): The ID of the post.
+
+        Returns:
+            Dict[int, str]: The content hash of every stored chunk by chunk index.
+
+        Raises:
+            DatabaseException: If there is an error while fetching the hashes.
+        """
+        try:
+            rows = self.db.query(PostChunk.chunk_index, PostChunk.content_hash).filter(PostChunk.post_id == str(post_id)).all()
+            return {chunk_index: content_hash for chunk_index, content_hash in rows}
+        except Exception as e:
+            logger.exception("Database error while fetching chunk hashes of post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def save_chunk_hashes(self, post_id: str, content_hashes: List[str]):
+        """
+        Replace the chunk hashes of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+            content_hashes (List[str]): The content hash of every chunk, in chunk order.
+
+        Raises:
+            DatabaseException: If there is an error while saving the hashes.
+        """
+        post_id = str(post_id)
+        try:
+            self.db.query(PostChunk).filter(PostChunk.post_id == post_id).delete(synchronize_session=False)
+            self.db.add_all([
+                PostChunk(post_id=post_id, chunk_index=chunk_index, content_hash=content_hash)
+                for chunk_index, content_hash in enumerate(content_hashes)
+            ])
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while saving chunk hashes of post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+    def delete_status(self, post_id: str):
+        """
+        Delete the index status and the chunk hashes of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+
+        Raises:
+            DatabaseException: If there is an error while deleting the status.
+        """
+        try:
+            self.db.query(PostChunk).filter(PostChunk.post_id == str(post_id)).delete(synchronize_session=False)
+            self.db.query(PostIndexStatus).filter(PostIndexStatus.post_id == str(post_id)).delete(synchronize_session=False)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while deleting index status of post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
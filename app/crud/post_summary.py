@@ -0,0 +1,169 @@
+import logging
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config.config import settings
+from app.models.post_summary import PostSummary
+from app.exceptions.exceptions import DatabaseExeption
+
+logger = logging.getLogger(__name__)
+
+# In-process cache in front of the post_summaries table, keyed by (post_id, content_hash, prompt_version)
+summary_cache = LRUCache(maxsize=settings.SUMMARY_CACHE_SIZE)
+
+class PostSummaryCRUD:
+    """
+    CRUD operations for PostSummary model.
+
+    Reads go through the in-process summary cache first and fall back to the database.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize PostSummaryCRUD with a database session.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        self.db = db
+
+    def get_summary(self, post_id: str, content_hash: str, prompt_version: str) -> Optional[str]:
+        """
+        Retrieve the stored summary for a version of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+            content_hash (str): The sha256 hash of the post content.
+            prompt_version (str): The version of the summary prompt.
+
+        Returns:
+            Optional[str]: The summary, or None if it was never generated.
+
+        Raises:
+            DatabaseException: If there is an error while fetching the summary.
+        """
+        key = (str(post_id), content_hash, prompt_version)
+        summary = summary_cache.get(key)
+        if summary is not None:
+            return summary
+
+        try:
+            post_summary = self.db.get(PostSummary, key)
+        except Exception as e:
+            logger.exception("Database error while fetching summary for post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+        if post_summary is None:
+            return None
+        summary_cache.set(key, post_summary.summary)
+        return post_summary.summary
+
+    def save_summary(self, post_id: str, content_hash: str, prompt_version: str, summary: str) -> str:
+        """
+        Store the summary for a version of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+            content_hash (str): The sha256 hash of the post content.
+            prompt_version (str): The version of the summary prompt.
+            summary (str): The generated summary.
+
+        Returns:
+            str: The stored summary.
+
+        Raises:
+            DatabaseException: If there is an error while storing the summary.
+        """
+        key = (str(post_id), content_hash, prompt_version)
+        try:
+            self.db.merge(PostSummary(post_id=key[0], content_hash=content_hash, prompt_version=prompt_version, summary=summary))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error while storing summary for post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+        summary_cache.set(key, summary)
+        return summary
+
+    def delete_post_summaries(self, post_id: str, commit: bool = True):
+        """
+        Delete every stored summary of a post.
+
+        Args:
+            post_id (str): The ID of the post.
+            commit (bool): Whether to commit the deletion right away.
+
+        Raises:
+            DatabaseException: If there is an error while deleting the summaries.
+        """
+        post_id = str(post_id)
+        summary_cache.discard_where(lambda key: key[0] == post_id)
+        try:
+            self.db.query(PostSummary).filter(PostSummary.post_id == post_id).delete(synchronize_session=False)
+            if commit:
+                self.db.commit()
+        except Exception as e:
+            logger.exception("Database error while deleting summaries for post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+
+class AsyncPostSummaryCRUD:
+    """
+    Read and store operations for the PostSummary model on an async database session, used by the async LLM routes.
+
+    Shares the in-process summary cache with PostSummaryCRUD.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize AsyncPostSummaryCRUD with an async database session.
+
+        Args:
+            db (AsyncSession): SQLAlchemy async database session.
+        """
+        self.db = db
+
+    async def get_summary(self, post_id: str, content_hash: str, prompt_version: str) -> Optional[str]:
+        """
+        Retrieve the stored summary for a version of a post. See PostSummaryCRUD.get_summary.
+
+        Raises:
+            DatabaseException: If there is an error while fetching the summary.
+        """
+        key = (str(post_id), content_hash, prompt_version)
+        summary = summary_cache.get(key)
+        if summary is not None:
+            return summary
+
+        try:
+            post_summary = await self.db.get(PostSummary, key)
+        except Exception as e:
+            logger.exception("Database error while fetching summary for post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+        if post_summary is None:
+            return None
+        summary_cache.set(key, post_summary.summary)
+        return post_summary.summary
+
+    async def save_summary(self, post_id: str, content_hash: str, prompt_version: str, summary: str) -> str:
+        """
+        Store the summary for a version of a post. See PostSummaryCRUD.save_summary.
+
+        Raises:
+            DatabaseException: If there is an error while storing the summary.
+        """
+        key = (str(post_id), content_hash, prompt_version)
+        try:
+            await self.db.merge(PostSummary(post_id=key[0], content_hash=content_hash, prompt_version=prompt_version, summary=summary))
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.exception("Database error while storing summary for post with id %s", post_id)
+            raise DatabaseExeption("Internal database error") from e
+
+        summary_cache.set(key, summary)
+        return summary
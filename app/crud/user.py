@@ -1,7 +1,9 @@
 import logging
 from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash
+from app.core.security import aget_password_hash, get_password_hash, invalidate_principal
 from app.models.user import User, UserRole, UserStatus
 from app.schemas.user import UserCreate, UserUpdate
 from app.exceptions.exceptions import DatabaseExeption
@@ -40,9 +42,7 @@ class UserCRUD:
             new_user = User(**user_data.model_dump())
 
             if user_data.user_role == UserRole.ADMIN or user_data.user_role == UserRole.AUTHOR:
-                new_user.status = UserStatus.IN_ACTIVE
-            print("this is new user", new_user)
-            new_user = User(**user_data.model_dump())
+                new_user.status = UserStatus.IN_ACTIVE.value
             self.db.add(new_user)
             self.db.commit()
             self.db.refresh(new_user)
@@ -66,7 +66,6 @@ class UserCRUD:
         """
         try:
             user = self.db.get(User, str(user_id))
-            print("the user is this2",user)
             return user
         except Exception as e:
             logger.exception(f"Database error while fetching user with id {user_id}")
@@ -110,11 +109,34 @@ class UserCRUD:
             for field, value in update_data.model_dump(exclude_unset=True).items():
                 setattr(user, field, value)
             self.db.commit()
+            invalidate_principal(user.id)
             return user
         except Exception as e:
             logger.exception(f"Database error while updating user {user.id} with data {update_data.model_dump()}")
             raise DatabaseExeption("Internal database error") from e
 
+    def activate_user(self, user: User) -> User:
+        """
+        Activate a user.
+        
+        Args:
+            user (User): The user to activate.
+        
+        Returns:
+            User: The activated user.
+        
+        Raises:
+            DatabaseException: If there is an error while activating the user.
+        """
+        try:
+            user.status = UserStatus.ACTIVE.value
+            self.db.commit()
+            invalidate_principal(user.id)
+            return user
+        except Exception as e:
+            logger.exception(f"Database error while activating user {user.id}")
+            raise DatabaseExeption("Internal database error") from e
+
     def get_users(self) -> list[User]:
         """
         Retrieve all users.
@@ -145,9 +167,181 @@ class UserCRUD:
             DatabaseException: If there is an error while deleting the user.
         """
         try:
+            user_id = user.id
             user.is_deleted = True
             self.db.commit()
+            # Reading user.id again would reload the now soft deleted row
+            invalidate_principal(user_id)
             return user
         except Exception as e:
             logger.exception(f"Database error while deleting user {user.id}")
-            raise DatabaseExeption("Internal database error") from e
\ No newline at end of file
+            raise DatabaseExeption("Internal database error") from e
+
+
+class AsyncUserCRUD:
+    """
+    CRUD operations for User model on an async database session.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize AsyncUserCRUD with an async database session.
+        
+        Args:
+            db (AsyncSession): SQLAlchemy async database session.
+        """
+        self.db = db
+
+    async def create_user(self, user_data: UserCreate) -> User:
+        """
+        Create a new user.
+        
+        Args:
+            user_data (UserCreate): Data required to create a user.
+        
+        Returns:
+            User: The newly created user.
+        
+        Raises:
+            ServiceBusyException: If the password hashing pool is saturated.
+            DatabaseException: If there is an error while creating the user.
+        """
+        user_data.password = await aget_password_hash(user_data.password)
+        try:
+            new_user = User(**user_data.model_dump())
+
+            if user_data.user_role == UserRole.ADMIN or user_data.user_role == UserRole.AUTHOR:
+                new_user.status = UserStatus.IN_ACTIVE.value
+            self.db.add(new_user)
+            await self.db.commit()
+            await self.db.refresh(new_user)
+            return new_user
+        except Exception as e:
+            logger.exception("Database error while creating user with email %s", user_data.email)
+            raise DatabaseExeption("Internal database error") from e
+
+    async def get_user(self, user_id: UUID) -> User:
+        """
+        Retrieve a user by their ID.
+        
+        Args:
+            user_id (UUID): The ID of the user to retrieve.
+        
+        Returns:
+            User: The user with the given ID, or None if not found.
+        
+        Raises:
+            DatabaseException: If there is an error while fetching the user.
+        """
+        try:
+            return await self.db.get(User, str(user_id))
+        except Exception as e:
+            logger.exception(f"Database error while fetching user with id {user_id}")
+            raise DatabaseExeption("Internal database error") from e
+
+    async def get_user_by_email(self, email: str) -> User:
+        """
+        Retrieve a user by their email.
+        
+        Args:
+            email (str): The email of the user to retrieve.
+        
+        Returns:
+            User: The user with the given email, or None if not found.
+        
+        Raises:
+            DatabaseException: If there is an error while fetching the user.
+        """
+        try:
+            result = await self.db.execute(select(User).filter(User.email == email).limit(1))
+            return result.scalars().first()
+        except Exception as e:
+            logger.exception(f"Database error while fetching user with email {email}")
+            raise DatabaseExeption("Internal database error") from e
+
+    async def update_user(self, user: User, update_data: UserUpdate) -> User:
+        """
+        Update an existing user.
+        
+        Args:
+            user (User): The user to update.
+            update_data (UserUpdate): Data to update the user with.
+        
+        Returns:
+            User: The updated user.
+        
+        Raises:
+            DatabaseException: If there is an error while updating the user.
+        """
+        try:
+            for field, value in update_data.model_dump(exclude_unset=True).items():
+                setattr(user, field, value)
+            await self.db.commit()
+            await self.db.refresh(user)
+            invalidate_principal(user.id)
+            return user
+        except Exception as e:
+            logger.exception(f"Database error while updating user {user.id} with data {update_data.model_dump()}")
+            raise DatabaseExeption("Internal database error") from e
+
+    async def activate_user(self, user: User) -> User:
+        """
+        Activate a user.
+        
+        Args:
+            user (User): The user to activate.
+        
+        Returns:
+            User: The activated user.
+        
+        Raises:
+            DatabaseException: If there is an error while activating the user.
+        """
+        try:
+            user.status = UserStatus.ACTIVE.value
+            await self.db.commit()
+            await self.db.refresh(user)
+            invalidate_principal(user.id)
+            return user
+        except Exception as e:
+            logger.exception(f"Database error while activating user {user.id}")
+            raise DatabaseExeption("Internal database error") from e
+
+    async def get_users(self) -> list[User]:
+        """
+        Retrieve all users.
+        
+        Returns:
+            List[User]: A list of all users.
+        
+        Raises:
+            DatabaseException: If there is an error while fetching the users.
+        """
+        try:
+            result = await self.db.execute(select(User))
+            return list(result.scalars().all())
+        except Exception as e:
+            logger.exception("Database error while fetching users")
+            raise DatabaseExeption("Internal database error") from e
+
+    async def delete_user(self, user: User) -> User:
+        """
+        Soft delete a user.
+        
+        Args:
+            user (User): The user to delete.
+        
+        Returns:
+            User: The deleted user.
+        
+        Raises:
+            DatabaseException: If there is an error while deleting the user.
+        """
+        try:
+            user.is_deleted = True
+            await self.db.commit()
+            invalidate_principal(user.id)
+            return user
+        except Exception as e:
+            logger.exception(f"Database error while deleting user {user.id}")
+            raise DatabaseExeption("Internal database error") from e
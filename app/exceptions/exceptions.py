@@ -28,6 +28,10 @@ class ForbiddenException(AppBaseException):
     def __init__(self, message: str = 'Forbidden'):
         super().__init__(message, status_code=status.HTTP_403_FORBIDDEN)
 
+class ServiceBusyException(AppBaseException):
+    def __init__(self, message: str = 'Server is busy, please try again later'):
+        super().__init__(message, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
 class DatabaseExeption(AppBaseException):
     def __init__(self, message: str = 'Internal server error'):
         super().__init__(message, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,19 +1,47 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
 from app.core.config.config import settings
 from app.api.main import main_router
-from app.core.config.llm.llm import LLMService
+from app.api.deps import LLMRegistryDep
+from app.core.config.database.db import async_engine
+from app.core.security import password_hasher
+from app.core.config.llm.llm import LLM_TEMPERATURES, llm_registry
 from app.core.config.config import settings
-from app.core.config.logging_config import setup_logging
+from app.core.config.logging_config import setup_logging, start_request_log_listener, stop_request_log_listener
+from app.services.sentiment_worker import sentiment_worker_pool
+from app.services.question_answer.memory import SessionManager
 from app.middlewares.exception_middleware import ExceptionMiddleware
 from app.middlewares.logging_middleware import LoggingMiddleware
 
 setup_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Request logs are written to disk by a background thread
+    start_request_log_listener()
+    # Create the long-lived LLM clients once and share them across requests
+    llm_registry.warm_up(LLM_TEMPERATURES)
+    app.state.llm_registry = llm_registry
+    # Comment sentiments are analyzed off the request path
+    sentiment_worker_pool.start()
+    app.state.sentiment_workers = sentiment_worker_pool
+    # Deletes expired chat sessions when they are stored in the database
+    SessionManager().start()
+    yield
+    SessionManager().stop()
+    sentiment_worker_pool.stop()
+    llm_registry.clear()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+    stop_request_log_listener()
+
 app = FastAPI(
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 @app.exception_handler(RequestValidationError)
@@ -27,9 +55,9 @@ app.add_middleware(LoggingMiddleware)
 
 app.include_router(main_router, prefix=settings.API_V1_STR)
 @app.get("/")
-async def root():
+async def root(llm_registry: LLMRegistryDep):
     # raise Exception("An error occurred")
-    llm = LLMService()
+    llm = llm_registry.get()
    
     response = llm.greet()
     return {"message": response.content}
\ No newline at end of file
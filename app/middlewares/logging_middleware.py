@@ -1,107 +1,89 @@
 import json
 import logging
-import traceback
-from typing import Union
-import uuid
+import random
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from pydantic import BaseModel
-
-logger = logging.getLogger("request")
-
-class RequestInfo:
-    def __init__(self, request: Request) -> None:
-        self.request = request
-
-    @property
-    def method(self) -> str:
-        return str(self.request.method)
-
-    @property
-    def route(self) -> str:
-        return self.request["path"]
-
-    @property
-    def ip(self) -> str:
-        return str(self.request.client.host)
-
-    @property
-    def url(self) -> str:
-        return str(self.request.url)
-
-    @property
-    def host(self) -> str:
-        return str(self.request.url.hostname)
-
-    @property
-    def headers(self) -> dict:
-        return {key: value for key, value in self.request.headers.items()}
+import uuid
+from typing import Optional
 
-    @property
-    def body(self) -> Union[dict, None]:
-        return self.request.state.body
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class RequestLog(BaseModel):
-    req_id: str
-    method: str
-    route: str
-    ip: str
-    url: str
-    host: str
-    body: Union[dict, None]
-    headers: dict
-    duration_ms: float
+from app.core.config.config import settings
 
-class ErrorLog(BaseModel):
-    req_id: str
-    error_message: str
+logger = logging.getLogger("request")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
-        request.state.req_id = request_id
 
-        request_body = await request.body()
+class LoggingMiddleware:
+    """
+    Pure ASGI access log middleware.
+
+    Only request metadata is captured on the event loop: the request body is never buffered, a sampled share of
+    requests get the first body_max_bytes of their body logged as they are streamed to the app. The response is
+    passed through untouched, so streaming responses keep streaming. Records are written by the QueueListener
+    configured in setup_logging.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        body_sample_rate: float = settings.REQUEST_LOG_BODY_SAMPLE_RATE,
+        body_max_bytes: int = settings.REQUEST_LOG_BODY_MAX_BYTES,
+    ):
+        self.app = app
+        self.body_sample_rate = body_sample_rate
+        self.body_max_bytes = body_max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Request ids only need to be unique, os.urandom behind uuid4 is a syscall per request
+        request_id = str(uuid.UUID(int=random.getrandbits(128), version=4))
+        # Exposed to the routes as request.state.req_id
+        scope.setdefault("state", {})["req_id"] = request_id
+        status_code: Optional[int] = None
+        body: Optional[bytearray] = None
+
+        if self.body_sample_rate > 0 and random.random() < self.body_sample_rate:
+            body = bytearray()
+            inner_receive = receive
+
+            async def receive() -> Message:
+                message = await inner_receive()
+                if message["type"] == "http.request" and len(body) < self.body_max_bytes:
+                    body.extend(message.get("body", b"")[: self.body_max_bytes - len(body)])
+                return message
+
+        async def send_with_request_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("ascii"))]
+            await send(message)
+
+        start_time = time.perf_counter()
         try:
-            request.state.body = json.loads(request_body.decode("utf-8")) if request_body else None
-        except json.JSONDecodeError:
-            request.state.body = None
-
-        try:
-            # Log the request
-            request_info = RequestInfo(request)
-            request_log = RequestLog(
-                req_id=request_id,
-                method=request_info.method,
-                route=request_info.route,
-                ip=request_info.ip,
-                url=request_info.url,
-                host=request_info.host,
-                body=request_info.body,
-                headers=request_info.headers,
-                duration_ms=0.0  # Placeholder, will be updated after response
-            )
-            
-
-            # Process the request
-            start_time = time.perf_counter()
-
-            response = await call_next(request)
-
-            # Calculate the duration
-            process_time = time.perf_counter() - start_time
-            duration_ms = process_time * 1000
-            request_log.duration_ms = duration_ms
-            logger.info(request_log.model_dump())
-
-            return response
-
+            await self.app(scope, receive, send_with_request_id)
         except Exception as e:
-            # Log the error
-            error_log = ErrorLog(
-                req_id=request_id,
-                error_message=str(e),
-            )
-            logger.error(error_log.model_dump())
-            logger.error(traceback.format_exc())
\ No newline at end of file
+            logger.error(json.dumps({"req_id": request_id, "error_message": str(e)}))
+            # A failure before the response started is answered with a 500 by the ServerErrorMiddleware
+            status_code = status_code or 500
+            raise
+        finally:
+            self._log(scope, request_id, status_code, (time.perf_counter() - start_time) * 1000, body)
+
+    def _log(self, scope: Scope, request_id: str, status_code: Optional[int], duration_ms: float, body: Optional[bytearray]):
+        client = scope.get("client")
+        record = {
+            "req_id": request_id,
+            "method": scope["method"],
+            "route": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "ip": client[0] if client else None,
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 3),
+        }
+        if body is not None:
+            record["body"] = body.decode("utf-8", errors="replace")
+            record["body_truncated"] = len(body) >= self.body_max_bytes
+        logger.info(json.dumps(record))
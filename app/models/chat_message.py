@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Index, String, Text
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.config.database.db import Base
+from app.models.types import utcnow
+
+
+class ChatMessage(Base):
+    """
+    A message of a QA chat session. Rows are only ever appended, compaction deletes the old ones.
+    """
+    __tablename__ = 'chat_messages'
+    __table_args__ = (
+        # Reads of the last turns of a session
+        Index('ix_chat_messages_session_id_id', 'session_id', 'id'),
+        Index('ix_chat_messages_created_at', 'created_at'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[str] = mapped_column(String(80), nullable=False)
+    # The langchain message type: human, ai or system
+    role: Mapped[str] = mapped_column(String(20), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Naive UTC, set in Python so compaction can compare it on every database
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
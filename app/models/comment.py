@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy import ForeignKey, Index, String, Text, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from typing import List, Optional, TYPE_CHECKING
 from enum import Enum
@@ -8,6 +8,7 @@ import uuid
 
 from app.core.config.database.db import Base
 from app.models.base_model_mixin import BaseModelMixin
+from app.models.types import GUID, utcnow
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -19,21 +20,52 @@ class SentimentEnum(str, Enum):
     INAPPROPRIATE = "INAPPROPRIATE"
     NOT_ANALYZED = "NOT_ANALYZED"
 
+class UnanalyzedCommentsPolicy(str, Enum):
+    SHOW = "SHOW"
+    HIDE = "HIDE"
+
 class Comment(Base, BaseModelMixin):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Top-level comments of a post in (created_at, id) order
+        Index(
+            'ix_comments_post_roots', 'post_id', 'created_at', 'id',
+            postgresql_where=text('parent_comment_id IS NULL AND is_deleted IS false'),
+            sqlite_where=text('parent_comment_id IS NULL AND is_deleted IS 0'),
+        ),
+        # Walking down a thread one level at a time
+        Index(
+            'ix_comments_parent_comment_id', 'parent_comment_id',
+            postgresql_where=text('is_deleted IS false'),
+            sqlite_where=text('is_deleted IS 0'),
+        ),
+        # Soft deleting every comment of a post
+        Index('ix_comments_post_id', 'post_id'),
+        Index('ix_comments_commenter_id', 'commenter_id'),
+        # Comments waiting for the sentiment workers
+        Index(
+            'ix_comments_not_analyzed_created_at', 'created_at',
+            postgresql_where=text("sentiment = 'NOT_ANALYZED' OR sentiment IS NULL"),
+            sqlite_where=text("sentiment = 'NOT_ANALYZED' OR sentiment IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+        GUID, primary_key=True, default=lambda: str(uuid.uuid4())
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now())
+    # Naive UTC set in Python, the (created_at, id) keyset of the top-level comments compares it with the cursor
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=utcnow, onupdate=utcnow)
 
-    post_id: Mapped[Optional[uuid.UUID]] = mapped_column(String, ForeignKey('posts.id'), nullable=True)
-    parent_comment_id: Mapped[Optional[uuid.UUID]] = mapped_column(String, ForeignKey('comments.id'), nullable=True)
-    commenter_id: Mapped[uuid.UUID] = mapped_column(String, ForeignKey('users.id'), nullable=False)
+    post_id: Mapped[Optional[uuid.UUID]] = mapped_column(GUID, ForeignKey('posts.id'), nullable=True)
+    parent_comment_id: Mapped[Optional[uuid.UUID]] = mapped_column(GUID, ForeignKey('comments.id'), nullable=True)
+    commenter_id: Mapped[uuid.UUID] = mapped_column(GUID, ForeignKey('users.id'), nullable=False)
 
     sentiment: Mapped[SentimentEnum] = mapped_column(String, default=SentimentEnum.NOT_ANALYZED)
+    # Lease taken by a sentiment worker so that each comment is classified once across processes
+    sentiment_claim: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    sentiment_claimed_until: Mapped[Optional[datetime]] = mapped_column(nullable=True)
 
     commenter: Mapped['User'] = relationship('User', back_populates='comments')
     post: Mapped['Post'] = relationship('Post', back_populates='comments')
@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import LargeBinary, String, func
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.config.database.db import Base
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = 'embedding_cache'
+
+    model: Mapped[str] = mapped_column(String(200), primary_key=True)
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # float32 values packed with array('f').tobytes()
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
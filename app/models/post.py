@@ -1,6 +1,6 @@
 
 from datetime import datetime
-from sqlalchemy import  ForeignKey, String, Text, func
+from sqlalchemy import  ForeignKey, Index, String, Text, text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from typing import List, Optional, TYPE_CHECKING
 
@@ -11,6 +11,7 @@ import enum
 from app.core.config.database.db import Base
 from app.models.base_model_mixin import BaseModelMixin
 from app.models.comment import Comment
+from app.models.types import GUID, utcnow
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -23,18 +24,28 @@ class PostStatus(str,enum.Enum):
 
 class Post(Base, BaseModelMixin):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Published post listing: status filter, (created_at, id) keyset order, soft deleted rows excluded
+        Index(
+            'ix_posts_status_created_at_id', 'status', 'created_at', 'id',
+            postgresql_where=text('is_deleted IS false'),
+            sqlite_where=text('is_deleted IS 0'),
+        ),
+        Index('ix_posts_author_id', 'author_id'),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+        GUID, primary_key=True, default=lambda: str(uuid.uuid4())
     )
     title: Mapped[str] = mapped_column(String, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     status: Mapped[str] = mapped_column(String(20), default=PostStatus.DRAFT.value)
     _tags: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(default=func.now()) 
-    updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now())
+    # Naive UTC set in Python, the (created_at, id) keyset compares it with the cursor
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=utcnow, onupdate=utcnow)
     
-    author_id: Mapped[uuid.UUID] = mapped_column(String, ForeignKey('users.id'), nullable=False)
+    author_id: Mapped[uuid.UUID] = mapped_column(GUID, ForeignKey('users.id'), nullable=False)
 
     author: Mapped['User'] = relationship('User', back_populates='posts')
     comments: Mapped[List['Comment']] = relationship('Comment', back_populates='post', lazy="select")
@@ -0,0 +1,16 @@
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.config.database.db import Base
+from app.models.types import GUID
+
+
+class PostChunk(Base):
+    """
+    The sha256 of every chunk stored in the vector store for a post, to re-embed only the chunks an edit changed.
+    """
+    __tablename__ = 'post_chunks'
+
+    post_id: Mapped[str] = mapped_column(GUID, ForeignKey('posts.id'), primary_key=True)
+    chunk_index: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
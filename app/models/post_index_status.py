@@ -0,0 +1,26 @@
+import enum
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.config.database.db import Base
+from app.models.types import GUID
+
+
+class IndexStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    INDEXED = "INDEXED"
+    FAILED = "FAILED"
+
+
+class PostIndexStatus(Base):
+    __tablename__ = 'post_index_status'
+
+    post_id: Mapped[str] = mapped_column(GUID, ForeignKey('posts.id'), primary_key=True)
+    # sha256 of the embedding model and the content the stored chunks were embedded from
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default=IndexStatus.PENDING.value)
+    chunk_count: Mapped[int] = mapped_column(default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now())
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.config.database.db import Base
+from app.models.types import GUID
+
+
+class PostSummary(Base):
+    __tablename__ = 'post_summaries'
+
+    post_id: Mapped[str] = mapped_column(GUID, ForeignKey('posts.id'), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    prompt_version: Mapped[str] = mapped_column(String(20), primary_key=True)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
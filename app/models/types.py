@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import UUID
+
+# Native uuid columns on PostgreSQL, plain strings on SQLite. Values are handled as str in Python either way.
+GUID = String(36).with_variant(UUID(as_uuid=False), "postgresql")
+
+
+def utcnow() -> datetime:
+    """
+    Naive UTC with microseconds, set in Python rather than with func.now() so that the stored values compare
+    with bound datetimes on every database. SQLite stores CURRENT_TIMESTAMP without the fraction, which breaks
+    keyset pagination on rows created within the same second.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -2,12 +2,12 @@ from datetime import datetime
 from typing import List, TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, func
-from sqlalchemy.dialects.postgresql import UUID
 
 import uuid
 import enum
 
 from app.models.base_model_mixin import BaseModelMixin
+from app.models.types import GUID
 from app.models.post import Post
 from app.core.config.database.db import Base
 
@@ -34,7 +34,7 @@ class User(Base, BaseModelMixin):
     __tablename__= "users"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+        GUID, primary_key=True, default=lambda: str(uuid.uuid4())
     )
     name: Mapped[str] = mapped_column(String(50))
     email: Mapped[str] = mapped_column(String(100), unique=True)
@@ -15,11 +15,14 @@ class CommentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     parent_comment_id: Optional[uuid.UUID] = None
-    sentiment: str
+    sentiment: Optional[str] = None
     
 class CommentResponseWithReplies(CommentResponse):
-    replies: Optional[List[CommentResponse]] = None
-    pass
+    replies: List["CommentResponseWithReplies"] = []
+
+class CommentThreadPage(BaseModel):
+    items: List[CommentResponseWithReplies]
+    next_cursor: Optional[str] = None
 
 class CommentUpdateRequest(BaseModel):
     content: str
\ No newline at end of file
@@ -1,8 +1,14 @@
 from langchain.output_parsers import PydanticOutputParser
+from langchain_core.output_parsers import JsonOutputParser
 from app.schemas.post import CommentAnalysisResponse, PostSummaryResponse, PostSuggestionsResponse
 
 summary_res_parser = PydanticOutputParser(pydantic_object=PostSummaryResponse)
 
+# Yields the partially generated JSON object while the summary streams, same prompt as summary_res_parser
+summary_stream_parser = JsonOutputParser(pydantic_object=PostSummaryResponse)
+
 suggestions_res_parser = PydanticOutputParser(pydantic_object=PostSuggestionsResponse)
 
-comment_analysis_res_parser = PydanticOutputParser(pydantic_object=CommentAnalysisResponse)
\ No newline at end of file
+comment_analysis_res_parser = PydanticOutputParser(pydantic_object=CommentAnalysisResponse)
+
+comment_batch_analysis_res_parser = JsonOutputParser()
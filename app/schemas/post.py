@@ -44,6 +44,10 @@ class PostListResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class PostListPage(BaseModel):
+    items: List[PostListResponse]
+    next_cursor: Optional[str] = None
+
 
 class PostSummaryResponse(BaseModel):
     summary: str
@@ -1,34 +1,60 @@
 import logging
 
+from typing import List, Optional, Tuple
 from uuid import UUID
 from starlette.requests import Request
 
 
-from app.api.deps import SessionDep
+from app.api.deps import SentimentWorkersDep, SessionDep
 from app.crud.post import PostCRUD
 from app.models.comment import Comment
 from app.models.user import User, UserRole
-from app.schemas.comment import CommentCreateRequest
+from app.schemas.comment import CommentCreateRequest, CommentResponse, CommentResponseWithReplies, CommentThreadPage
 from app.crud.comment import CommentCRUD
-from app.exceptions.exceptions import AppBaseException, ForbiddenException, ResourceNotFoundException, DatabaseExeption, SentimentAnalysisInitException, SentimentInvokeException
-from app.services.comment_analysis import CommentAnalysisService
+from app.exceptions.exceptions import AppBaseException, ForbiddenException, ResourceNotFoundException, DatabaseExeption
 
 logger = logging.getLogger(__name__)
 
+def build_comment_tree(rows: List[Tuple[Comment, int]]) -> List[CommentResponseWithReplies]:
+    """
+    Nest comments under their parents in a single pass.
+
+    Args:
+        rows (List[Tuple[Comment, int]]): Comments with their depth, parents before their replies
+
+    Returns:
+        List[CommentResponseWithReplies]: The top-level comments with their replies
+    """
+    nodes = {}
+    top_level = []
+    for comment, depth in rows:
+        # Copy the columns only, reading comment.replies would lazy load every level again
+        node = CommentResponseWithReplies(
+            **{field: getattr(comment, field) for field in CommentResponse.model_fields},
+            replies=[],
+        )
+        nodes[comment.id] = node
+        if depth == 0:
+            top_level.append(node)
+        else:
+            nodes[comment.parent_comment_id].replies.append(node)
+    return top_level
+
 class CommentService:
     """
     Service class for managing comments. This class provides methods to create, retrieve, reply to, update, and delete comments.
     """
 
-    def __init__(self, db: SessionDep):
+    def __init__(self, db: SessionDep, sentiment_workers: SentimentWorkersDep):
         """
         Initialize the CommentService with a database session dependency.
 
         Args:
             db (SessionDep): Database session dependency
-            request (Request): The current request object
+            sentiment_workers (SentimentWorkersDep): Workers analyzing comment sentiments in the background
         """
         self.db = db
+        self.sentiment_workers = sentiment_workers
         self.post_crud = PostCRUD(db=self.db)
         self.comment_crud = CommentCRUD(db=self.db)
 
@@ -47,36 +73,32 @@ class CommentService:
         Raises:
             DatabaseException: If there is an error in the database operation
         """
-        
-        sentiment = None
-        try:
-            comment_analysis_service = CommentAnalysisService()
-            sentiment_response = comment_analysis_service.sentiment_analysis(comment_data.content)
-            sentiment = sentiment_response.sentiment if sentiment_response else None
-        except SentimentAnalysisInitException:
-            logger.warning("Sentiment analysis service is not available")
-        
-        except SentimentInvokeException:
-            logger.warning("Failed to analyze comment sentiment")
-        
         try:
             logger.info(f"Creating a new comment for post {post_id} by user {author.id}")
-            return self.comment_crud.create_comment(commenter=author, post_id=str(post_id), comment_data=comment_data, sentiment=sentiment)
+            # The sentiment is analyzed in the background, the comment is NOT_ANALYZED until then
+            comment = self.comment_crud.create_comment(commenter=author, post_id=str(post_id), comment_data=comment_data)
+            self.sentiment_workers.enqueue(comment.id)
+            return comment
         except DatabaseExeption as e:
             logger.error(f"Error while creating comment: {str(e)}")
             raise AppBaseException("Cannot create comment") from e
 
-    def get_post_comments(self, post_id: UUID) -> list[Comment]:
+    def get_post_comments(self, post_id: UUID, limit: int, cursor: Optional[str] = None, max_depth: Optional[int] = None) -> CommentThreadPage:
         """
-        Retrieve all comments for a post.
+        Retrieve a page of top-level comments of a post with their nested replies.
 
         Args:
             post_id (UUID): The ID of the post
+            limit (int): The maximum number of top-level comments to return
+            cursor (Optional[str]): The cursor returned with the previous page
+            max_depth (Optional[int]): The deepest reply level to load, unlimited by default
 
         Returns:
-            list[Comment]: A list of Comment objects
+            CommentThreadPage: The comment threads and the cursor of the next page
 
         Raises:
+            ResourceNotFoundException: If the post is not found
+            InvalidInputException: If the cursor is malformed
             DatabaseException: If there is an error in the database operation
         """
         try:
@@ -85,7 +107,10 @@ class CommentService:
                 raise ResourceNotFoundException("Post not found")
             
             logger.info(f"Retrieving comments for post {post_id}")
-            return self.comment_crud.get_post_comments(post_id=str(post_id))
+            rows, next_cursor = self.comment_crud.get_post_comment_tree(
+                post_id=str(post_id), limit=limit, cursor=cursor, max_depth=max_depth
+            )
+            return CommentThreadPage(items=build_comment_tree(rows), next_cursor=next_cursor)
         except DatabaseExeption as e:
             logger.error(f"Error while retrieving comments for post {post_id}: {str(e)}")
             raise AppBaseException("Cannot get comments") from e
@@ -138,7 +163,9 @@ class CommentService:
         try:
             logger.info(f"Replying to comment {comment_id} by user {author.id}")
             parent_comment = self.get_comment(comment_id)
-            return self.comment_crud.reply_to_comment(replier=author, parent_comment=parent_comment, reply_data=reply_data)
+            reply = self.comment_crud.reply_to_comment(replier=author, parent_comment=parent_comment, reply_data=reply_data)
+            self.sentiment_workers.enqueue(reply.id)
+            return reply
         except ResourceNotFoundException as e:
             logger.warning(f"Parent comment {comment_id} not found: {str(e)}")
             raise
@@ -1,17 +1,25 @@
 import logging
+from typing import Dict, Optional
 
 
 from langchain_core.exceptions import OutputParserException
 
-from app.core.config.llm.llm import LLMService
-from app.core.config.llm.prompt_templates import comment_analysis_template
+from app.core.config.config import settings
+from app.core.config.llm.llm import LLMRegistry, llm_registry
+from app.core.config.llm.prompt_templates import comment_analysis_template, comment_batch_analysis_template
 from app.core.config.llm.token_usage import TokenUsageHandler
 from app.exceptions.exceptions import LLMInitException, SentimentAnalysisInitException, SentimentInvokeException
-from app.schemas.llm_responses_parsers import comment_analysis_res_parser
+from app.models.comment import SentimentEnum
+from app.schemas.llm_responses_parsers import comment_analysis_res_parser, comment_batch_analysis_res_parser
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_sentiment(value) -> Optional[SentimentEnum]:
+    try:
+        return SentimentEnum(str(value).strip().upper())
+    except ValueError:
+        return None
 
 
 class CommentAnalysisService:
@@ -19,19 +27,29 @@ class CommentAnalysisService:
     A service class for performing sentiment analysis on comments using a language model.
 
     Attributes:
-        llm_service (LLMService): An instance of the LLMService class with a specified temperature.
+        llm_service (LLMService): The shared LLMService instance with a specified temperature.
         prompt_template (function): A function that returns the prompt template for comment analysis.
         chain (Chain): A chain of operations combining the prompt template, language model, and result parser.
+        batch_chain (Chain): A chain classifying several comments in a single prompt.
     """
         
-    def __init__(self):
+    def __init__(self, llm_registry: LLMRegistry = llm_registry):
         """
         Initializes the CommentAnalysisService with an LLMService instance, a prompt template, and a chain of operations.
+
+        Args:
+            llm_registry (LLMRegistry): The registry holding the shared LLM clients and chains.
         """
         try:
-            self.llm_service = LLMService(temperature=0.7)
+            self.llm_service = llm_registry.get(temperature=0.7)
             self.prompt_template = comment_analysis_template()
-            self.chain = self.prompt_template | self.llm_service.llm | comment_analysis_res_parser
+            self.chain = llm_registry.get_chain(
+                "comment_analysis", 0.7, lambda llm_service: self.prompt_template | llm_service.llm | comment_analysis_res_parser
+            )
+            self.batch_chain = llm_registry.get_chain(
+                "comment_batch_analysis", 0.7,
+                lambda llm_service: comment_batch_analysis_template() | llm_service.llm | comment_batch_analysis_res_parser
+            )
 
         except LLMInitException as e:
             raise SentimentAnalysisInitException("Sentiment analysis service is not available") from e
@@ -64,4 +82,99 @@ class CommentAnalysisService:
 
         except Exception as e:
             logger.exception(f"Failed to analyze comment: {str(e)}")
-            raise SentimentInvokeException("Failed to analyze comment") from e
\ No newline at end of file
+            raise SentimentInvokeException("Failed to analyze comment") from e
+
+    def sentiment_analysis_many(self, comments: Dict[str, str], max_concurrency: int = settings.SENTIMENT_MAX_CONCURRENCY) -> Dict[str, SentimentEnum]:
+        """
+        Analyzes several comments with one LLM call per comment, running at most max_concurrency calls at once.
+
+        Args:
+            comments (Dict[str, str]): The comments to analyze, keyed by comment ID.
+            max_concurrency (int): The maximum number of LLM calls in flight.
+
+        Returns:
+            Dict[str, SentimentEnum]: The sentiment of every comment that could be analyzed, keyed by comment ID.
+        """
+        if not comments:
+            return {}
+
+        comment_ids = list(comments)
+        token_handler = TokenUsageHandler()
+        responses = self.chain.batch(
+            [{"content": comments[comment_id]} for comment_id in comment_ids],
+            config={"callbacks": [token_handler], "max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        token_handler.log_token_usage(logger)
+
+        sentiments = {}
+        for comment_id, response in zip(comment_ids, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"Failed to analyze comment {comment_id}: {str(response)}")
+                continue
+            sentiment = _parse_sentiment(response.sentiment)
+            if sentiment is None:
+                logger.warning(f"Unknown sentiment {response.sentiment} for comment {comment_id}")
+                continue
+            sentiments[comment_id] = sentiment
+
+        logger.info(f"Analyzed {len(sentiments)}/{len(comments)} comments, {token_handler.total_tokens / len(comments):.1f} tokens per comment")
+        return sentiments
+
+    def batch_sentiment_analysis(self, comments: Dict[str, str]) -> Dict[str, SentimentEnum]:
+        """
+        Analyzes several comments in a single prompt so the system prompt is only sent once.
+
+        Comments missing from the response or with an invalid sentiment are analyzed again one by one. A reply
+        that can not be parsed, or a failed call, is raised instead so that the caller retries the whole batch
+        after a backoff rather than sending one call per comment to a failing provider.
+
+        Args:
+            comments (Dict[str, str]): The comments to analyze, keyed by comment ID.
+
+        Returns:
+            Dict[str, SentimentEnum]: The sentiment of every comment that could be analyzed, keyed by comment ID.
+
+        Raises:
+            SentimentInvokeException: If the batch could not be analyzed or its response could not be parsed.
+        """
+        if not comments:
+            return {}
+
+        sentiments = {}
+        prompt_comments = "\n".join(
+            f'<Comment id="{comment_id}">{content}</Comment>' for comment_id, content in comments.items()
+        )
+        try:
+            token_handler = TokenUsageHandler()
+            response = self.batch_chain.invoke(
+                {"comments": prompt_comments},
+                config={"callbacks": [token_handler]}
+            )
+            token_handler.log_token_usage(logger)
+            logger.info(f"Batch of {len(comments)} comments used {token_handler.total_tokens / len(comments):.1f} tokens per comment")
+
+            if not isinstance(response, list):
+                raise OutputParserException(f"Expected a JSON array, got {type(response).__name__}")
+
+        except OutputParserException as e:
+            logger.warning(f"Failed to parse the batch response: {str(e)}")
+            raise SentimentInvokeException("Failed to parse the batch response") from e
+
+        except Exception as e:
+            logger.warning(f"Failed to analyze batch of comments: {str(e)}")
+            raise SentimentInvokeException("Failed to analyze batch of comments") from e
+
+        for item in response:
+            if not isinstance(item, dict):
+                continue
+            comment_id = str(item.get("id"))
+            sentiment = _parse_sentiment(item.get("sentiment"))
+            if comment_id in comments and sentiment is not None:
+                sentiments[comment_id] = sentiment
+
+        missing = {comment_id: content for comment_id, content in comments.items() if comment_id not in sentiments}
+        if missing:
+            logger.info(f"Falling back to single comment analysis for {len(missing)} comments")
+            sentiments.update(self.sentiment_analysis_many(missing))
+        return sentiments
@@ -1,30 +1,198 @@
-from uuid import UUID
+import logging
 
-from app.api.deps import SessionDep
+from typing import AsyncIterator, Optional, Tuple
+from uuid import UUID
+from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import AsyncSessionDep, LLMRegistryDep, SessionDep
+from app.core.cache import hash_text
+from app.core.singleflight import async_llm_single_flight, llm_single_flight
+from app.core.config.database.db import AsyncSessionLocal, SessionLocal
+from app.core.config.llm.llm import LLMRegistry
+from app.core.config.llm.prompt_templates import SUGGESTION_PROMPT_VERSION, SUMMARY_PROMPT_VERSION
+from app.core.config.llm.stream_metrics import stream_metrics
 from app.models.post import Post, PostStatus
 from app.models.user import User, UserRole
-from app.schemas.post import PostCreate, PostQAResponse, PostSuggestionsResponse, PostUpdate
-from app.crud.post import PostCRUD
-from app.exceptions.exceptions import AppBaseException, ForbiddenException, QAInitException, QAInvokeException, ResourceNotFoundException, DatabaseExeption, SuggestionInvokeException, SuggestionServiceInitException, SummarizationInitException, SummarizationInvokeException
+from app.schemas.post import PostCreate, PostListPage, PostQAResponse, PostSuggestionsResponse, PostSummaryResponse, PostUpdate
+from app.crud.post import AsyncPostCRUD, PostCRUD
+from app.crud.post_summary import AsyncPostSummaryCRUD, PostSummaryCRUD
+from app.exceptions.exceptions import AppBaseException, EmbeddingInitException, ForbiddenException, VectorStoreInitException, VectorStoreOpException, QAInitException, QAInvokeException, ResourceNotFoundException, DatabaseExeption, SuggestionInvokeException, SuggestionServiceInitException, SummarizationInitException, SummarizationInvokeException
+from app.services.post_indexing import ensure_post_indexed, sync_post_index
 from app.services.question_answer.question_answer import QuestionAnswerService
 from app.services.suggestion import SuggestionService
 from app.services.summarization import SummarizationService
 
+logger = logging.getLogger(__name__)
+
+
+def get_or_create_summary(db: Session, post: Post, llm_registry: LLMRegistry) -> str:
+    """
+    Return the summary of a post, generating and storing it only if the current content was never summarized.
+
+    Args:
+        db (Session): SQLAlchemy database session
+        post (Post): The post to summarize
+        llm_registry (LLMRegistry): Registry of the shared LLM clients
+
+    Returns:
+        str: The summary of the post content
+
+    Raises:
+        SummarizationInitException: If the summarization service is not available
+        SummarizationInvokeException: If the summary can not be generated
+        DatabaseException: If the stored summary can not be read
+    """
+    summary_crud = PostSummaryCRUD(db=db)
+    content_hash = hash_text(post.content)
+    summary = summary_crud.get_summary(post.id, content_hash, SUMMARY_PROMPT_VERSION)
+    if summary is not None:
+        return summary
+
+    service = SummarizationService(llm_registry=llm_registry)
+
+    def store(summary: str):
+        try:
+            summary_crud.save_summary(post.id, content_hash, SUMMARY_PROMPT_VERSION, summary)
+        except DatabaseExeption:
+            logger.warning(f"Failed to store summary for post {post.id}")
+
+    def generate() -> Tuple[str, str]:
+        summary = service.summarize(post.content).summary
+        store(summary)
+        return str(post.id), summary
+
+    # Concurrent requests for the same content share one LLM call, e.g. a post and its copy
+    summarized_post_id, summary = llm_single_flight.do(("summary", SUMMARY_PROMPT_VERSION, content_hash), generate)
+    if summarized_post_id != str(post.id):
+        # The call was made for another post with the same content
+        store(summary)
+    return summary
+
+
+async def aget_or_create_summary(db: AsyncSession, post: Post, llm_registry: LLMRegistry) -> str:
+    """
+    Async variant of get_or_create_summary.
+
+    Raises:
+        ServiceBusyException: If no LLM slot was free in time
+        SummarizationInitException: If the summarization service is not available
+        SummarizationInvokeException: If the summary can not be generated
+        DatabaseException: If the stored summary can not be read
+    """
+    summary_crud = AsyncPostSummaryCRUD(db=db)
+    content_hash = hash_text(post.content)
+    summary = await summary_crud.get_summary(post.id, content_hash, SUMMARY_PROMPT_VERSION)
+    if summary is not None:
+        return summary
+
+    service = SummarizationService(llm_registry=llm_registry)
+    post_id, content = str(post.id), post.content
+
+    async def generate() -> Tuple[str, str]:
+        summary = (await service.asummarize(content)).summary
+        # Stored from its own session, the request that started the call may be gone by now
+        await astore_post_summary(post_id, content_hash, summary)
+        return post_id, summary
+
+    # Concurrent requests for the same content share one LLM call, e.g. a post and its copy
+    summarized_post_id, summary = await async_llm_single_flight.do(("summary", SUMMARY_PROMPT_VERSION, content_hash), generate)
+    if summarized_post_id != post_id:
+        # The call was made for another post with the same content
+        await astore_post_summary(post_id, content_hash, summary)
+    return summary
+
+
+async def astore_post_summary(post_id: str, content_hash: str, summary: str):
+    """
+    Store a summary generated outside of a request session, e.g. at the end of a stream.
+
+    Args:
+        post_id (str): The ID of the summarized post
+        content_hash (str): The sha256 hash of the summarized content
+        summary (str): The generated summary
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            await AsyncPostSummaryCRUD(db=db).save_summary(post_id, content_hash, SUMMARY_PROMPT_VERSION, summary)
+        except DatabaseExeption:
+            logger.warning(f"Failed to store summary for post {post_id}")
+
+
+def _ensure_post_indexed(post: Post):
+    # ensure_post_indexed works on a sync session and the sync vector store, so it runs in the threadpool
+    db = SessionLocal()
+    try:
+        ensure_post_indexed(db, post)
+    finally:
+        db.close()
+
+
+async def _single_token(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+def precompute_post_summary(post_id: str, llm_registry: LLMRegistry):
+    """
+    Background task that generates the summary of a freshly published post.
+
+    Args:
+        post_id (str): The ID of the published post
+        llm_registry (LLMRegistry): Registry of the shared LLM clients
+    """
+    db = SessionLocal()
+    try:
+        post = PostCRUD(db=db).get_post(post_id)
+        if post:
+            get_or_create_summary(db, post, llm_registry)
+            logger.info(f"Precomputed summary for post {post_id}")
+    except AppBaseException as e:
+        logger.warning(f"Failed to precompute summary for post {post_id}: {str(e)}")
+    finally:
+        db.close()
+
+
 class PostService:
     """
-    Service class for managing blog posts. This class provides methods to create, retrieve, update, delete, and summarize posts.
+    Service class for managing blog posts. This class provides methods to create, retrieve, update and delete posts.
+    The LLM features are served by the AsyncPostService.
     """
 
-    def __init__(self, db: SessionDep = SessionDep):
+    def __init__(self, llm_registry: LLMRegistryDep, background_tasks: BackgroundTasks, db: SessionDep = SessionDep):
         """
         Initialize the PostService with a database session dependency.
 
         Args:
+            llm_registry (LLMRegistryDep): Registry of the shared LLM clients
+            background_tasks (BackgroundTasks): Tasks run after the response is sent
             db (SessionDep): Database session dependency
         """
         self.db = db
+        self.llm_registry = llm_registry
+        self.background_tasks = background_tasks
         self.post_crud = PostCRUD(db=self.db)
 
+    def _schedule_summary(self, post: Post):
+        """
+        Precompute the summary of a published post in the background.
+
+        Args:
+            post (Post): The created or updated post
+        """
+        if post.status == PostStatus.PUBLISHED:
+            self.background_tasks.add_task(precompute_post_summary, str(post.id), self.llm_registry)
+
+    def _schedule_index(self, post_id: str):
+        """
+        Index or unindex a post in the vector store in the background, so chats only retrieve.
+
+        Args:
+            post_id (str): The ID of the created, updated or deleted post
+        """
+        self.background_tasks.add_task(sync_post_index, str(post_id))
+
     def create_post(self, author, post_data: PostCreate) -> Post:
         """
         Create a new post.
@@ -40,7 +208,11 @@ class PostService:
             DatabaseException: If there is an error in the database operation
         """
         try:
-            return self.post_crud.create_post(author=author, post_data=post_data)
+            post = self.post_crud.create_post(author=author, post_data=post_data)
+            self._schedule_summary(post)
+            if post.status == PostStatus.PUBLISHED:
+                self._schedule_index(post.id)
+            return post
         except DatabaseExeption as e:
             raise AppBaseException("Cannot create post") from e
 
@@ -66,13 +238,14 @@ class PostService:
         except DatabaseExeption as e:
             raise AppBaseException("Cannot get post") from e
 
-    def update_post(self, post_id: UUID, post_data: PostUpdate) -> Post:
+    def update_post(self, post_id: UUID, post_data: PostUpdate, current_user: User) -> Post:
         """
-        Update an existing post.
+        Update an existing post of the current user.
 
         Args:
             post_id (UUID): The UUID of the post to update
             post_data (PostUpdate): Data required to update the post
+            current_user (User): The author, the posts of other authors are not found
 
         Returns:
             Post: The updated Post object
@@ -82,25 +255,34 @@ class PostService:
             DatabaseException: If there is an error in the database operation
         """
         try:
-            post = self.post_crud.update_post(post_id=post_id, post_data=post_data)
+            post = self.post_crud.update_post(post_id=post_id, post_data=post_data, author_id=current_user.id)
             if not post:
                 raise ResourceNotFoundException("Post not found")
+            if post_data.content is not None or post_data.status is not None:
+                self._schedule_summary(post)
+                self._schedule_index(post.id)
             return post
         except DatabaseExeption as e:
             raise AppBaseException("Cannot update post") from e
 
-    def get_posts(self) -> list[Post]:
+    def get_posts(self, limit: int, cursor: Optional[str] = None) -> PostListPage:
         """
-        Retrieve all posts.
+        Retrieve a page of published posts.
+
+        Args:
+            limit (int): The maximum number of posts to return
+            cursor (Optional[str]): The cursor returned with the previous page
 
         Returns:
-            list[Post]: A list of Post objects
+            PostListPage: The posts and the cursor of the next page
 
         Raises:
+            InvalidInputException: If the cursor is malformed
             DatabaseException: If there is an error in the database operation
         """
         try:
-            return self.post_crud.get_posts()
+            posts, next_cursor = self.post_crud.get_posts(limit=limit, cursor=cursor)
+            return PostListPage.model_validate({"items": posts, "next_cursor": next_cursor}, from_attributes=True)
         except DatabaseExeption as e:
             raise AppBaseException("Cannot get posts") from e
 
@@ -123,42 +305,151 @@ class PostService:
             if post.author_id != current_user.id and current_user.user_role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
                 raise ForbiddenException("You are not authorized to delete this post")
             self.post_crud.delete_post(post)
+            self._schedule_index(post_id)
         except ResourceNotFoundException:
             raise
         except DatabaseExeption as e:
             raise AppBaseException("Cannot delete post") from e
-        
-    def summarize_post(self, post_id: UUID) -> str:
+
+
+class AsyncPostService:
+    """
+    Async variant of the read side of the PostService, used by the public post routes and the LLM routes.
+
+    LLM calls are awaited, so a slow model holds an LLM slot instead of a threadpool thread.
+    """
+
+    def __init__(self, llm_registry: LLMRegistryDep, db: AsyncSessionDep):
+        """
+        Initialize the AsyncPostService with an async database session dependency.
+
+        Args:
+            llm_registry (LLMRegistryDep): Registry of the shared LLM clients
+            db (AsyncSessionDep): Async database session dependency
+        """
+        self.db = db
+        self.llm_registry = llm_registry
+        self.post_crud = AsyncPostCRUD(db=self.db)
+
+    async def get_post(self, post_id: UUID) -> Post:
+        """
+        Retrieve a post by its ID.
+
+        Args:
+            post_id (UUID): The UUID of the post
+
+        Returns:
+            Post: The Post object
+
+        Raises:
+            ResourceNotFoundException: If the post is not found
+            AppBaseException: If there is an error in the database operation
+        """
+        try:
+            post = await self.post_crud.get_post(post_id=post_id)
+        except DatabaseExeption as e:
+            raise AppBaseException("Cannot get post") from e
+        if not post:
+            raise ResourceNotFoundException("Post not found")
+        return post
+
+    async def get_posts(self, limit: int, cursor: Optional[str] = None) -> PostListPage:
+        """
+        Retrieve a page of published posts.
+
+        Args:
+            limit (int): The maximum number of posts to return
+            cursor (Optional[str]): The cursor returned with the previous page
+
+        Returns:
+            PostListPage: The posts and the cursor of the next page
+
+        Raises:
+            InvalidInputException: If the cursor is malformed
+            AppBaseException: If there is an error in the database operation
+        """
+        try:
+            posts, next_cursor = await self.post_crud.get_posts(limit=limit, cursor=cursor)
+        except DatabaseExeption as e:
+            raise AppBaseException("Cannot get posts") from e
+        return PostListPage.model_validate({"items": posts, "next_cursor": next_cursor}, from_attributes=True)
+
+    async def summarize_post(self, post_id: UUID) -> PostSummaryResponse:
         """
-        Summarize the content of a post by its ID.
+        Summarize the content of a published post by its ID. Summaries are cached per content version.
 
         Args:
             post_id (UUID): The UUID of the post to summarize
 
         Returns:
-            str: A summary of the post content
+            PostSummaryResponse: A summary of the post content
 
         Raises:
             ResourceNotFoundException: If the post is not found
-            DatabaseException: If there is an error in the database operation
+            ServiceBusyException: If no LLM slot was free in time
+            AppBaseException: If the summary can not be generated
         """
+        post = await self.get_post(post_id)
         try:
-            post = self.get_post(post_id)
+            summary = await aget_or_create_summary(self.db, post, self.llm_registry)
+            return PostSummaryResponse(summary=summary)
+        except (SummarizationInitException, SummarizationInvokeException, DatabaseExeption) as e:
+            raise AppBaseException("Cannot summarize post") from e
 
-            if post.status != PostStatus.PUBLISHED:
-                raise ResourceNotFoundException("Post not found")
-            summarizarion_service = SummarizationService()
-            return summarizarion_service.summarize(post.content)
-        except ResourceNotFoundException:
-            raise
-        except (SummarizationInitException, SummarizationInvokeException) as e:
+    async def stream_summary(self, post_id: UUID) -> AsyncIterator[str]:
+        """
+        Summarize the content of a published post by its ID, streaming the summary as it is generated.
+
+        The post is looked up before returning, so a missing post raises here and not while streaming.
+        A cached summary is sent as a single token, a generated one is cached once the stream completes.
+
+        Args:
+            post_id (UUID): The UUID of the post to summarize
+
+        Returns:
+            AsyncIterator[str]: The parts of the summary
+
+        Raises:
+            ResourceNotFoundException: If the post is not found
+            AppBaseException: If the summarization service is not available
+        """
+        post = await self.get_post(post_id)
+        content_hash = hash_text(post.content)
+        try:
+            summary = await AsyncPostSummaryCRUD(db=self.db).get_summary(post.id, content_hash, SUMMARY_PROMPT_VERSION)
+            if summary is not None:
+                return stream_metrics.measure("summary_cached", _single_token(summary))
+            service = SummarizationService(llm_registry=self.llm_registry)
+        except (SummarizationInitException, DatabaseExeption) as e:
             raise AppBaseException("Cannot summarize post") from e
-        except DatabaseExeption:
-            raise
-    
-    def chat_with_post(self, post_id: UUID, question: str, current_user: User) -> PostQAResponse:
+
+        summarized_post_id, content = str(post.id), post.content
+
+        async def tokens():
+            parts = []
+            async for token in service.astream_summary(content):
+                parts.append(token)
+                yield token
+            # The request session may be closed by now, the summary is stored from its own session
+            await astore_post_summary(summarized_post_id, content_hash, "".join(parts))
+
+        return stream_metrics.measure("summary", tokens())
+
+    async def _question_answer_service(self, post_id: UUID, question: str, current_user: User) -> QuestionAnswerService:
+        post = await self.get_post(post_id)
+        try:
+            # Normally done when the post was published, this covers posts whose indexing failed or is still queued
+            await run_in_threadpool(_ensure_post_indexed, post)
+            return QuestionAnswerService(
+                user_id=current_user.id, post_id=post_id, question=question, llm_registry=self.llm_registry,
+                content_hash=hash_text(post.content),
+            )
+        except (QAInitException, EmbeddingInitException, VectorStoreInitException, VectorStoreOpException, DatabaseExeption) as e:
+            raise AppBaseException("Cannot chat with post") from e
+
+    async def chat_with_post(self, post_id: UUID, question: str, current_user: User) -> PostQAResponse:
         """
-        Chat with a post by its ID.
+        Chat with a published post by its ID.
 
         Args:
             post_id (UUID): The UUID of the post to chat with
@@ -166,31 +457,42 @@ class PostService:
             current_user (User): The current user
 
         Returns:
-            str: The response from the post
+            PostQAResponse: The answer to the question
 
         Raises:
             ResourceNotFoundException: If the post is not found
-            DatabaseException: If there is an error in the database operation
+            ServiceBusyException: If no LLM slot was free in time
+            AppBaseException: If the answer can not be generated
         """
+        chat = await self._question_answer_service(post_id, question, current_user)
         try:
-            post = self.get_post(post_id)
-
-            if post.status != PostStatus.PUBLISHED:
-                raise ResourceNotFoundException("Post not found")
-            
-            chat = QuestionAnswerService(user_id=current_user.id, post_id=post_id, post_content=post.content, question=question)
-            answer = chat.get_answer(question=question)
+            answer = await chat.aget_answer(question=question)
             return PostQAResponse(answer=answer)
-        except ResourceNotFoundException:
-            raise
-        except(QAInitException, QAInvokeException) as e:
+        except QAInvokeException as e:
             raise AppBaseException("Cannot chat with post") from e
-        except DatabaseExeption:
-            raise AppBaseException("Cannot chat with post")
 
-    
+    async def stream_chat_with_post(self, post_id: UUID, question: str, current_user: User) -> AsyncIterator[str]:
+        """
+        Chat with a published post by its ID, streaming the answer as it is generated.
+
+        The post is looked up and indexed before returning, so these errors are raised here and not while streaming.
+
+        Args:
+            post_id (UUID): The UUID of the post to chat with
+            question (str): The question to ask the post
+            current_user (User): The current user
 
-    def suggest_title_tags(self, content: str) -> PostSuggestionsResponse:
+        Returns:
+            AsyncIterator[str]: The parts of the answer
+
+        Raises:
+            ResourceNotFoundException: If the post is not found
+            AppBaseException: If the question answering service is not available
+        """
+        chat = await self._question_answer_service(post_id, question, current_user)
+        return stream_metrics.measure("chat", chat.astream_answer(question=question))
+
+    async def suggest_title_tags(self, content: str) -> PostSuggestionsResponse:
         """
         Suggest a title and tags for a post based on its content.
 
@@ -201,11 +503,14 @@ class PostService:
             PostSuggestionsResponse: The suggested title and tags
 
         Raises:
-            DatabaseException: If there is an error in the database operation
+            ServiceBusyException: If no LLM slot was free in time
+            AppBaseException: If the suggestions can not be generated
         """
         try:
-
-            suggestions = SuggestionService().suggest(content=content)
-            return suggestions
+            service = SuggestionService(llm_registry=self.llm_registry)
+            return await async_llm_single_flight.do(
+                ("suggestion", SUGGESTION_PROMPT_VERSION, hash_text(content)),
+                lambda: service.asuggest(content=content),
+            )
         except (SuggestionServiceInitException, SuggestionInvokeException) as e:
-            raise AppBaseException("Cannot get suggestions") from e
\ No newline at end of file
+            raise AppBaseException("Cannot get suggestions") from e
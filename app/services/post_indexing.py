@@ -0,0 +1,108 @@
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import hash_text
+from app.core.config.database.db import SessionLocal
+from app.core.config.llm.vector_store import get_vector_store_service
+from app.crud.post import PostCRUD
+from app.crud.post_index import PostIndexCRUD
+from app.exceptions.exceptions import AppBaseException, EmbeddingInitException, VectorStoreInitException, VectorStoreOpException
+from app.models.post import Post
+from app.models.post_index_status import IndexStatus, PostIndexStatus
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_post_indexed(db: Session, post: Post) -> PostIndexStatus:
+    """
+    Bring the chunks of a post in the vector store in line with its current content.
+
+    Only the chunks whose text changed since they were stored are embedded again, and the chunks past the end
+    of a shortened post are deleted. Posts whose current content is already indexed cost a single lookup.
+
+    Args:
+        db (Session): SQLAlchemy database session
+        post (Post): The published post
+
+    Returns:
+        PostIndexStatus: The index status of the post
+
+    Raises:
+        EmbeddingInitException: If the embedding service is not available
+        VectorStoreInitException: If the vector store is not available
+        VectorStoreOpException: If the chunks can not be embedded or stored
+        DatabaseException: If the index status can not be read or saved
+    """
+    index_crud = PostIndexCRUD(db=db)
+    vector_store_service = get_vector_store_service()
+    # The hashes cover the embedding backend and model too, so switching them re-embeds the posts
+    embedding_key = vector_store_service.embedding_service.backend.cache_key
+    content_hash = hash_text(f"{embedding_key}\n{post.content}")
+    index_status = index_crud.get_status(post.id)
+    if index_status and index_status.status == IndexStatus.INDEXED.value and index_status.content_hash == content_hash:
+        return index_status
+
+    try:
+        texts = vector_store_service.split_blog_post(post.content)
+        chunk_hashes = [hash_text(f"{embedding_key}\n{text}") for text in texts]
+        stored_hashes = index_crud.get_chunk_hashes(post.id)
+        changed = {i: text for i, text in enumerate(texts) if stored_hashes.get(i) != chunk_hashes[i]}
+        # Also covers chunks written by an attempt that failed before their hashes were saved
+        stored_count = max([index_status.chunk_count if index_status else 0, *(i + 1 for i in stored_hashes)])
+        index_crud.save_status(post.id, IndexStatus.PENDING, chunk_count=max(stored_count, len(texts)))
+
+        vector_store_service.upsert_chunks(post.id, changed)
+        vector_store_service.delete_chunks(post.id, range(len(texts), stored_count))
+    except (EmbeddingInitException, VectorStoreInitException, VectorStoreOpException) as e:
+        index_crud.save_status(post.id, IndexStatus.FAILED, error=str(e))
+        raise
+
+    index_crud.save_chunk_hashes(post.id, chunk_hashes)
+    logger.info(
+        f"Indexed post {post.id}: embedded {len(changed)} of {len(texts)} chunks, "
+        f"skipped {len(texts) - len(changed)} unchanged, deleted {max(stored_count - len(texts), 0)}"
+    )
+    return index_crud.save_status(post.id, IndexStatus.INDEXED, content_hash=content_hash, chunk_count=len(texts))
+
+
+def remove_post_index(db: Session, post_id: str):
+    """
+    Delete the chunks of a post that was unpublished or deleted.
+
+    Args:
+        db (Session): SQLAlchemy database session
+        post_id (str): The ID of the post
+
+    Raises:
+        VectorStoreOpException: If the chunks can not be deleted
+        DatabaseException: If the index status can not be read or deleted
+    """
+    index_crud = PostIndexCRUD(db=db)
+    index_status = index_crud.get_status(post_id)
+    if index_status is None:
+        return
+    get_vector_store_service().delete_blog_post(post_id, index_status.chunk_count)
+    index_crud.delete_status(post_id)
+    logger.info(f"Removed the chunks of post {post_id}")
+
+
+def sync_post_index(post_id: str):
+    """
+    Background task that brings the vector store in line with a created, updated or deleted post:
+    published posts are indexed, the chunks of other posts are removed.
+
+    Args:
+        post_id (str): The ID of the post
+    """
+    db = SessionLocal()
+    try:
+        post = PostCRUD(db=db).get_post(post_id)
+        if post:
+            ensure_post_indexed(db, post)
+        else:
+            remove_post_index(db, post_id)
+    except AppBaseException as e:
+        logger.warning(f"Failed to sync the index of post {post_id}: {str(e)}")
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+class _PostAnswers:
+    def __init__(self, content_hash: str):
+        self.content_hash = content_hash
+        # (normalized question embedding, question, answer), most recent last
+        self.entries: List[Tuple[List[float], str, str]] = []
+        self.lock = threading.Lock()
+
+
+class SemanticAnswerCache:
+    """
+    Per-post cache of the answers to first-turn questions, looked up by the cosine similarity of the questions.
+
+    Only questions asked without chat history may be cached or served: their answer depends on the post
+    and the question alone. The answers of a post are dropped as soon as its content hash changes.
+
+    Attributes:
+        threshold (float): The minimum cosine similarity for a cached answer to be reused.
+        max_entries_per_post (int): The number of answers kept per post, the oldest are dropped first.
+    """
+
+    def __init__(self, max_posts: int, max_entries_per_post: int, threshold: float):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_posts (int): The number of posts whose answers are kept, least recently used first out.
+            max_entries_per_post (int): The number of answers kept per post.
+            threshold (float): The minimum cosine similarity for a cached answer to be reused.
+        """
+        self.posts = LRUCache(maxsize=max_posts)
+        self.max_entries_per_post = max_entries_per_post
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _post_answers(self, post_id: str, content_hash: str) -> _PostAnswers:
+        answers = self.posts.get(post_id)
+        if answers is None or answers.content_hash != content_hash:
+            # The post was edited since these answers were generated
+            answers = _PostAnswers(content_hash)
+            self.posts.set(post_id, answers)
+        return answers
+
+    def lookup(self, post_id: str, content_hash: str, embedding: List[float]) -> Optional[str]:
+        """
+        Return the answer of the most similar cached question of a post, if it is similar enough.
+
+        Args:
+            post_id (str): The ID of the post.
+            content_hash (str): The hash of the current content of the post.
+            embedding (List[float]): The embedding of the question.
+
+        Returns:
+            Optional[str]: The cached answer, or None.
+        """
+        query = _normalize(embedding)
+        answers = self._post_answers(post_id, content_hash)
+        best_score, best_answer = -1.0, None
+        with answers.lock:
+            for vector, _, answer in answers.entries:
+                score = sum(a * b for a, b in zip(query, vector))
+                if score > best_score:
+                    best_score, best_answer = score, answer
+
+        hit = best_answer is not None and best_score >= self.threshold
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            logger.debug(f"Answered a question on post {post_id} from the cache, similarity {best_score:.3f}")
+            return best_answer
+        return None
+
+    def store(self, post_id: str, content_hash: str, embedding: List[float], question: str, answer: str):
+        """
+        Cache the answer to a first-turn question on a post.
+
+        Args:
+            post_id (str): The ID of the post.
+            content_hash (str): The hash of the content the answer was generated from.
+            embedding (List[float]): The embedding of the question.
+            question (str): The question.
+            answer (str): The answer.
+        """
+        answers = self._post_answers(post_id, content_hash)
+        with answers.lock:
+            answers.entries.append((_normalize(embedding), question, answer))
+            del answers.entries[:-self.max_entries_per_post]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "posts": len(self.posts),
+                "threshold": self.threshold,
+            }
+
+
+answer_cache = SemanticAnswerCache(
+    max_posts=settings.QA_ANSWER_CACHE_MAX_POSTS,
+    max_entries_per_post=settings.QA_ANSWER_CACHE_ENTRIES_PER_POST,
+    threshold=settings.QA_ANSWER_CACHE_THRESHOLD,
+)
@@ -1,16 +1,266 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
 from langchain_core.chat_history import BaseChatMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict
+
+from app.core.cache import LRUCache
+from app.core.config.config import settings
+from app.core.config.database.db import SessionLocal
+from app.crud.chat_message import ChatMessageCRUD
+from app.exceptions.exceptions import DatabaseExeption
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BACKEND = "memory"
+SQL_BACKEND = "sql"
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    # About four characters per token for English text, plus the role overhead of a chat message
+    return len(str(message.content)) // 4 + 4
+
+
+def trim_to_token_budget(messages: List[BaseMessage], max_tokens: int) -> List[BaseMessage]:
+    """
+    Keep the most recent whole turns of a history fitting in a token budget.
+    """
+    tokens = sum(estimate_tokens(message) for message in messages)
+    start = 0
+    while tokens > max_tokens and start < len(messages) - 1:
+        tokens -= estimate_tokens(messages[start])
+        start += 1
+        # Drop up to the next question so the window starts with a complete turn
+        while start < len(messages) and messages[start].type != "human":
+            tokens -= estimate_tokens(messages[start])
+            start += 1
+    return messages[start:]
+
+
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    """
+    In-memory chat history that keeps only the most recent turns fitting in a token budget.
+
+    Whole turns are dropped from the start, so the history never begins with an answer.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self._messages: List[BaseMessage] = []
+        self._lock = threading.Lock()
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        with self._lock:
+            return list(self._messages)
+
+    def add_messages(self, messages: Sequence[BaseMessage]):
+        with self._lock:
+            self._messages = trim_to_token_budget(self._messages + list(messages), self.max_tokens)
+
+    def clear(self):
+        with self._lock:
+            self._messages = []
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(len(str(message.content)) for message in self._messages)
+
+
+class SQLChatMessageHistory(BaseChatMessageHistory):
+    """
+    Chat history stored in the chat_messages table, shared by every worker process.
+
+    Messages are only appended. Reads fetch the last max_messages messages and trim them to the token budget.
+    """
+
+    def __init__(self, session_id: str, max_messages: int, max_tokens: int):
+        self.session_id = session_id
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        db = SessionLocal()
+        try:
+            rows = ChatMessageCRUD(db=db).get_last_messages(self.session_id, limit=self.max_messages)
+        except DatabaseExeption:
+            # Answer without the history rather than failing the question
+            logger.warning(f"Failed to load the history of chat session {self.session_id}")
+            return []
+        finally:
+            db.close()
+        messages = messages_from_dict([{"type": role, "data": {"content": content}} for role, content in rows])
+        return trim_to_token_budget(messages, self.max_tokens)
+
+    def add_messages(self, messages: Sequence[BaseMessage]):
+        db = SessionLocal()
+        try:
+            ChatMessageCRUD(db=db).add_messages(self.session_id, [(message.type, str(message.content)) for message in messages])
+        except DatabaseExeption:
+            logger.warning(f"Failed to store {len(messages)} messages of chat session {self.session_id}")
+        finally:
+            db.close()
+
+    def clear(self):
+        db = SessionLocal()
+        try:
+            ChatMessageCRUD(db=db).delete_session(self.session_id)
+        finally:
+            db.close()
+
+
+class ChatHistoryBackend(ABC):
+    """
+    Creates the chat history of a session.
+    """
+
+    @abstractmethod
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        pass
+
+
+class InMemoryChatHistoryBackend(ChatHistoryBackend):
+    """
+    Histories kept in this process, the fast path for single worker deployments.
+
+    Sessions are evicted least recently used first once there are max_sessions of them or their content exceeds
+    max_bytes, and expire after ttl seconds without a question.
+    """
+
+    def __init__(self, max_tokens: int, max_sessions: int, ttl: float, max_bytes: int):
+        self.max_tokens = max_tokens
+        self.store = LRUCache(maxsize=max_sessions, ttl=ttl, max_bytes=max_bytes, sizeof=lambda history: history.size_bytes())
+
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        history = self.store.get(session_id)
+        if history is None:
+            history = BoundedChatMessageHistory(max_tokens=self.max_tokens)
+        # Storing it again refreshes the TTL and the size of the session, which grew since the last question
+        self.store.set(session_id, history)
+        return history
+
+
+class SQLChatHistoryBackend(ChatHistoryBackend):
+    """
+    Histories stored in the chat_messages table through the application engine, so follow-up questions
+    can land on any worker. Call compact periodically to delete expired sessions and old turns.
+    """
+
+    def __init__(self, max_tokens: int, max_turns: int, ttl: float):
+        self.max_tokens = max_tokens
+        self.max_messages = max_turns * 2
+        self.ttl = ttl
+
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        return SQLChatMessageHistory(session_id, max_messages=self.max_messages, max_tokens=self.max_tokens)
+
+    def compact(self) -> int:
+        """
+        Delete the messages of sessions idle for longer than the TTL and the turns past max_turns of the others,
+        a session is never cut because its first turns are older than the TTL.
+
+        Returns:
+            int: The number of deleted messages.
+
+        Raises:
+            DatabaseException: If the messages can not be deleted.
+        """
+        older_than = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.ttl)
+        db = SessionLocal()
+        try:
+            deleted = ChatMessageCRUD(db=db).compact(keep_per_session=self.max_messages, older_than=older_than)
+        finally:
+            db.close()
+        logger.info(f"Compacted chat history, deleted {deleted} messages")
+        return deleted
+
+
+class ChatHistoryCompactor:
+    """
+    Daemon thread compacting the SQL chat history every interval seconds.
+    """
+
+    def __init__(self, backend: SQLChatHistoryBackend, interval: float):
+        self.backend = backend
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="chat-history-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.backend.compact()
+            except DatabaseExeption:
+                logger.warning("Failed to compact the chat history")
+
+
+def create_chat_history_backend(backend: str) -> ChatHistoryBackend:
+    if backend == SQL_BACKEND:
+        return SQLChatHistoryBackend(
+            max_tokens=settings.CHAT_HISTORY_MAX_TOKENS,
+            max_turns=settings.CHAT_HISTORY_MAX_TURNS,
+            ttl=settings.CHAT_SESSION_TTL_SECONDS,
+        )
+    if backend == MEMORY_BACKEND:
+        return InMemoryChatHistoryBackend(
+            max_tokens=settings.CHAT_HISTORY_MAX_TOKENS,
+            max_sessions=settings.CHAT_MAX_SESSIONS,
+            ttl=settings.CHAT_SESSION_TTL_SECONDS,
+            max_bytes=settings.CHAT_HISTORY_MAX_BYTES,
+        )
+    raise ValueError(f"Unknown chat history backend {backend}")
+
 
 class SessionManager:
+    """
+    Process wide entry point to the QA chat histories, one per (user, post) session, stored by the backend
+    selected with CHAT_HISTORY_BACKEND.
+    """
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(SessionManager, cls).__new__(cls)
-            cls._instance.store = {}
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(SessionManager, cls).__new__(cls)
+                    instance.backend = create_chat_history_backend(settings.CHAT_HISTORY_BACKEND)
+                    instance.compactor = None
+                    if isinstance(instance.backend, SQLChatHistoryBackend):
+                        instance.compactor = ChatHistoryCompactor(instance.backend, settings.CHAT_HISTORY_COMPACT_INTERVAL_SECONDS)
+                    cls._instance = instance
         return cls._instance
 
+    @staticmethod
+    def session_id(user_id: str, post_id: str) -> str:
+        return f"{user_id}:{post_id}"
+
     def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
-        if session_id not in self.store:
-            self.store[session_id] = ChatMessageHistory()
-        return self.store[session_id]
\ No newline at end of file
+        return self.backend.get_session_history(session_id)
+
+    def start(self):
+        """
+        Start the periodic compaction of the SQL backend.
+        """
+        if self.compactor is not None:
+            self.compactor.start()
+
+    def stop(self):
+        if self.compactor is not None:
+            self.compactor.stop()
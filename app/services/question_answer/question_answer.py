@@ -1,40 +1,79 @@
 import logging
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.chains import create_history_aware_retriever, create_retrieval_chain
+from langchain.chains import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.runnables import RunnableWithMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnableWithMessageHistory
+from starlette.concurrency import run_in_threadpool
 
-from app.core.config.llm.llm import LLMService
+from app.core.config.llm.limiter import llm_limiter
+from app.core.config.llm.llm import LLMRegistry, llm_registry
 from app.core.config.llm.token_usage import TokenUsageHandler
 from app.exceptions.exceptions import EmbeddingInitException, LLMInitException, QAInitException, QAInvokeException, VectorStoreInitException, VectorStoreOpException
+from app.services.question_answer.answer_cache import answer_cache
 from app.services.question_answer.memory import SessionManager
-from app.core.config.llm.vector_store import VectorStoreService
-from app.core.config.llm.embeddings import EmbeddingService
-from app.core.config.config import settings
+from app.services.question_answer.rewrite import question_rewriter
+from app.core.config.llm.vector_store import get_vector_store_service
 
 logger = logging.getLogger(__name__)
 class QuestionAnswerService:
-    def __init__(self, post_id: UUID, user_id: UUID, question: str, post_content: str):
+    def __init__(self, post_id: UUID, user_id: UUID, question: str, llm_registry: LLMRegistry = llm_registry, content_hash: Optional[str] = None):
         self.post_id = str(post_id)
         self.user_id = str(user_id)
         self.question = question
-        self.post_content = post_content
         self.session_manager = SessionManager()
         self.token_hanlder = TokenUsageHandler()
+        self.answer_cache_version = None
 
         try:
-            embedder = EmbeddingService(model=settings.HUGGINGFACE_EMBEDDING_MODEL, api_key=settings.HUGGINGFACE_API_KEY)
-            self.vector_store_service = VectorStoreService(
-                connection_string=settings.SQLALCHEMY_DATABASE_URI,
-                embedding_service=embedder,
-            )
-
-            self.vector_store_service.store_blog_post(blog_post_id=self.post_id, content=self.post_content)
-            self.llm_service = LLMService(temperature=0.3)
+            # Posts are chunked and embedded when they are published, chats only retrieve
+            self.vector_store_service = get_vector_store_service()
+            self.llm_service = llm_registry.get(temperature=0.3)
         except (VectorStoreInitException, EmbeddingInitException, VectorStoreOpException, LLMInitException) as e:
             logger.exception(f"Failed to initialize QuestionAnswerService: {str(e)}")
             raise QAInitException("Failed to initialize QuestionAnswerService") from e
+
+        if content_hash is not None:
+            # Cached answers are only reused for the same content and question embedding model
+            self.answer_cache_version = f"{self.vector_store_service.embedding_service.backend.cache_key}:{content_hash}"
+
+    @property
+    def session_id(self) -> str:
+        return SessionManager.session_id(self.user_id, self.post_id)
+
+    def _cacheable_question_embedding(self, question: str) -> Optional[List[float]]:
+        """
+        Embed a first-turn question for the semantic answer cache.
+
+        Returns:
+            Optional[List[float]]: The embedding, or None if the question has history or the cache is disabled.
+        """
+        if self.answer_cache_version is None:
+            return None
+        if self.session_manager.get_session_history(self.session_id).messages:
+            # The answer to a follow-up depends on the conversation too
+            return None
+        try:
+            return self.vector_store_service.embedding_service.embed_query(question)
+        except Exception as e:
+            logger.warning(f"Failed to embed the question for the answer cache: {str(e)}")
+            return None
+
+    def _cached_answer(self, question: str, embedding: Optional[List[float]]) -> Optional[str]:
+        if embedding is None:
+            return None
+        answer = answer_cache.lookup(self.post_id, self.answer_cache_version, embedding)
+        if answer is not None:
+            # Follow-up questions still see the turn
+            self.session_manager.get_session_history(self.session_id).add_messages([HumanMessage(question), AIMessage(answer)])
+        return answer
+
+    def _cache_answer(self, question: str, embedding: Optional[List[float]], answer: str):
+        if embedding is not None and answer:
+            answer_cache.store(self.post_id, self.answer_cache_version, embedding, question, answer)
     
 
     def get_retriever(self):
@@ -78,11 +117,29 @@ class QuestionAnswerService:
         return qa_prompt
     
 
+    def create_history_aware_retriever(self, retriever):
+        # Same contract as langchain's create_history_aware_retriever, but the rephrasing LLM call is
+        # skipped when the question does not need it, see QuestionRewriter
+        rewrite_chain = self.create_contextualize_q_prompt() | self.llm_service.llm | StrOutputParser()
+
+        def standalone_question(inputs: dict, config: RunnableConfig) -> str:
+            return question_rewriter.standalone_question(
+                inputs["input"],
+                inputs.get("chat_history") or [],
+                rewrite=lambda: rewrite_chain.invoke(inputs, config),
+            )
+
+        async def astandalone_question(inputs: dict, config: RunnableConfig) -> str:
+            return await question_rewriter.astandalone_question(
+                inputs["input"],
+                inputs.get("chat_history") or [],
+                rewrite=lambda: rewrite_chain.ainvoke(inputs, config),
+            )
+
+        return (RunnableLambda(standalone_question, afunc=astandalone_question) | retriever).with_config(run_name="chat_retriever_chain")
+
     def create_chains(self, retriever):
-        contextualize_q_prompt = self.create_contextualize_q_prompt()
-        history_aware_retriever = create_history_aware_retriever(
-            self.llm_service.llm, retriever, contextualize_q_prompt
-        )
+        history_aware_retriever = self.create_history_aware_retriever(retriever)
 
         qa_prompt = self.create_qa_prompt()
         question_answer_chain = create_stuff_documents_chain(self.llm_service.llm, qa_prompt)
@@ -103,19 +160,105 @@ class QuestionAnswerService:
     
     def get_answer(self, question: str):
         try:
+            embedding = self._cacheable_question_embedding(question)
+            cached = self._cached_answer(question, embedding)
+            if cached is not None:
+                return cached
+
             conversational_rag_chain = self.create_conversational_rag_chain()
             answer = conversational_rag_chain.invoke(
                 {"input": question},
                 config={
-                    "configurable": {"session_id": self.user_id},
+                    "configurable": {"session_id": self.session_id},
                     "callbacks": [self.token_hanlder]
                 },
             )["answer"]
             self.token_hanlder.log_token_usage(logger)
+            self._cache_answer(question, embedding, str(answer))
             return str(answer)
         except Exception as e:
             logger.exception(f"Failed to generate answer: {str(e)}")
             raise QAInvokeException("Failed to generate answer") from e
+
+    async def aget_answer(self, question: str) -> str:
+        """
+        Async variant of get_answer, holding one of the provider's LLM slots while the chain runs.
+
+        Args:
+            question (str): The question to answer.
+
+        Returns:
+            str: The answer.
+
+        Raises:
+            ServiceBusyException: If no LLM slot was free in time.
+            QAInvokeException: If the answer can not be generated.
+        """
+        embedding = await run_in_threadpool(self._cacheable_question_embedding, question)
+        cached = await run_in_threadpool(self._cached_answer, question, embedding)
+        if cached is not None:
+            return cached
+
+        async with llm_limiter.slot(self.llm_service.provider):
+            try:
+                conversational_rag_chain = self.create_conversational_rag_chain()
+                result = await conversational_rag_chain.ainvoke(
+                    {"input": question},
+                    config={
+                        "configurable": {"session_id": self.session_id},
+                        "callbacks": [self.token_hanlder]
+                    },
+                )
+                self.token_hanlder.log_token_usage(logger)
+                self._cache_answer(question, embedding, str(result["answer"]))
+                return str(result["answer"])
+            except Exception as e:
+                logger.exception(f"Failed to generate answer: {str(e)}")
+                raise QAInvokeException("Failed to generate answer") from e
+
+    async def astream_answer(self, question: str) -> AsyncIterator[str]:
+        """
+        Answer a question, yielding the answer as it is generated.
+
+        The question and the answer are added to the chat history once the answer is complete,
+        an interrupted stream leaves the history unchanged.
+
+        Args:
+            question (str): The question to answer.
+
+        Yields:
+            str: The next part of the answer.
+
+        Raises:
+            ServiceBusyException: If no LLM slot was free in time.
+            QAInvokeException: If the answer can not be generated.
+        """
+        embedding = await run_in_threadpool(self._cacheable_question_embedding, question)
+        cached = await run_in_threadpool(self._cached_answer, question, embedding)
+        if cached is not None:
+            yield cached
+            return
+
+        async with llm_limiter.slot(self.llm_service.provider):
+            try:
+                conversational_rag_chain = self.create_conversational_rag_chain()
+                parts = []
+                async for chunk in conversational_rag_chain.astream(
+                    {"input": question},
+                    config={
+                        "configurable": {"session_id": self.session_id},
+                        "callbacks": [self.token_hanlder]
+                    },
+                ):
+                    answer = chunk.get("answer")
+                    if answer:
+                        parts.append(str(answer))
+                        yield str(answer)
+                self.token_hanlder.log_token_usage(logger)
+                self._cache_answer(question, embedding, "".join(parts))
+            except Exception as e:
+                logger.exception(f"Failed to generate answer: {str(e)}")
+                raise QAInvokeException("Failed to generate answer") from e
        
 
 
@@ -131,7 +274,8 @@ if __name__ == "__main__":
     post_id = "123abc"
     post_content = "This is a blog post about AI in healthcare."
     question = "What is AI used for in healthcare?"
-    service = QuestionAnswerService(user_id=user_id, post_id=post_id, post_content=post_content, question=question)
+    get_vector_store_service().index_blog_post(blog_post_id=post_id, content=post_content)
+    service = QuestionAnswerService(user_id=user_id, post_id=post_id, question=question)
     print(f"Service initialized with post_id: {service.post_id}, question: {service.question}")
 
     conversational_rag_chain = service.create_conversational_rag_chain()
@@ -142,9 +286,9 @@ if __name__ == "__main__":
             "configurable": {"session_id": user_id}
         },  # constructs a key "abc123" in `store`.
         )["answer"]
-    print(service.session_manager.store)
+    print(service.session_manager.get_session_history(user_id).messages)
 
-    service2 = QuestionAnswerService(user_id="foo", post_id=post_id, post_content=post_content, question="What is AI used for in logistics?")
+    service2 = QuestionAnswerService(user_id="foo", post_id=post_id, question="What is AI used for in logistics?")
     print(f"Service initialized with post_id: {service.post_id}, question: {service.question}")
 
     conversational_rag_chain = service2.create_conversational_rag_chain()
@@ -155,7 +299,7 @@ if __name__ == "__main__":
             "configurable": {"session_id": "foo"}
         },  # constructs a key "abc123" in `store`.
         )["answer"]
-    print(service2.session_manager.store)
+    print(service2.session_manager.get_session_history("foo").messages)
 
     
 
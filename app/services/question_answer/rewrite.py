@@ -0,0 +1,151 @@
+import logging
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from app.core.cache import LRUCache, hash_text
+from app.core.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Words that refer back to the conversation: pronouns, demonstratives and references to earlier turns
+_ANAPHORA = re.compile(
+    r"\b(it|its|it's|itself|this|that|these|those|they|them|their|theirs|he|him|his|she|her|hers|"
+    r"there|then|above|previous|previously|earlier|former|latter|same|such|also|too|"
+    r"more|else|other|another|again|one|ones)\b",
+    re.IGNORECASE,
+)
+# Follow-ups that lean on the previous answer, e.g. "and the cost?" or "what about Europe?"
+_CONTINUATION = re.compile(r"^\s*(and|or|but|so|what about|how about|why|how come|ok|okay)\b", re.IGNORECASE)
+
+
+def is_standalone(question: str, min_words: int = 4) -> bool:
+    """
+    Cheap check of whether a question can be understood without the chat history.
+
+    It is conservative: short questions and questions with a pronoun or a reference to an earlier turn
+    are treated as follow-ups and rewritten.
+
+    Args:
+        question (str): The latest user question.
+        min_words (int): Questions with fewer words are treated as follow-ups.
+
+    Returns:
+        bool: True if the question does not need to be rewritten.
+    """
+    if len(question.split()) < min_words:
+        return False
+    return not _ANAPHORA.search(question) and not _CONTINUATION.search(question)
+
+
+def history_hash(messages: List[BaseMessage]) -> str:
+    return hash_text("\n".join(f"{message.type}:{message.content}" for message in messages))
+
+
+class QuestionRewriter:
+    """
+    Turns follow-up questions into standalone questions for the retriever, calling the LLM only when needed.
+
+    The rewrite is skipped when the history is empty, when the question looks standalone by is_standalone,
+    or when the same question was already rewritten for the same history.
+
+    Attributes:
+        cache (LRUCache): The rewritten questions by (history hash, question).
+    """
+
+    def __init__(self, cache_size: int, ttl: float):
+        """
+        Initialize the rewriter.
+
+        Args:
+            cache_size (int): The maximum number of rewritten questions kept.
+            ttl (float): How long a rewritten question stays cached, in seconds.
+        """
+        self.cache = LRUCache(maxsize=cache_size, ttl=ttl)
+        self.rewrites = 0
+        self.rewrite_seconds = 0.0
+        self.skipped: Dict[str, int] = {"empty_history": 0, "standalone": 0, "cached": 0}
+        self._lock = threading.Lock()
+
+    def _skip(self, reason: str, question: str) -> str:
+        with self._lock:
+            self.skipped[reason] += 1
+            saved = sum(self.skipped.values())
+        logger.debug(f"Skipped question rewrite ({reason}), {saved} LLM calls saved so far")
+        return question
+
+    def standalone_question(self, question: str, chat_history: List[BaseMessage], rewrite: Callable[[], str]) -> str:
+        """
+        Return the question the retriever should search for.
+
+        Args:
+            question (str): The latest user question.
+            chat_history (List[BaseMessage]): The previous turns of the session.
+            rewrite (Callable[[], str]): Calls the LLM to rewrite the question.
+
+        Returns:
+            str: The standalone question.
+        """
+        key, question_without_rewrite = self._lookup(question, chat_history)
+        if question_without_rewrite is not None:
+            return question_without_rewrite
+
+        start = time.perf_counter()
+        rewritten = rewrite()
+        self._record(key, rewritten, time.perf_counter() - start)
+        return rewritten
+
+    async def astandalone_question(self, question: str, chat_history: List[BaseMessage], rewrite: Callable[[], Awaitable[str]]) -> str:
+        """
+        Async variant of standalone_question, rewrite is awaited.
+        """
+        key, question_without_rewrite = self._lookup(question, chat_history)
+        if question_without_rewrite is not None:
+            return question_without_rewrite
+
+        start = time.perf_counter()
+        rewritten = await rewrite()
+        self._record(key, rewritten, time.perf_counter() - start)
+        return rewritten
+
+    def _lookup(self, question: str, chat_history: List[BaseMessage]) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+        # Returns the cache key and, when the LLM call can be skipped, the question to search for
+        if not chat_history:
+            return None, self._skip("empty_history", question)
+        if is_standalone(question):
+            return None, self._skip("standalone", question)
+
+        key = (history_hash(chat_history), question)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._skip("cached", question)
+            return key, cached
+        return key, None
+
+    def _record(self, key: Tuple[str, str], rewritten: str, elapsed: float):
+        self.cache.set(key, rewritten)
+        with self._lock:
+            self.rewrites += 1
+            self.rewrite_seconds += elapsed
+
+    def snapshot(self) -> Dict:
+        """
+        Return the rewrite counters and the estimated LLM time saved by the skipped calls.
+        """
+        with self._lock:
+            saved = sum(self.skipped.values())
+            average = self.rewrite_seconds / self.rewrites if self.rewrites else 0.0
+            return {
+                "rewrites": self.rewrites,
+                "skipped": dict(self.skipped),
+                "llm_calls_saved": saved,
+                "saved_ratio": saved / (saved + self.rewrites) if saved + self.rewrites else 0.0,
+                "average_rewrite_seconds": average,
+                "estimated_seconds_saved": saved * average,
+            }
+
+
+question_rewriter = QuestionRewriter(cache_size=settings.QA_REWRITE_CACHE_SIZE, ttl=settings.QA_REWRITE_CACHE_TTL_SECONDS)
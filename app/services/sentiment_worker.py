@@ -0,0 +1,254 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config.config import settings
+from app.core.config.database.db import SessionLocal
+from app.core.config.llm.llm import LLMRegistry, llm_registry
+from app.crud.comment import CommentCRUD
+from app.exceptions.exceptions import AppBaseException, DatabaseExeption, SentimentAnalysisInitException, SentimentInvokeException
+from app.models.comment import SentimentEnum
+from app.services.comment_analysis import CommentAnalysisService
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentWorkerPool:
+    """
+    A pool of background threads that analyze the sentiment of comments after they are saved.
+
+    Comment IDs are pushed on a bounded queue. Each worker drains up to batch_size queued comments and claims
+    them in a short database session, so that a comment queued by several processes is classified by one
+    worker only. The claimed comments are classified in a single prompt with the CommentAnalysisService,
+    retrying the ones that failed with an exponential backoff, and the results are stored in a second short
+    session. No connection is held while the LLM is called.
+
+    Comments that can not be analyzed, or that were dropped because the queue was full, stay NOT_ANALYZED
+    and are queued again by a periodic rescan once their claim expired.
+
+    Attributes:
+        workers (int): The number of worker threads.
+        batch_size (int): The maximum number of comments classified together.
+        max_retries (int): How many times a failed analysis is retried.
+        retry_backoff (float): The initial delay in seconds between retries, doubled on every retry.
+        rescan_interval (float): The delay in seconds between two scans for unanalyzed comments.
+        claim_lease (float): How long in seconds a worker owns the comments it claimed.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        batch_size: int,
+        max_retries: int,
+        retry_backoff: float,
+        rescan_interval: float = settings.SENTIMENT_RESCAN_INTERVAL_SECONDS,
+        claim_lease: float = settings.SENTIMENT_CLAIM_LEASE_SECONDS,
+        llm_registry: LLMRegistry = llm_registry,
+    ):
+        """
+        Initialize the pool without starting the workers.
+
+        Args:
+            workers (int): The number of worker threads.
+            queue_size (int): The maximum number of comments waiting for analysis.
+            batch_size (int): The maximum number of comments classified together.
+            max_retries (int): How many times a failed analysis is retried.
+            retry_backoff (float): The initial delay in seconds between retries.
+            rescan_interval (float): The delay in seconds between two scans for unanalyzed comments.
+            claim_lease (float): How long in seconds a worker owns the comments it claimed.
+            llm_registry (LLMRegistry): The registry holding the shared LLM clients.
+        """
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.rescan_interval = rescan_interval
+        self.claim_lease = claim_lease
+        self.llm_registry = llm_registry
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._rescanner: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """
+        Start the worker threads and the thread queueing the unanalyzed comments, starting with the ones
+        left by a previous run.
+        """
+        if self._threads:
+            return
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"sentiment-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._rescanner = threading.Thread(target=self._rescan, name="sentiment-rescan", daemon=True)
+        self._rescanner.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Stop the worker threads once they finish their current batch.
+
+        Args:
+            timeout (Optional[float]): How long to wait for each thread.
+        """
+        self._stopping.set()
+        if self._rescanner:
+            self._rescanner.join(timeout)
+            self._rescanner = None
+        for _ in self._threads:
+            self.queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, comment_id: str) -> bool:
+        """
+        Queue a comment for sentiment analysis without blocking.
+
+        Args:
+            comment_id (str): The ID of the comment.
+
+        Returns:
+            bool: False if the queue is full and the comment was not queued.
+        """
+        try:
+            self.queue.put_nowait(str(comment_id))
+            return True
+        except queue.Full:
+            logger.warning(f"Sentiment queue is full, comment {comment_id} stays unanalyzed for now")
+            return False
+
+    def enqueue_pending(self):
+        """
+        Queue the comments that are still waiting for sentiment analysis and not claimed by a worker.
+        """
+        db = SessionLocal()
+        try:
+            # Leave room for the comments queued by the requests
+            limit = max(1, self.queue.maxsize - self.queue.qsize())
+            comment_ids = CommentCRUD(db=db).get_unanalyzed_comment_ids(limit=limit)
+        except DatabaseExeption:
+            logger.warning("Failed to load unanalyzed comments")
+            return
+        finally:
+            db.close()
+
+        queued = 0
+        for comment_id in comment_ids:
+            if not self.enqueue(comment_id):
+                break
+            queued += 1
+        if queued:
+            logger.info(f"Queued {queued} unanalyzed comments for sentiment analysis")
+
+    def _rescan(self):
+        while not self._stopping.is_set():
+            try:
+                self.enqueue_pending()
+            except Exception:
+                logger.exception("Unexpected error while queueing unanalyzed comments")
+            self._stopping.wait(self.rescan_interval)
+
+    def _next_batch(self) -> Tuple[List[str], bool]:
+        """
+        Block for one comment, then take whatever else is already queued up to the batch size.
+
+        Returns:
+            Tuple[List[str], bool]: The comment IDs and whether the worker was asked to stop.
+        """
+        batch = []
+        item = self.queue.get()
+        while True:
+            if item is self._STOP:
+                return batch, True
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            try:
+                if batch:
+                    self._process(batch)
+            except Exception:
+                logger.exception(f"Unexpected error while analyzing comments {batch}")
+            finally:
+                for _ in range(len(batch) + int(stop)):
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def _classify(self, comments: Dict[str, str]) -> Dict[str, SentimentEnum]:
+        sentiments = {}
+        pending = dict(comments)
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                service = CommentAnalysisService(llm_registry=self.llm_registry)
+                if len(pending) == 1:
+                    sentiments.update(service.sentiment_analysis_many(pending))
+                else:
+                    sentiments.update(service.batch_sentiment_analysis(pending))
+            except (SentimentAnalysisInitException, SentimentInvokeException) as e:
+                logger.warning(f"Sentiment analysis attempt {attempt + 1} failed: {str(e)}")
+
+            pending = {comment_id: content for comment_id, content in pending.items() if comment_id not in sentiments}
+            if not pending:
+                break
+            if attempt < self.max_retries:
+                logger.warning(f"Retrying sentiment analysis of {len(pending)} comments in {delay}s")
+                time.sleep(delay)
+                delay *= 2
+        return sentiments
+
+    def _process(self, comment_ids: List[str]):
+        # Claim in a short session, the connection goes back to the pool while the LLM is called
+        db = SessionLocal()
+        try:
+            comments = CommentCRUD(db=db).claim_unanalyzed_comments(comment_ids, str(uuid.uuid4()), self.claim_lease)
+        except AppBaseException as e:
+            logger.error(f"Failed to claim comments {comment_ids}: {str(e)}")
+            return
+        finally:
+            db.close()
+        if not comments:
+            return
+
+        sentiments = self._classify(comments)
+        for comment_id in comments.keys() - sentiments.keys():
+            # The claim expires after the lease and the rescan queues the comment again
+            logger.error(f"Giving up sentiment analysis of comment {comment_id} for now")
+        if not sentiments:
+            return
+
+        db = SessionLocal()
+        try:
+            comment_crud = CommentCRUD(db=db)
+            for comment_id, sentiment in sentiments.items():
+                comment_crud.update_sentiment(comment_id, sentiment)
+                logger.info(f"Comment {comment_id} analyzed as {sentiment.value}")
+        except AppBaseException as e:
+            logger.error(f"Failed to store sentiments of comments {list(sentiments)}: {str(e)}")
+        finally:
+            db.close()
+
+
+sentiment_worker_pool = SentimentWorkerPool(
+    workers=settings.SENTIMENT_WORKERS,
+    queue_size=settings.SENTIMENT_QUEUE_SIZE,
+    batch_size=settings.SENTIMENT_BATCH_SIZE,
+    max_retries=settings.SENTIMENT_MAX_RETRIES,
+    retry_backoff=settings.SENTIMENT_RETRY_BACKOFF_SECONDS,
+)
@@ -1,7 +1,8 @@
 import logging
 from langchain_core.exceptions import OutputParserException
 
-from app.core.config.llm.llm import LLMService
+from app.core.config.llm.limiter import llm_limiter
+from app.core.config.llm.llm import LLMRegistry, llm_registry
 from app.core.config.llm.prompt_templates import suggestion_prompt_template
 from app.schemas.llm_responses_parsers import suggestions_res_parser
 from app.core.config.llm.token_usage import TokenUsageHandler
@@ -14,19 +15,24 @@ class SuggestionService:
     A service class for generating suggestions using a language model.
 
     Attributes:
-        llm_service (LLMService): An instance of the LLMService class with a specified temperature.
+        llm_service (LLMService): The shared LLMService instance with a specified temperature.
         prompt_template (function): A function that returns the prompt template for suggestions.
         chain (Chain): A chain of operations combining the prompt template, language model, and result parser.
     """
     
-    def __init__(self):
+    def __init__(self, llm_registry: LLMRegistry = llm_registry):
         """
         Initializes the SuggestionService with an LLMService instance, a prompt template, and a chain of operations.
+
+        Args:
+            llm_registry (LLMRegistry): The registry holding the shared LLM clients and chains.
         """
         try:
-            self.llm_service = LLMService(temperature=0.7)
+            self.llm_service = llm_registry.get(temperature=0.7)
             self.prompt_template = suggestion_prompt_template()
-            self.chain = self.prompt_template | self.llm_service.llm | suggestions_res_parser
+            self.chain = llm_registry.get_chain(
+                "suggestion", 0.7, lambda llm_service: self.prompt_template | llm_service.llm | suggestions_res_parser
+            )
 
         except LLMInitException as e:
             logger.exception(f"Failed to initialize ChatGroq: {str(e)}")
@@ -60,4 +66,36 @@ class SuggestionService:
 
         except Exception as e:
             logger.exception(f"Failed to generate suggestions: {str(e)}")
-            raise SuggestionInvokeException("Failed to generate suggestions") from e
\ No newline at end of file
+            raise SuggestionInvokeException("Failed to generate suggestions") from e
+
+    async def asuggest(self, content: str) -> dict:
+        """
+        Async variant of suggest, holding one of the provider's LLM slots during the call.
+
+        Args:
+            content (str): The content to generate suggestions for.
+
+        Returns:
+            dict: The response from the suggestion generation.
+
+        Raises:
+            ServiceBusyException: If no LLM slot was free in time.
+            SuggestionInvokeException: If the suggestion service fails to generate suggestions.
+        """
+        async with llm_limiter.slot(self.llm_service.provider):
+            try:
+                token_handler = TokenUsageHandler()
+                response = await self.chain.ainvoke(
+                    {"content": content},
+                    config={"callbacks": [token_handler]}
+                )
+                token_handler.log_token_usage(logger)
+                return response
+
+            except OutputParserException as e:
+                logger.exception(f"Failed to parse the response: {str(e)}")
+                raise SuggestionInvokeException("Failed to generate suggestions") from e
+
+            except Exception as e:
+                logger.exception(f"Failed to generate suggestions: {str(e)}")
+                raise SuggestionInvokeException("Failed to generate suggestions") from e
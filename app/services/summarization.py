@@ -1,37 +1,150 @@
+import asyncio
 import logging
+from typing import AsyncIterator, Dict, List, Tuple
 from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
 
-from app.core.config.llm.llm import LLMService
-from app.core.config.llm.prompt_templates import summary_prompt_template
-from app.schemas.llm_responses_parsers import summary_res_parser
+from app.core.cache import LRUCache, hash_text
+from app.core.config.config import settings
+from app.core.config.llm.limiter import llm_limiter
+from app.core.config.llm.llm import LLMRegistry, llm_registry
+from app.core.config.llm.prompt_templates import SUMMARY_PROMPT_VERSION, chunk_summary_prompt_template, combine_summaries_prompt_template, summary_prompt_template
+from app.core.config.llm.vector_store import create_text_splitter
+from app.schemas.llm_responses_parsers import summary_res_parser, summary_stream_parser
 from app.core.config.llm.token_usage import TokenUsageHandler
-from app.exceptions.exceptions import LLMInitException, SummarizationInitException, SummarizationInvokeException
+from app.exceptions.exceptions import LLMInitException, ServiceBusyException, SummarizationInitException, SummarizationInvokeException
 
 logger = logging.getLogger(__name__)
 
+# Section and combined summaries of long posts, keyed by (step, prompt version, input hash)
+partial_summary_cache = LRUCache(maxsize=settings.SUMMARY_CHUNK_CACHE_SIZE)
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text
+    return len(text) // 4
+
+
 class SummarizationService:
     """
     A service class for generating summaries using a language model.
 
+    Posts longer than SUMMARY_LONG_POST_TOKENS are summarized in map-reduce mode: every section is summarized
+    on its own, in parallel, then groups of SUMMARY_REDUCE_FAN_IN section summaries are combined until they fit
+    in a single prompt, which gets the regular summary prompt. Section and combined summaries are cached by
+    the hash of their input, so editing one section only regenerates the summaries it flows into.
+
     Attributes:
-        llm_service (LLMService): An instance of the LLMService class with a specified temperature.
+        llm_service (LLMService): The shared LLMService instance with a specified temperature.
         prompt_template (function): A function that returns the prompt template for summaries.
         chain (Chain): A chain of operations combining the prompt template, language model, and result parser.
     """
     
-    def __init__(self):
+    def __init__(self, llm_registry: LLMRegistry = llm_registry):
         """
         Initializes the SummarizationService with an LLMService instance, a prompt template, and a chain of operations.
+
+        Args:
+            llm_registry (LLMRegistry): The registry holding the shared LLM clients and chains.
         """
         try:
-            self.llm_service = LLMService(temperature=0.3)
+            self.llm_service = llm_registry.get(temperature=0.3)
             self.prompt_template = summary_prompt_template()
-            self.chain = self.prompt_template | self.llm_service.llm | summary_res_parser
+            self.chain = llm_registry.get_chain(
+                "summary", 0.3, lambda llm_service: self.prompt_template | llm_service.llm | summary_res_parser
+            )
+            self.stream_chain = llm_registry.get_chain(
+                "summary_stream", 0.3, lambda llm_service: self.prompt_template | llm_service.llm | summary_stream_parser
+            )
+            self.map_chain = llm_registry.get_chain(
+                "summary_map", 0.3, lambda llm_service: chunk_summary_prompt_template() | llm_service.llm | StrOutputParser()
+            )
+            self.reduce_chain = llm_registry.get_chain(
+                "summary_reduce", 0.3, lambda llm_service: combine_summaries_prompt_template() | llm_service.llm | StrOutputParser()
+            )
+            self.text_splitter = create_text_splitter()
 
         except LLMInitException as e:
             logger.exception(f"Failed to initialize ChatGroq: {str(e)}")
             raise SummarizationInitException("Summarization service is not available") from e
 
+    def _is_long(self, content: str) -> bool:
+        return estimate_tokens(content) > settings.SUMMARY_LONG_POST_TOKENS
+
+    def _fits(self, summaries: List[str]) -> bool:
+        return len(summaries) <= 1 or estimate_tokens("\n\n".join(summaries)) <= settings.SUMMARY_LONG_POST_TOKENS
+
+    def _groups(self, summaries: List[str]) -> List[str]:
+        fan_in = max(2, settings.SUMMARY_REDUCE_FAN_IN)
+        return ["\n\n".join(summaries[i:i + fan_in]) for i in range(0, len(summaries), fan_in)]
+
+    def _pending(self, step: str, texts: List[str]) -> Tuple[List[Tuple], Dict[Tuple, str], Dict[Tuple, str]]:
+        # Returns the cache key of every text, the cached summaries and the texts left to summarize
+        keys = [(step, SUMMARY_PROMPT_VERSION, hash_text(text)) for text in texts]
+        cached, missing = {}, {}
+        for key, text in zip(keys, texts):
+            summary = partial_summary_cache.get(key)
+            if summary is not None:
+                cached[key] = summary
+            else:
+                missing[key] = text
+        return keys, cached, missing
+
+    def _store(self, step: str, keys: List[Tuple], summaries: Dict[Tuple, str], missing: Dict[Tuple, str], outputs: List[str]) -> List[str]:
+        for key, output in zip(missing, outputs):
+            partial_summary_cache.set(key, output)
+            summaries[key] = output
+        logger.info(f"Summary {step} step: generated {len(missing)} of {len(keys)} summaries, {len(keys) - len(missing)} cached")
+        return [summaries[key] for key in keys]
+
+    def _run_step(self, step: str, chain: Runnable, texts: List[str], token_handler: TokenUsageHandler) -> List[str]:
+        keys, summaries, missing = self._pending(step, texts)
+        outputs = chain.batch(
+            [{"content": text} for text in missing.values()],
+            config={"callbacks": [token_handler], "max_concurrency": settings.SUMMARY_MAP_CONCURRENCY},
+        ) if missing else []
+        return self._store(step, keys, summaries, missing, outputs)
+
+    async def _ainvoke(self, chain: Runnable, content: str, token_handler: TokenUsageHandler):
+        # Every LLM call holds its own slot, so a long post never has more calls in flight than the limit
+        async with llm_limiter.slot(self.llm_service.provider):
+            return await chain.ainvoke({"content": content}, config={"callbacks": [token_handler]})
+
+    async def _arun_step(self, step: str, chain: Runnable, texts: List[str], token_handler: TokenUsageHandler) -> List[str]:
+        keys, summaries, missing = self._pending(step, texts)
+        semaphore = asyncio.Semaphore(settings.SUMMARY_MAP_CONCURRENCY)
+
+        async def summarize(text: str) -> str:
+            async with semaphore:
+                return await self._ainvoke(chain, text, token_handler)
+
+        tasks = [asyncio.ensure_future(summarize(text)) for text in missing.values()]
+        try:
+            outputs = await asyncio.gather(*tasks)
+        except BaseException:
+            # Like a task group: once a call failed the summary is lost, the other calls give their slots back
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return self._store(step, keys, summaries, missing, outputs)
+
+    def _condense(self, content: str, token_handler: TokenUsageHandler) -> str:
+        """
+        Map-reduce a long post down to section summaries that fit in the summary prompt.
+        """
+        summaries = self._run_step("map", self.map_chain, self.text_splitter.split_text(content), token_handler)
+        while not self._fits(summaries):
+            summaries = self._run_step("reduce", self.reduce_chain, self._groups(summaries), token_handler)
+        return "\n\n".join(summaries)
+
+    async def _acondense(self, content: str, token_handler: TokenUsageHandler) -> str:
+        summaries = await self._arun_step("map", self.map_chain, self.text_splitter.split_text(content), token_handler)
+        while not self._fits(summaries):
+            summaries = await self._arun_step("reduce", self.reduce_chain, self._groups(summaries), token_handler)
+        return "\n\n".join(summaries)
+
     def summarize(self, content: str) -> dict:
         """
         Generates a summary based on the given content and returns the response.
@@ -47,6 +160,8 @@ class SummarizationService:
         """
         try:
             token_handler = TokenUsageHandler()
+            if self._is_long(content):
+                content = self._condense(content, token_handler)
             response = self.chain.invoke(
                 {"content": content}, 
                 config={"callbacks": [token_handler]}
@@ -60,4 +175,86 @@ class SummarizationService:
 
         except Exception as e:
             logger.exception(f"Failed to generate summary: {str(e)}")
-            raise SummarizationInvokeException("Failed to generate summary") from e
\ No newline at end of file
+            raise SummarizationInvokeException("Failed to generate summary") from e
+
+    async def asummarize(self, content: str) -> dict:
+        """
+        Async variant of summarize. Every LLM call, of the map-reduce steps as well, holds one of the provider's slots.
+
+        Args:
+            content (str): The content to generate a summary for.
+
+        Returns:
+            dict: The response from the summarization generation.
+
+        Raises:
+            ServiceBusyException: If no LLM slot was free in time.
+            SummarizationInvokeException: If the summarization service fails to generate a summary.
+        """
+        try:
+            token_handler = TokenUsageHandler()
+            if self._is_long(content):
+                content = await self._acondense(content, token_handler)
+            response = await self._ainvoke(self.chain, content, token_handler)
+            token_handler.log_token_usage(logger)
+            return response
+
+        except ServiceBusyException:
+            raise
+
+        except OutputParserException as e:
+            logger.exception(f"Failed to parse the response: {str(e)}")
+            raise SummarizationInvokeException("Failed to generate summary") from e
+
+        except Exception as e:
+            logger.exception(f"Failed to generate summary: {str(e)}")
+            raise SummarizationInvokeException("Failed to generate summary") from e
+
+    async def astream_summary(self, content: str) -> AsyncIterator[str]:
+        """
+        Generates a summary of the given content, yielding it as it is generated.
+
+        The prompt asks for the same JSON object as summarize. The object is parsed as it streams
+        and only the new text of its summary is yielded. A response without a summary raises once
+        the stream ends, so it is never stored as an empty summary.
+
+        Args:
+            content (str): The content to generate a summary for.
+
+        Yields:
+            str: The next part of the summary.
+
+        Raises:
+            ServiceBusyException: If no LLM slot was free in time.
+            SummarizationInvokeException: If the summarization service fails to generate a summary.
+        """
+        try:
+            token_handler = TokenUsageHandler()
+            if self._is_long(content):
+                # Only the final summary streams, the section summaries are generated first
+                content = await self._acondense(content, token_handler)
+            summary = ""
+            async with llm_limiter.slot(self.llm_service.provider):
+                async for partial in self.stream_chain.astream(
+                    {"content": content},
+                    config={"callbacks": [token_handler]}
+                ):
+                    text = partial.get("summary") if isinstance(partial, dict) else None
+                    if isinstance(text, str) and len(text) > len(summary):
+                        yield text[len(summary):]
+                        summary = text
+            token_handler.log_token_usage(logger)
+            if not summary:
+                # The streaming parser skips a reply that is not the JSON object instead of failing on it
+                raise OutputParserException("The response has no summary")
+
+        except ServiceBusyException:
+            raise
+
+        except OutputParserException as e:
+            logger.exception(f"Failed to parse the response: {str(e)}")
+            raise SummarizationInvokeException("Failed to generate summary") from e
+
+        except Exception as e:
+            logger.exception(f"Failed to generate summary: {str(e)}")
+            raise SummarizationInvokeException("Failed to generate summary") from e
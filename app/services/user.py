@@ -1,8 +1,8 @@
 from uuid import UUID
-from app.api.deps import SessionDep
+from app.api.deps import AsyncSessionDep, SessionDep
 from app.models.user import User, UserRole, UserStatus
 from app.schemas.user import UserCreate, UserUpdate
-from app.crud.user import UserCRUD
+from app.crud.user import AsyncUserCRUD, UserCRUD
 from app.exceptions.exceptions import DatabaseExeption, ForbiddenException, ResourceNotFoundException, AppBaseException, ResourceAlreadyExistsException
 import logging
 
@@ -69,37 +69,33 @@ class UserService:
         except AppBaseException :
             raise
 
-    def update_user(self, user_id: UUID, user_data: UserUpdate) -> User:
+    def update_user(self, user: User, update_data: UserUpdate) -> User:
         """
         Update an existing user.
 
         Args:
-            user_id (UUID): The UUID of the user to update
-            user_data (UserUpdate): Data required to update the user
+            user (User): The user to update
+            update_data (UserUpdate): Data required to update the user
 
         Returns:
             User: The updated User object
 
         Raises:
-            ResourceNotFoundException: If the user is not found
+            ResourceNotFoundException: If the user no longer exists
             ResourceAlreadyExistsException: If a user with the same email already exists
             DatabaseException: If there is an error in the database operation
         """
         try:
-            user = self.user_crud.get_user(user_id)
-            if not user:
-                logger.error(f"User with id {user_id} not found when trying to update with update data {user_data.model_dump()}")
-                raise ResourceNotFoundException("User not found")
-            
-            if user_data.email:
-                existing_user = self.user_crud.get_user_by_email(user_data.email)
+            # The authenticated user may be a detached copy from the principal cache
+            user = self.get_user(user.id)
+            if update_data.email:
+                existing_user = self.user_crud.get_user_by_email(update_data.email)
                 
-                if existing_user and existing_user.id != user_id:
-                    logger.error(f"User with email {user_data.email} already exists and user with user id {user_id} is trying to update")
+                if existing_user and existing_user.id != user.id:
+                    logger.error(f"User with email {update_data.email} already exists and user with user id {user.id} is trying to update")
                     raise ResourceAlreadyExistsException("User with this email already exists")
             
-            user = self.user_crud.update_user(user_id=user_id, update_data=user_data)
-            return user
+            return self.user_crud.update_user(user=user, update_data=update_data)
         except AppBaseException:
             raise
 
@@ -167,4 +163,142 @@ class UserService:
 
         except DatabaseExeption as e:
             logger.error(f"DatabaseExeption: {str(e)}")
-            raise AppBaseException("Cannot activate user") from e
\ No newline at end of file
+            raise AppBaseException("Cannot activate user") from e
+
+
+class AsyncUserService:
+    """
+    Async variant of the UserService, used by the routes so they do not hold a threadpool thread while waiting on the database.
+    """
+
+    def __init__(self, db: AsyncSessionDep):
+        """
+        Initialize the AsyncUserService with an async database session dependency.
+
+        Args:
+            db (AsyncSessionDep): Async database session dependency
+        """
+        self.db = db
+        self.user_crud = AsyncUserCRUD(db=self.db)
+
+    async def create_user(self, user_data: UserCreate) -> User:
+        """
+        Create a new user.
+
+        Args:
+            user_data (UserCreate): Data required to create a user
+
+        Returns:
+            User: The created User object
+
+        Raises:
+            ResourceAlreadyExistsException: If a user with the same email already exists
+            ServiceBusyException: If the password hashing pool is saturated
+            DatabaseException: If there is an error in the database operation
+        """
+        existing_user = await self.user_crud.get_user_by_email(user_data.email)
+        if existing_user:
+            logger.error(f"User with email {user_data.email} already exists")
+            raise ResourceAlreadyExistsException("User with this email already exists")
+        return await self.user_crud.create_user(user_data=user_data)
+
+    async def get_user(self, user_id: UUID) -> User:
+        """
+        Retrieve a user by their ID.
+
+        Args:
+            user_id (UUID): The UUID of the user
+
+        Returns:
+            User: The User object
+
+        Raises:
+            ResourceNotFoundException: If the user is not found
+            DatabaseException: If there is an error in the database operation
+        """
+        user = await self.user_crud.get_user(user_id=user_id)
+        if not user:
+            logger.error(f"User with id {user_id} not found")
+            raise ResourceNotFoundException("User not found")
+        return user
+
+    async def update_user(self, user: User, update_data: UserUpdate) -> User:
+        """
+        Update an existing user.
+
+        Args:
+            user (User): The user to update
+            update_data (UserUpdate): Data required to update the user
+
+        Returns:
+            User: The updated User object
+
+        Raises:
+            ResourceNotFoundException: If the user no longer exists
+            ResourceAlreadyExistsException: If a user with the same email already exists
+            DatabaseException: If there is an error in the database operation
+        """
+        # The authenticated user may be a detached copy from the principal cache
+        user = await self.get_user(user.id)
+        if update_data.email:
+            existing_user = await self.user_crud.get_user_by_email(update_data.email)
+
+            if existing_user and existing_user.id != user.id:
+                logger.error(f"User with email {update_data.email} already exists and user with user id {user.id} is trying to update")
+                raise ResourceAlreadyExistsException("User with this email already exists")
+
+        return await self.user_crud.update_user(user=user, update_data=update_data)
+
+    async def get_users(self) -> list[User]:
+        """
+        Retrieve all users.
+
+        Returns:
+            list[User]: A list of User objects
+
+        Raises:
+            AppBaseException: If there is an error in the database operation
+        """
+        try:
+            return await self.user_crud.get_users()
+        except DatabaseExeption as e:
+            raise AppBaseException("Cannot get users") from e
+
+    async def activate_user(self, user_id: UUID, current_admin: User) -> User:
+        """
+        Activate a user.
+
+        Args:
+            user_id (UUID): The UUID of the user to activate
+            current_admin (User): The admin activating the user
+
+        Returns:
+            User: The activated User object
+
+        Raises:
+            ResourceNotFoundException: If the user is not found
+            ResourceAlreadyExistsException: If the user is already active
+            ForbiddenException: If the current admin does not have permission to activate the user
+            AppBaseException: If there is an error in the database operation
+        """
+        try:
+            user = await self.user_crud.get_user(user_id)
+            if not user:
+                logger.error(f"User with id {user_id} not found")
+                raise ResourceNotFoundException("User not found")
+
+            if user.status == UserStatus.ACTIVE.value:
+                logger.error(f"User with id {user_id} is already active")
+                raise ResourceAlreadyExistsException("User already active")
+
+            if user.user_role == UserRole.ADMIN and current_admin.user_role != UserRole.SUPER_ADMIN:
+                logger.error(f"User with id {current_admin.id} does not have permission to activate admin user with id {user_id}")
+                raise ForbiddenException("Only super admin can activate admin")
+
+            activated_user = await self.user_crud.activate_user(user)
+            logger.info(f"User with id {user_id} has been activated by admin with id {current_admin.id}")
+            return activated_user
+
+        except DatabaseExeption as e:
+            logger.error(f"DatabaseExeption: {str(e)}")
+            raise AppBaseException("Cannot activate user") from e
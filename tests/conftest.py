@@ -0,0 +1,137 @@
+import os
+import tempfile
+
+# Settings are read when the app is imported, point them at a throwaway SQLite database first
+_TMP_DIR = tempfile.mkdtemp(prefix="blog-tests-")
+os.environ.update({
+    "ENV": "test",
+    "DATABASE_TYPE": "SQLITE",
+    "SQLITE_DATABASE_PATH": os.path.join(_TMP_DIR, "test.db"),
+    "REQUEST_LOG_FILE": os.path.join(_TMP_DIR, "request.log"),
+    "SUPER_ADMIN_EMAIL": "admin@example.com",
+    "SUPER_ADMIN_NAME": "Admin",
+    "SUPER_ADMIN_USER_NAME": "admin",
+    "SUPER_ADMIN_PASSWORD": "admin",
+    "GROQ_MODEL_NAME": "fake",
+    "GROQ_API_KEY": "fake",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "postgres",
+})
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.config.database.db import Base, SessionLocal, async_engine, engine
+# Register every table on the metadata
+from app.core.config.database import migrate  # noqa: F401
+from app.models.comment import Comment
+from app.models.post import Post, PostStatus
+from app.models.user import User, UserRole
+from app.schemas.user import TokenPayload
+from app.services.sentiment_worker import SentimentWorkerPool
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def clean_tables(tables):
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def author(db) -> User:
+    name = uuid.uuid4().hex[:12]
+    user = User(name=name, email=f"{name}@example.com", user_name=name, password="x", user_role=UserRole.AUTHOR)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client():
+    """
+    A client of the app with a fake LLM. The lifespan is replaced so that no background thread is started,
+    the requests still share one event loop.
+    """
+    from app.main import app
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.llm_registry = FakeLLMRegistry(FakeChatModel())
+        # Never started, comments only pile up on the queue
+        app.state.sentiment_workers = SentimentWorkerPool(
+            workers=1, queue_size=1000, batch_size=1, max_retries=0, retry_backoff=0, llm_registry=app.state.llm_registry
+        )
+        yield
+        await async_engine.dispose()
+
+    original_lifespan = app.router.lifespan_context
+    app.router.lifespan_context = lifespan
+    security.principal_cache.clear()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.router.lifespan_context = original_lifespan
+        security.principal_cache.clear()
+
+
+def auth_headers(user: User) -> dict:
+    token = security.create_access_token(TokenPayload(user_id=str(user.id)), expires_delta=timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def run(coroutine):
+    """
+    Run a coroutine in a new event loop. The async connections are closed before the loop, aiosqlite
+    connections run on threads of their own that would keep the process alive.
+    """
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+def make_post(db, author: User, **fields) -> Post:
+    fields.setdefault("title", "A post")
+    fields.setdefault("content", "Some content")
+    fields.setdefault("status", PostStatus.PUBLISHED.value)
+    post = Post(author_id=author.id, **fields)
+    db.add(post)
+    db.commit()
+    return post
+
+
+def make_comment(db, post: Post, commenter: User, **fields) -> Comment:
+    fields.setdefault("content", "A comment")
+    comment = Comment(post_id=post.id, commenter_id=commenter.id, **fields)
+    db.add(comment)
+    db.commit()
+    return comment
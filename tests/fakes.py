@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.vectorstores import VectorStore
+
+from app.core.cache import hash_text
+from app.core.config.llm.embedding_backends import EmbeddingBackend
+from app.core.config.llm.embedding_cache import EmbeddingCache
+from app.core.config.llm.embeddings import EmbeddingService
+from app.core.config.llm.llm import LLMRegistry, LLMService
+from app.core.config.llm.vector_store import VectorStoreService, create_text_splitter
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering every prompt with respond(prompt) after an optional delay, counting the calls,
+    their tokens and the most async calls in flight at once.
+    """
+
+    respond: Callable[[str], str] = lambda prompt: "ok"
+    delay: float = 0.0
+    calls: int = 0
+    total_tokens: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    lock: Any = None
+
+    def model_post_init(self, __context: Any):
+        self.lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        with self.lock:
+            self.calls += 1
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = self.respond(prompt)
+        # About four characters per token, as the services estimate it
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4 + 1}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        with self.lock:
+            self.total_tokens += usage["total_tokens"]
+        message = AIMessage(content=content, response_metadata={"token_usage": usage})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.delay)
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        return self._result(messages)
+
+
+class FakeLLMService(LLMService):
+    provider = "fake"
+
+    def __init__(self, llm: BaseChatModel):
+        self.llm = llm
+
+
+class FakeLLMRegistry(LLMRegistry):
+    """
+    Registry handing out the same fake chat model for every temperature.
+    """
+
+    def __init__(self, llm: BaseChatModel):
+        super().__init__(model="fake")
+        self.service = FakeLLMService(llm)
+
+    def get(self, temperature: float = 0) -> LLMService:
+        return self.service
+
+
+class FakeEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds every word into one of 64 dimensions, recording the texts it was asked to embed.
+    """
+
+    def __init__(self, cache_key: str = "fake"):
+        self.cache_key = cache_key
+        self.embedded: List[str] = []
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self.lock:
+            self.embedded.extend(texts)
+        vectors = []
+        for text in texts:
+            vector = [0.0] * 64
+            for word in text.lower().split():
+                vector[int(hash_text(word)[:8], 16) % 64] += 1.0
+            vectors.append(vector)
+        return vectors
+
+
+class FakeEmbeddingService(EmbeddingService):
+    def __init__(self, backend: EmbeddingBackend):
+        self.model = backend.cache_key
+        self.backend = backend
+        # In memory only, the texts embedded by other tests must not hide calls
+        self.cache = EmbeddingCache(max_bytes=1024 * 1024, persist=False)
+
+
+class SyncOnlyVectorStore(VectorStore):
+    """
+    In-memory vector store whose async search fails, like PGVector created without an async engine.
+    """
+
+    def __init__(self, embeddings: EmbeddingService):
+        self._embeddings = embeddings
+        self.documents: Dict[str, Document] = {}
+        self.searches = 0
+
+    @property
+    def embeddings(self) -> EmbeddingService:
+        return self._embeddings
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        self._embeddings.embed_documents([document.page_content for document in documents])
+        for document_id, document in zip(ids, documents):
+            self.documents[document_id] = document
+        return list(ids)
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs) -> List[str]:
+        return self.add_documents([Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas or [None] * len(texts))], ids=ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs):
+        for document_id in ids or []:
+            self.documents.pop(document_id, None)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs) -> List[Document]:
+        self._embeddings.embed_query(query)
+        self.searches += 1
+        matches = [
+            document for document in self.documents.values()
+            if all(document.metadata.get(key) == value for key, value in (filter or {}).items())
+        ]
+        return matches[:k]
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        raise AssertionError("_async_engine not found")
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError
+
+
+class FakeVectorStoreService(VectorStoreService):
+    def __init__(self, embedding_service: EmbeddingService):
+        self.connection_string = None
+        self.embedding_service = embedding_service
+        self.collection_name = "blog_posts"
+        self.text_splitter = create_text_splitter()
+        self.vector_store = SyncOnlyVectorStore(embedding_service)
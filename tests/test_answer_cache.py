@@ -0,0 +1,78 @@
+import pytest
+
+from app.services import post_indexing
+from app.services.question_answer import question_answer
+from app.services.question_answer.answer_cache import SemanticAnswerCache
+from app.models.user import User, UserRole
+from tests.conftest import auth_headers, make_post
+from tests.fakes import FakeEmbeddingBackend, FakeEmbeddingService, FakeVectorStoreService
+
+QUESTION = [1.0, 0.0, 0.0]
+# Cosine similarities of 0.96 and 0.8 with QUESTION
+PARAPHRASE = [0.96, 0.28, 0.0]
+OTHER_QUESTION = [0.8, 0.6, 0.0]
+
+
+def _cache() -> SemanticAnswerCache:
+    cache = SemanticAnswerCache(max_posts=10, max_entries_per_post=10, threshold=0.92)
+    cache.store("post", "v1", QUESTION, "What is the post about?", "Testing.")
+    return cache
+
+
+def test_paraphrase_above_the_threshold_is_answered_from_the_cache():
+    cache = _cache()
+
+    assert cache.lookup("post", "v1", PARAPHRASE) == "Testing."
+    assert cache.snapshot()["hits"] == 1
+
+
+def test_question_below_the_threshold_misses():
+    cache = _cache()
+
+    assert cache.lookup("post", "v1", OTHER_QUESTION) is None
+    assert cache.lookup("another post", "v1", QUESTION) is None
+    assert cache.snapshot()["misses"] == 2
+
+
+def test_answers_are_dropped_when_the_content_changes():
+    cache = _cache()
+
+    assert cache.lookup("post", "v2", QUESTION) is None
+    # The answers of the former content are gone for good
+    assert cache.lookup("post", "v1", QUESTION) is None
+
+
+@pytest.fixture
+def chat(client, monkeypatch):
+    service = FakeVectorStoreService(FakeEmbeddingService(FakeEmbeddingBackend(cache_key="answers")))
+    monkeypatch.setattr(question_answer, "get_vector_store_service", lambda: service)
+    monkeypatch.setattr(post_indexing, "get_vector_store_service", lambda: service)
+    monkeypatch.setattr(question_answer, "answer_cache", SemanticAnswerCache(max_posts=10, max_entries_per_post=10, threshold=0.92))
+    llm = client.app.state.llm_registry.service.llm
+    llm.respond = lambda prompt: "The post is about testing."
+    return llm
+
+
+def _ask(client, post_id, user, question):
+    response = client.post(f"/api/v1/posts/{post_id}/chat", json={"question": question}, headers=auth_headers(user))
+    assert response.status_code == 200, response.text
+    return response.json()["answer"]
+
+
+def test_first_turn_questions_share_answers_and_follow_ups_bypass_the_cache(client, db, author, chat):
+    post_id = str(make_post(db, author, content="A post about writing tests for a FastAPI application.").id)
+    reader = User(name="reader", email="reader@example.com", user_name="reader", password="x", user_role=UserRole.READER)
+    db.add(reader)
+    db.commit()
+    question = "What is this post about in a few words?"
+
+    assert _ask(client, post_id, author, question) == "The post is about testing."
+    calls = chat.calls
+
+    # The first question of another session is answered from the cache
+    assert _ask(client, post_id, reader, question) == "The post is about testing."
+    assert chat.calls == calls
+
+    # The same words asked after a turn depend on the conversation, the chain runs again
+    assert _ask(client, post_id, author, question) == "The post is about testing."
+    assert chat.calls > calls
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import httpx
+
+from app.core import security
+from tests.conftest import auth_headers, make_post, run
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+CLIENTS = 500
+
+
+def test_async_read_routes_serve_500_concurrent_clients(db, author, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(app.state, "llm_registry", FakeLLMRegistry(FakeChatModel()), raising=False)
+    security.principal_cache.clear()
+    posts = [str(make_post(db, author, content=f"Content of post {i}").id) for i in range(10)]
+    headers = auth_headers(author)
+
+    async def load():
+        limits = httpx.Limits(max_connections=CLIENTS)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60, limits=limits) as client:
+            async def session(number: int):
+                # A reader opens the feed, a post, then their profile
+                responses = [
+                    await client.get("/api/v1/posts/", params={"limit": 5}),
+                    await client.get(f"/api/v1/posts/{posts[number % len(posts)]}"),
+                    await client.get("/api/v1/users/me", headers=headers),
+                ]
+                return [response.status_code for response in responses]
+
+            start = time.perf_counter()
+            statuses = await asyncio.gather(*(session(number) for number in range(CLIENTS)))
+            return statuses, time.perf_counter() - start
+
+    statuses, elapsed = run(load())
+
+    print(f"\n{CLIENTS} concurrent clients: {CLIENTS * 3 / elapsed:.0f} requests/sec, {elapsed:.2f}s in total")
+    assert statuses == [[200, 200, 200]] * CLIENTS
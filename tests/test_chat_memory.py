@@ -0,0 +1,118 @@
+import resource
+
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core import cache
+from app.core.cache import LRUCache
+from app.services.question_answer.memory import ChatHistoryBackend, InMemoryChatHistoryBackend, SessionManager, estimate_tokens, trim_to_token_budget
+
+
+def _turns(count, size=40):
+    messages = []
+    for i in range(count):
+        messages += [HumanMessage(content=f"question {i} " + "q" * size), AIMessage(content=f"answer {i} " + "a" * size)]
+    return messages
+
+
+def test_history_under_budget_is_kept():
+    messages = _turns(3)
+
+    assert trim_to_token_budget(messages, max_tokens=10_000) == messages
+
+
+def test_trimming_keeps_the_latest_whole_turns_within_budget():
+    messages = _turns(10)
+    budget = sum(estimate_tokens(message) for message in messages[-6:])
+
+    trimmed = trim_to_token_budget(messages, max_tokens=budget)
+
+    assert trimmed == messages[-6:]
+    assert trimmed[0].type == "human"
+
+
+def test_trimming_never_starts_with_an_answer():
+    messages = _turns(4)
+    # Fits one and a half turns, half a turn can not be kept
+    budget = sum(estimate_tokens(message) for message in messages[-3:])
+
+    trimmed = trim_to_token_budget(messages, max_tokens=budget)
+
+    assert trimmed == messages[-2:]
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+
+    lru.set("c", 3)
+
+    assert ("a" in lru, "b" in lru, "c" in lru) == (True, False, True)
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("session", "history")
+
+    now[0] += 59
+    assert lru.get("session") == "history"
+    now[0] += 2
+    assert lru.get("session") is None
+    assert len(lru) == 0
+
+
+def test_entries_are_evicted_over_the_byte_budget():
+    lru = LRUCache(maxsize=100, max_bytes=10)
+    lru.set("a", b"12345")
+    lru.set("b", b"12345")
+
+    lru.set("c", b"123")
+
+    assert ("a" in lru, "b" in lru, "c" in lru) == (False, True, True)
+    assert lru.current_bytes == 8
+
+
+def test_sessions_are_scoped_to_the_post():
+    backend = InMemoryChatHistoryBackend(max_tokens=1000, max_sessions=10, ttl=60, max_bytes=1024 * 1024)
+
+    backend.get_session_history(SessionManager.session_id("user", "post-a")).add_messages(_turns(1))
+
+    assert backend.get_session_history(SessionManager.session_id("user", "post-b")).messages == []
+    assert len(backend.get_session_history(SessionManager.session_id("user", "post-a")).messages) == 2
+
+
+def _peak_rss_mb() -> float:
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def test_rss_stays_flat_across_100k_sessions():
+    backend = InMemoryChatHistoryBackend(max_tokens=2000, max_sessions=1000, ttl=3600, max_bytes=4 * 1024 * 1024)
+    turn = _turns(1, size=400)
+
+    def chat(sessions):
+        for session in sessions:
+            backend.get_session_history(SessionManager.session_id(session, "post")).add_messages(turn)
+
+    chat(range(10_000))
+    warmed_up = _peak_rss_mb()
+    chat(range(10_000, 100_000))
+    grown = _peak_rss_mb() - warmed_up
+
+    print(f"\npeak RSS after 10k sessions: {warmed_up:.1f} MB, growth over the next 90k sessions: {grown:.1f} MB")
+    assert len(backend.store) <= 1000
+    # Without eviction the 90k extra histories add about 50 MB
+    assert grown < 20
+
+
+def test_backend_without_session_histories_cannot_be_created():
+    class IncompleteBackend(ChatHistoryBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
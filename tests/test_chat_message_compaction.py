@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from app.crud.chat_message import ChatMessageCRUD
+from app.models.chat_message import ChatMessage
+from app.models.types import utcnow
+
+
+def _chat(crud, session_id, turns):
+    for i in range(turns):
+        crud.add_messages(session_id, [("human", f"question {i}"), ("ai", f"answer {i}")])
+
+
+def _ids(db, session_id):
+    return [message.id for message in db.query(ChatMessage).filter(ChatMessage.session_id == session_id).order_by(ChatMessage.id)]
+
+
+def _age(db, session_id, hours, first_messages=None):
+    ids = _ids(db, session_id)
+    if first_messages is not None:
+        ids = ids[:first_messages]
+    db.execute(update(ChatMessage).where(ChatMessage.id.in_(ids)).values(created_at=utcnow() - timedelta(hours=hours)))
+    db.commit()
+
+
+def test_active_session_keeps_its_turns_older_than_the_ttl(db):
+    crud = ChatMessageCRUD(db)
+    _chat(crud, "active", turns=3)
+    # The conversation started two hours ago and is still going on
+    _age(db, "active", hours=2, first_messages=3)
+
+    crud.compact(keep_per_session=10, older_than=utcnow() - timedelta(hours=1))
+
+    messages = crud.get_last_messages("active", limit=10)
+    assert len(messages) == 6
+    assert messages[0] == ("human", "question 0")
+
+
+def test_idle_session_is_deleted_whole(db):
+    crud = ChatMessageCRUD(db)
+    _chat(crud, "idle", turns=2)
+    _chat(crud, "active", turns=1)
+    _age(db, "idle", hours=2)
+
+    deleted = crud.compact(keep_per_session=10, older_than=utcnow() - timedelta(hours=1))
+
+    assert deleted == 4
+    assert crud.get_last_messages("idle", limit=10) == []
+    assert len(crud.get_last_messages("active", limit=10)) == 2
+
+
+def test_turns_past_the_limit_are_deleted(db):
+    crud = ChatMessageCRUD(db)
+    _chat(crud, "long", turns=5)
+
+    deleted = crud.compact(keep_per_session=4, older_than=utcnow() - timedelta(hours=1))
+
+    assert deleted == 6
+    assert crud.get_last_messages("long", limit=10) == [
+        ("human", "question 3"), ("ai", "answer 3"), ("human", "question 4"), ("ai", "answer 4"),
+    ]
@@ -0,0 +1,85 @@
+import json
+import re
+import time
+
+import pytest
+
+from app.exceptions.exceptions import SentimentInvokeException
+from app.models.comment import SentimentEnum
+from app.services.comment_analysis import CommentAnalysisService
+from app.services.sentiment_worker import SentimentWorkerPool
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+COMMENTS = {"c1": "Great post", "c2": "Thanks", "c3": "Nice"}
+BATCH = 20
+
+
+def _partial_batch(prompt: str) -> str:
+    if "<Comment id=" in prompt:
+        # The batch reply skips c3
+        return json.dumps([{"id": "c1", "sentiment": "POSITIVE"}, {"id": "c2", "sentiment": "NEGATIVE"}])
+    return json.dumps({"sentiment": "POSITIVE"})
+
+
+def _unavailable(prompt: str) -> str:
+    raise ConnectionError("provider unavailable")
+
+
+def test_only_comments_missing_from_the_batch_reply_are_analyzed_one_by_one():
+    llm = FakeChatModel(respond=_partial_batch)
+    service = CommentAnalysisService(llm_registry=FakeLLMRegistry(llm))
+
+    sentiments = service.batch_sentiment_analysis(COMMENTS)
+
+    assert sentiments == {"c1": SentimentEnum.POSITIVE, "c2": SentimentEnum.NEGATIVE, "c3": SentimentEnum.POSITIVE}
+    assert llm.calls == 2
+
+
+@pytest.mark.parametrize("respond", [_unavailable, lambda prompt: "I can not answer that"])
+def test_failed_batch_is_raised_without_fanning_out(respond):
+    llm = FakeChatModel(respond=respond)
+    service = CommentAnalysisService(llm_registry=FakeLLMRegistry(llm))
+
+    with pytest.raises(SentimentInvokeException):
+        service.batch_sentiment_analysis(COMMENTS)
+    assert llm.calls == 1
+
+
+def test_worker_retries_a_failed_batch_with_one_call_per_attempt():
+    llm = FakeChatModel(respond=_unavailable)
+    pool = SentimentWorkerPool(
+        workers=1, queue_size=10, batch_size=10, max_retries=2, retry_backoff=0, llm_registry=FakeLLMRegistry(llm)
+    )
+
+    assert pool._classify(COMMENTS) == {}
+    assert llm.calls == 3
+
+
+def _classify_all(prompt: str) -> str:
+    ids = re.findall(r'<Comment id="([^"]+)">', prompt)
+    if ids:
+        return json.dumps([{"id": comment_id, "sentiment": "POSITIVE"} for comment_id in ids])
+    return json.dumps({"sentiment": "POSITIVE"})
+
+
+def _run(classify, llm) -> float:
+    start = time.perf_counter()
+    sentiments = classify(CommentAnalysisService(llm_registry=FakeLLMRegistry(llm)))
+    elapsed = time.perf_counter() - start
+    assert set(sentiments.values()) == {SentimentEnum.POSITIVE} and len(sentiments) == BATCH
+    return elapsed
+
+
+def test_batch_uses_fewer_tokens_and_time_per_comment_than_single_calls():
+    comments = {f"comment-{i}": f"Comment number {i}, I liked the examples of this post." for i in range(BATCH)}
+    single, batch = FakeChatModel(respond=_classify_all, delay=0.05), FakeChatModel(respond=_classify_all, delay=0.05)
+
+    single_seconds = _run(lambda service: service.sentiment_analysis_many(comments), single)
+    batch_seconds = _run(lambda service: service.batch_sentiment_analysis(comments), batch)
+
+    print(f"\ntokens per comment: {single.total_tokens / BATCH:.0f} single, {batch.total_tokens / BATCH:.0f} batched; "
+          f"comments per second: {BATCH / single_seconds:.0f} single, {BATCH / batch_seconds:.0f} batched")
+    assert (single.calls, batch.calls) == (BATCH, 1)
+    # The instructions of the prompt are sent once instead of once per comment
+    assert batch.total_tokens * 2 < single.total_tokens
+    assert batch_seconds < single_seconds
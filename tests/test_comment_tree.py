@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from app.crud.comment import CommentCRUD
+from app.models.comment import SentimentEnum, UnanalyzedCommentsPolicy
+from tests.conftest import make_comment, make_post
+
+
+def _walk_roots(crud, post_id, limit):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = crud.get_post_comment_tree(
+            post_id=post_id, limit=limit, cursor=cursor, unanalyzed_policy=UnanalyzedCommentsPolicy.SHOW
+        )
+        seen.extend(str(comment.id) for comment, depth in rows if depth == 0)
+        if cursor is None:
+            return seen
+        assert len(seen) < 100, "pagination does not terminate"
+
+
+def test_every_root_comment_is_returned_exactly_once(db, author):
+    post = make_post(db, author)
+    roots = [make_comment(db, post, author, content=f"c{i}") for i in range(5)]
+    for root in roots:
+        make_comment(db, post, author, parent_comment_id=root.id)
+    hidden = make_comment(db, post, author, sentiment=SentimentEnum.INAPPROPRIATE)
+    # Several roots within one timestamp, the id breaks the tie
+    tied = datetime(2025, 1, 1, 12, 0, 0)
+    for root in roots[1:4]:
+        root.created_at = tied
+    db.commit()
+    root_ids = [str(root.id) for root in roots]
+
+    seen = _walk_roots(CommentCRUD(db=db), str(post.id), limit=2)
+
+    assert sorted(seen) == sorted(root_ids)
+    assert str(hidden.id) not in seen
+
+
+def test_replies_come_with_their_root(db, author):
+    post = make_post(db, author)
+    roots = [make_comment(db, post, author) for _ in range(3)]
+    replies = {str(make_comment(db, post, author, parent_comment_id=root.id).id): str(root.id) for root in roots}
+
+    rows, cursor = CommentCRUD(db=db).get_post_comment_tree(
+        post_id=str(post.id), limit=2, unanalyzed_policy=UnanalyzedCommentsPolicy.SHOW
+    )
+
+    page_roots = {str(comment.id) for comment, depth in rows if depth == 0}
+    page_replies = {str(comment.id) for comment, depth in rows if depth == 1}
+    assert len(page_roots) == 2 and cursor is not None
+    assert page_replies == {reply for reply, root in replies.items() if root in page_roots}
@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.config.database.query_counter import QueryCounter
+from app.core.config.llm.embedding_backends import EmbeddingBackend
+from app.crud.embedding_cache import EmbeddingCacheCRUD
+
+
+def test_embeddings_are_saved_in_one_statement(db):
+    embeddings = {f"hash{i}": bytes([i]) * 8 for i in range(50)}
+
+    with QueryCounter(budget=1):
+        EmbeddingCacheCRUD(db=db).save_embeddings("model", embeddings)
+
+    assert EmbeddingCacheCRUD(db=db).get_embeddings("model", embeddings) == embeddings
+
+
+def test_embeddings_stored_by_another_worker_are_kept(db):
+    crud = EmbeddingCacheCRUD(db=db)
+    crud.save_embeddings("model", {"shared": b"first", "other": b"other"})
+
+    # A second worker indexing an overlapping batch
+    crud.save_embeddings("model", {"shared": b"first", "new": b"new"})
+
+    assert crud.get_embeddings("model", ["shared", "other", "new"]) == {"shared": b"first", "other": b"other", "new": b"new"}
+    assert crud.get_embeddings("another model", ["shared"]) == {}
+
+
+def test_backend_without_document_embeddings_cannot_be_created():
+    class IncompleteBackend(EmbeddingBackend):
+        cache_key = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
@@ -0,0 +1,37 @@
+import time
+
+from app.core.config.llm.llm import LLMRegistry
+from app.services.suggestion import SuggestionService
+from app.services.summarization import SummarizationService
+
+REQUESTS = 20
+
+
+def test_services_share_the_clients_and_chains_of_the_registry():
+    registry = LLMRegistry()
+
+    first, second = SummarizationService(llm_registry=registry), SummarizationService(llm_registry=registry)
+
+    assert first.llm_service is second.llm_service
+    assert first.chain is second.chain
+    assert SuggestionService(llm_registry=registry).llm_service.llm is not None
+
+
+def _seconds_per_request(registry_of_request) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        SummarizationService(llm_registry=registry_of_request())
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def test_registry_against_per_request_construction():
+    shared = LLMRegistry()
+    shared.warm_up([0.3])
+
+    with_registry = _seconds_per_request(lambda: shared)
+    # What every request paid before: a new ChatGroq client and new chains
+    per_request = _seconds_per_request(LLMRegistry)
+
+    print(f"\nservice setup per request: {per_request * 1000:.2f} ms constructing the client, "
+          f"{with_registry * 1000:.3f} ms with the registry")
+    assert with_registry * 10 < per_request
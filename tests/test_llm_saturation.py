@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.core import security
+from app.core.config.llm.limiter import LLMConcurrencyLimiter
+from app.services import summarization
+from app.services.sentiment_worker import SentimentWorkerPool
+from tests.conftest import auth_headers, make_comment, make_post, run
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+MODEL_SECONDS = 0.5
+SUMMARIES = 8
+CRUD_REQUESTS = 30
+
+
+def test_crud_endpoints_stay_responsive_while_the_llm_is_saturated(db, author, monkeypatch):
+    from app.main import app
+
+    llm = FakeChatModel(respond=lambda prompt: json.dumps({"summary": "A summary."}), delay=MODEL_SECONDS)
+    registry = FakeLLMRegistry(llm)
+    monkeypatch.setattr(app.state, "llm_registry", registry, raising=False)
+    # Never started, as in the client fixture
+    workers = SentimentWorkerPool(workers=1, queue_size=10, batch_size=1, max_retries=0, retry_backoff=0, llm_registry=registry)
+    monkeypatch.setattr(app.state, "sentiment_workers", workers, raising=False)
+    # Two calls in flight, the other summaries queue for a slot
+    limiter = LLMConcurrencyLimiter(max_concurrency=2, queue_timeout=30)
+    monkeypatch.setattr(summarization, "llm_limiter", limiter)
+    security.principal_cache.clear()
+
+    posts = [make_post(db, author, content=f"Content of post {i}") for i in range(SUMMARIES)]
+    make_comment(db, posts[0], author)
+    post_urls = [f"/api/v1/posts/{post.id}" for post in posts]
+    headers = auth_headers(author)
+
+    async def load():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+            async def timed(request):
+                start = time.perf_counter()
+                response = await request
+                assert response.status_code == 200, response.text
+                return time.perf_counter() - start
+
+            summaries = [asyncio.create_task(timed(client.get(f"{url}/summarize"))) for url in post_urls]
+            while limiter.snapshot()["providers"].get("fake", {}).get("in_flight", 0) < 2:
+                await asyncio.sleep(0.01)
+
+            crud = []
+            # Async routes, and sync routes running in the threadpool
+            requests = [(post_urls[0], {}), ("/api/v1/posts/", {}), (f"{post_urls[0]}/comments", headers)]
+            for i in range(CRUD_REQUESTS):
+                url, request_headers = requests[i % 3]
+                crud.append(await timed(client.get(url, headers=request_headers)))
+            saturated = limiter.snapshot()["providers"]["fake"]
+            return crud, saturated, await asyncio.gather(*summaries)
+
+    crud, saturated, summaries = run(load())
+
+    print(f"\nslowest CRUD request: {max(crud) * 1000:.0f} ms while {saturated['in_flight']} LLM calls ran and "
+          f"{saturated['waiting']} waited, slowest summary: {max(summaries):.2f}s")
+    # The LLM was still busy when the CRUD requests were done
+    assert saturated["in_flight"] == 2 and saturated["waiting"] > 0
+    assert max(summaries) >= SUMMARIES / 2 * MODEL_SECONDS
+    assert max(crud) < MODEL_SECONDS / 2
+    assert llm.calls == SUMMARIES
+
+
+def test_cancelled_call_never_takes_a_slot():
+    limiter = LLMConcurrencyLimiter(max_concurrency=1, queue_timeout=30)
+    entered = []
+
+    async def call():
+        async with limiter.slot("fake"):
+            entered.append(True)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        holder = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        # The slot is given to the waiter just as it is cancelled
+        await holder
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.wait_for(call(), timeout=1)
+        return waiter.cancelled()
+
+    assert asyncio.run(main())
+    assert len(entered) == 2
+    assert limiter.snapshot()["providers"]["fake"] == {"in_flight": 0, "waiting": 0, "rejected": 0}
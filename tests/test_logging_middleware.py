@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config.logging_config import start_request_log_listener, stop_request_log_listener
+from app.middlewares.logging_middleware import LoggingMiddleware
+
+REQUESTS = 1000
+
+
+def _app(middleware: bool, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk {i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    if middleware:
+        app.add_middleware(LoggingMiddleware, **options)
+    return app
+
+
+async def _requests_per_second(app: FastAPI, count: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(100):
+            await client.get("/ping")
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get("/ping")
+        return count / (time.perf_counter() - start)
+
+
+def test_requests_per_second_with_the_middleware_on_and_off():
+    # Records go through the QueueHandler to the writer thread, as in the app
+    import app.main  # noqa: F401
+
+    # Keep the per-request logs of the client out of the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    start_request_log_listener()
+    try:
+        # Alternate the runs and keep the best of each, a busy machine slows down single runs
+        rounds = [
+            (asyncio.run(_requests_per_second(_app(middleware=False), REQUESTS)),
+             asyncio.run(_requests_per_second(_app(middleware=True), REQUESTS)))
+            for _ in range(3)
+        ]
+    finally:
+        stop_request_log_listener()
+    without = max(without for without, _ in rounds)
+    with_middleware = max(with_middleware for _, with_middleware in rounds)
+
+    print(f"\nrequests/sec without middleware: {without:.0f}, with middleware: {with_middleware:.0f} "
+          f"({with_middleware / without:.0%})")
+    assert with_middleware > 0.5 * without
+
+
+def test_streaming_responses_are_passed_through_chunk_by_chunk():
+    messages = []
+    received = []
+
+    async def receive():
+        if received:
+            # The client stays connected
+            await asyncio.Event().wait()
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/stream", "raw_path": b"/stream", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    asyncio.run(_app(middleware=True)(scope, receive, send))
+
+    start = messages[0]
+    bodies = [message["body"] for message in messages[1:] if message.get("body")]
+    assert (b"x-request-id", start["headers"][-1][1]) in start["headers"]
+    assert bodies == [b"chunk 0\n", b"chunk 1\n", b"chunk 2\n"]
+
+
+def test_sampled_body_is_capped():
+    records = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(json.loads(record.getMessage()))
+    logging.getLogger("request").addHandler(handler)
+
+    async def post():
+        app = _app(middleware=True, body_sample_rate=1.0, body_max_bytes=10)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/echo", content=b"x" * 100)
+
+    try:
+        response = asyncio.run(post())
+    finally:
+        logging.getLogger("request").removeHandler(handler)
+
+    # The app still receives the whole body
+    assert response.json() == {"size": 100}
+    assert records[-1]["body"] == "x" * 10
+    assert records[-1]["body_truncated"] is True
+    assert records[-1]["status_code"] == 200
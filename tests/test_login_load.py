@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import httpx
+
+from app.core import security
+from app.core.security import PasswordHasher, get_password_hash, verify_password
+from tests.conftest import run
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+LOGINS = 40
+
+
+def test_event_loop_stays_responsive_while_logins_saturate_the_hasher(db, author, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(app.state, "llm_registry", FakeLLMRegistry(FakeChatModel()), raising=False)
+    hasher = PasswordHasher(workers=2, max_pending=8)
+    monkeypatch.setattr(security, "password_hasher", hasher)
+    author.password = get_password_hash("secret")
+    db.commit()
+    form = {"username": author.email, "password": "secret"}
+    start = time.perf_counter()
+    verify_password("secret", author.password)
+    # What a probe would wait for if a login verified its password on the event loop
+    hash_seconds = time.perf_counter() - start
+
+    async def load():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+            logins = [asyncio.create_task(client.post("/api/v1/login/access-token", data=form)) for _ in range(LOGINS)]
+            probes = []
+            while not all(login.done() for login in logins):
+                start = time.perf_counter()
+                assert (await client.get("/")).status_code == 200
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+            return [login.result().status_code for login in logins], probes
+
+    statuses, probes = run(load())
+    hasher.shutdown()
+
+    probes.sort()
+    print(f"\n{LOGINS} concurrent logins: {statuses.count(200)} served, {statuses.count(503)} rejected; "
+          f"probes: median {probes[len(probes) // 2] * 1000:.0f} ms, slowest {probes[-1] * 1000:.0f} ms of {len(probes)}, "
+          f"one bcrypt verification: {hash_seconds * 1000:.0f} ms")
+    # The queue is bounded, the logins past it are turned away right away
+    assert statuses.count(200) == hasher.max_pending
+    assert statuses.count(503) == LOGINS - hasher.max_pending
+    assert len(probes) > 5
+    assert probes[len(probes) // 2] < hash_seconds / 10
+    assert probes[-1] < hash_seconds
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from app.services import post_indexing
+from app.services.question_answer import question_answer
+from tests.conftest import auth_headers, make_post
+from tests.fakes import FakeEmbeddingBackend, FakeEmbeddingService, FakeVectorStoreService
+
+
+@pytest.fixture
+def vector_store_service(monkeypatch):
+    service = FakeVectorStoreService(FakeEmbeddingService(FakeEmbeddingBackend(cache_key="chat")))
+    monkeypatch.setattr(question_answer, "get_vector_store_service", lambda: service)
+    monkeypatch.setattr(post_indexing, "get_vector_store_service", lambda: service)
+    return service
+
+
+def test_chat_searches_a_sync_only_vector_store(client, db, author, vector_store_service):
+    client.app.state.llm_registry.service.llm.respond = lambda prompt: "The post is about testing."
+    post = make_post(db, author, content="A post about writing tests for a FastAPI application.")
+
+    response = client.post(f"/api/v1/posts/{post.id}/chat", json={"question": "What is the post about?"}, headers=auth_headers(author))
+
+    assert response.status_code == 200, response.text
+    assert response.json()["answer"] == "The post is about testing."
+    assert vector_store_service.vector_store.searches == 1
+
+
+
+def test_chat_stream_searches_a_sync_only_vector_store(client, db, author, vector_store_service):
+    client.app.state.llm_registry.service.llm.respond = lambda prompt: "The post is about testing."
+    post = make_post(db, author, content="A post about writing tests for a FastAPI application.")
+
+    response = client.post(f"/api/v1/posts/{post.id}/chat/stream", json={"question": "What is the post about?"}, headers=auth_headers(author))
+
+    events = [block.splitlines() for block in response.text.strip().split("\n\n")]
+    names = [lines[0].removeprefix("event: ") for lines in events]
+    text = "".join(json.loads(lines[1].removeprefix("data: ")).get("text", "") for lines in events)
+    assert names[-1] == "done"
+    assert text == "The post is about testing."
+    assert vector_store_service.vector_store.searches == 1
@@ -0,0 +1,64 @@
+import pytest
+
+from app.models.post import Post
+from app.services import post_indexing
+from app.services.post_indexing import ensure_post_indexed
+from tests.conftest import make_post
+from tests.fakes import FakeEmbeddingBackend, FakeEmbeddingService, FakeVectorStoreService
+
+
+def _paragraph(number: int, edit: str = "") -> str:
+    # About 600 characters, every paragraph is a chunk of its own
+    return f"Paragraph {number}{edit}. " + " ".join(f"word{number}x{i}" for i in range(70))
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    backend = FakeEmbeddingBackend(cache_key="indexing")
+    service = FakeVectorStoreService(FakeEmbeddingService(backend))
+    monkeypatch.setattr(post_indexing, "get_vector_store_service", lambda: service)
+    return backend, service
+
+
+def _edit(db, post: Post, content: str):
+    post.content = content
+    db.commit()
+    return ensure_post_indexed(db, post)
+
+
+def test_editing_one_paragraph_re_embeds_only_its_chunk(db, author, embeddings):
+    backend, service = embeddings
+    paragraphs = [_paragraph(i) for i in range(5)]
+    post = make_post(db, author, content="\n\n".join(paragraphs))
+    assert ensure_post_indexed(db, post).chunk_count == 5
+    assert len(backend.embedded) == 5
+
+    paragraphs[2] = _paragraph(2, edit=" with a typo fixed")
+    status = _edit(db, post, "\n\n".join(paragraphs))
+
+    assert backend.embedded[5:] == [paragraphs[2]]
+    assert status.chunk_count == 5
+    assert service.vector_store.documents[service.chunk_id(str(post.id), 2)].page_content == paragraphs[2]
+
+
+def test_unchanged_content_is_not_embedded_again(db, author, embeddings):
+    backend, _ = embeddings
+    post = make_post(db, author, content="\n\n".join(_paragraph(i) for i in range(3)))
+    ensure_post_indexed(db, post)
+
+    ensure_post_indexed(db, post)
+
+    assert len(backend.embedded) == 3
+
+
+def test_chunks_past_the_end_of_a_shortened_post_are_deleted(db, author, embeddings):
+    backend, service = embeddings
+    paragraphs = [_paragraph(i) for i in range(5)]
+    post = make_post(db, author, content="\n\n".join(paragraphs))
+    ensure_post_indexed(db, post)
+
+    status = _edit(db, post, "\n\n".join(paragraphs[:3]))
+
+    assert len(backend.embedded) == 5
+    assert status.chunk_count == 3
+    assert sorted(service.vector_store.documents) == [service.chunk_id(str(post.id), i) for i in range(3)]
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.core.config.database.db import AsyncSessionLocal, engine
+from app.core.config.database.migrate import normalize_sqlite_timestamps
+from app.crud.post import AsyncPostCRUD, PostCRUD
+from app.models.post import PostStatus
+from tests.conftest import make_post, run
+
+
+def _walk(get_page, limit):
+    seen, cursor = [], None
+    while True:
+        posts, cursor = get_page(limit, cursor)
+        seen.extend(str(post.id) for post in posts)
+        if cursor is None:
+            return seen
+        assert len(seen) < 100, "pagination does not terminate"
+
+
+def _published_posts(db, author, count):
+    posts = [make_post(db, author, title=f"t{i}") for i in range(count)]
+    make_post(db, author, title="draft", status=PostStatus.DRAFT.value)
+    # Several posts within one timestamp, the id breaks the tie
+    tied = datetime(2025, 1, 1, 12, 0, 0)
+    for post in posts[2:5]:
+        post.created_at = tied
+    db.commit()
+    return posts
+
+
+def test_every_published_post_is_listed_exactly_once(db, author):
+    posts = _published_posts(db, author, 7)
+
+    seen = _walk(PostCRUD(db).get_posts, limit=3)
+
+    assert sorted(seen) == sorted(str(post.id) for post in posts)
+
+
+def test_async_pages_match_the_sync_pages(db, author):
+    _published_posts(db, author, 7)
+
+    async def walk():
+        async with AsyncSessionLocal() as session:
+            crud = AsyncPostCRUD(session)
+            seen, cursor = [], None
+            while True:
+                posts, cursor = await crud.get_posts(3, cursor)
+                seen.extend(str(post.id) for post in posts)
+                if cursor is None:
+                    return seen
+
+    assert run(walk()) == _walk(PostCRUD(db).get_posts, limit=3)
+
+
+def test_timestamps_stored_without_fraction_are_normalized(db, author):
+    posts = _published_posts(db, author, 7)
+    # Rows written by the former func.now() server default
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE posts SET created_at = substr(created_at, 1, 19)"))
+    with engine.begin() as connection:
+        normalize_sqlite_timestamps(connection)
+    db.expire_all()
+
+    seen = _walk(PostCRUD(db).get_posts, limit=3)
+
+    assert sorted(seen) == sorted(str(post.id) for post in posts)
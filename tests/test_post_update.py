@@ -0,0 +1,54 @@
+import uuid
+
+import pytest
+
+from app.core.cache import hash_text
+from app.core.config.llm.prompt_templates import SUMMARY_PROMPT_VERSION
+from app.crud.post_summary import PostSummaryCRUD
+from app.models.post import Post, PostStatus
+from app.models.user import User, UserRole
+from app.services import post_indexing
+from tests.conftest import auth_headers, make_post
+from tests.fakes import FakeEmbeddingBackend, FakeEmbeddingService, FakeVectorStoreService
+
+
+@pytest.fixture(autouse=True)
+def vector_store_service(monkeypatch):
+    service = FakeVectorStoreService(FakeEmbeddingService(FakeEmbeddingBackend()))
+    monkeypatch.setattr(post_indexing, "get_vector_store_service", lambda: service)
+    return service
+
+
+@pytest.fixture
+def other_author(db) -> User:
+    name = uuid.uuid4().hex[:12]
+    user = User(name=name, email=f"{name}@example.com", user_name=name, password="x", user_role=UserRole.AUTHOR)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_author_can_not_update_the_draft_of_another_author(client, db, author, other_author):
+    draft = make_post(db, author, content="My draft", status=PostStatus.DRAFT.value)
+    draft_id = str(draft.id)
+    PostSummaryCRUD(db=db).save_summary(draft_id, hash_text("My draft"), SUMMARY_PROMPT_VERSION, "A summary.")
+
+    response = client.put(f"/api/v1/posts/{draft_id}", json={"content": "Rewritten"}, headers=auth_headers(other_author))
+
+    assert response.status_code == 404
+    db.expire_all()
+    assert db.get(Post, draft_id).content == "My draft"
+    assert PostSummaryCRUD(db=db).get_summary(draft_id, hash_text("My draft"), SUMMARY_PROMPT_VERSION) == "A summary."
+
+
+def test_author_can_update_and_publish_their_draft(client, db, author):
+    draft = make_post(db, author, content="My draft", status=PostStatus.DRAFT.value)
+    draft_id = str(draft.id)
+
+    response = client.put(
+        f"/api/v1/posts/{draft_id}", json={"content": "My post", "status": PostStatus.PUBLISHED.value}, headers=auth_headers(author),
+    )
+
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    assert (db.get(Post, draft_id).content, db.get(Post, draft_id).status) == ("My post", PostStatus.PUBLISHED.value)
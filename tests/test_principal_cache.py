@@ -0,0 +1,31 @@
+from app.core import security
+
+
+def test_cached_principal_is_a_detached_copy(author):
+    security.cache_principal(author, security.principal_generation(author.id))
+
+    cached = security.get_cached_principal(author.id)
+
+    assert cached is not author
+    assert (cached.id, cached.email) == (author.id, author.email)
+    assert "password" not in cached.__dict__
+
+
+def test_load_racing_with_an_invalidation_is_not_cached(author):
+    generation = security.principal_generation(author.id)
+    # The user is updated while the request still loads the former row
+    security.invalidate_principal(author.id)
+    security.cache_principal(author, generation)
+
+    assert security.get_cached_principal(author.id) is None
+
+    security.cache_principal(author, security.principal_generation(author.id))
+    assert security.get_cached_principal(author.id) is not None
+
+
+def test_invalidation_drops_the_cached_principal(author):
+    security.cache_principal(author, security.principal_generation(author.id))
+
+    security.invalidate_principal(author.id)
+
+    assert security.get_cached_principal(author.id) is None
@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+
+from app.core.config.database.db import async_engine, engine
+from app.core.config.database.query_counter import QueryCounter
+from app.models.user import User
+from tests.conftest import auth_headers, make_comment, make_post
+
+
+@contextmanager
+def query_budget(sync: int, async_: int):
+    """
+    Fail when a request issues more statements than its budget on the sync or the async engine.
+    """
+    with QueryCounter(budget=sync, engine=engine), QueryCounter(budget=async_, engine=async_engine.sync_engine):
+        yield
+
+
+def _users(db, count):
+    users = [User(name=f"user{i}", email=f"user{i}@example.com", user_name=f"user{i}", password="x") for i in range(count)]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def test_list_posts_loads_all_authors_at_once(client, db):
+    for user in _users(db, 5):
+        make_post(db, user)
+
+    # The page, then the authors of the page
+    with query_budget(sync=0, async_=2):
+        response = client.get("/api/v1/posts/", params={"limit": 10})
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+
+
+def test_get_post_joins_the_author(client, db, author):
+    post = make_post(db, author)
+    url = f"/api/v1/posts/{post.id}"
+
+    with query_budget(sync=0, async_=1):
+        response = client.get(url)
+
+    assert response.status_code == 200
+
+
+def test_comment_tree_is_one_query_whatever_its_size(client, db, author):
+    post = make_post(db, author)
+    for user in _users(db, 5):
+        root = make_comment(db, post, user)
+        reply = make_comment(db, post, author, parent_comment_id=root.id)
+        make_comment(db, post, user, parent_comment_id=reply.id)
+    url, headers = f"/api/v1/posts/{post.id}/comments", auth_headers(author)
+
+    # The post, then the whole tree. The current user is loaded once, then served from the principal cache.
+    with query_budget(sync=2, async_=1):
+        response = client.get(url, headers=headers)
+    with query_budget(sync=2, async_=0):
+        client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
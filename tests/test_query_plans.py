@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from app.core.config.database.db import engine
+from app.crud.comment import CommentCRUD
+from app.crud.post import PostCRUD
+from app.models.comment import UnanalyzedCommentsPolicy
+from tests.conftest import make_comment, make_post
+
+
+@contextmanager
+def query_plans(plans: List[str]):
+    """
+    Collect the SQLite EXPLAIN QUERY PLAN of every statement the sync engine executes inside the block,
+    as run by the session, i.e. with the soft delete filter the partial indexes depend on.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append("\n".join(row[-1] for row in rows))
+
+
+def test_feed_pages_walk_the_partial_index(db, author):
+    for _ in range(3):
+        make_post(db, author)
+    _, cursor = PostCRUD(db).get_posts(limit=1)
+
+    plans = []
+    with query_plans(plans):
+        PostCRUD(db).get_posts(limit=1, cursor=cursor)
+
+    feed = plans[0]
+    assert "USING INDEX ix_posts_status_created_at_id" in feed
+    # The index already returns the rows in page order
+    assert "TEMP B-TREE" not in feed
+
+
+def test_comment_tree_uses_the_root_and_reply_indexes(db, author):
+    post = make_post(db, author)
+    root = make_comment(db, post, author)
+    make_comment(db, post, author, parent_comment_id=root.id)
+    post_id = str(post.id)
+
+    plans = []
+    with query_plans(plans):
+        CommentCRUD(db=db).get_post_comment_tree(post_id, limit=10, unanalyzed_policy=UnanalyzedCommentsPolicy.SHOW)
+
+    tree = plans[0]
+    assert "SEARCH comments USING INDEX ix_comments_post_roots (post_id=?)" in tree
+    assert "SEARCH reply USING INDEX ix_comments_parent_comment_id (parent_comment_id=?)" in tree
+    assert "SCAN comments" not in tree
+
+
+def test_unanalyzed_comments_use_their_partial_index(db, author):
+    post = make_post(db, author)
+    make_comment(db, post, author)
+
+    plans = []
+    with query_plans(plans):
+        CommentCRUD(db=db).get_unanalyzed_comment_ids(limit=10)
+
+    assert "ix_comments_not_analyzed_created_at" in plans[0]
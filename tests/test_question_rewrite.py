@@ -0,0 +1,83 @@
+import time
+
+from langchain.chains import create_history_aware_retriever
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from app.services.question_answer import question_answer
+from app.services.question_answer.question_answer import QuestionAnswerService
+from app.services.question_answer.rewrite import QuestionRewriter, is_standalone
+from tests.conftest import run
+from tests.fakes import FakeChatModel, FakeLLMService
+
+REWRITE_SECONDS = 0.2
+
+# Recorded questions of a few chat sessions, in order. A question asked twice in a row is a retry
+# after an interrupted stream, which leaves the history unchanged.
+TRACE = [
+    [
+        "What is the main argument of the post?",
+        "Which database does the author recommend for analytics workloads?",
+        "Why?",
+        "How does it compare to Postgres?",
+        "Why?",
+    ],
+    [
+        "Summarize the deployment section in two sentences",
+        "What are the listed prerequisites for the local setup?",
+        "What about Windows?",
+        "What about Windows?",
+        "Which Python version is required by the project?",
+    ],
+    [
+        "Who is the intended audience of this article?",
+        "Does the author explain the benchmark methodology in detail?",
+        "Can you give more details on that?",
+    ],
+]
+
+
+def test_follow_ups_are_detected():
+    assert is_standalone("Which database does the author recommend for analytics?")
+    assert not is_standalone("Why?")
+    assert not is_standalone("How does it compare to Postgres?")
+    assert not is_standalone("What about Windows support in the setup?")
+
+
+def _replay(retriever_chain) -> float:
+    async def replay():
+        for questions in TRACE:
+            history = []
+            for question, next_question in zip(questions, questions[1:] + [None]):
+                await retriever_chain.ainvoke({"input": question, "chat_history": history})
+                if next_question != question:
+                    history = history + [HumanMessage(question), AIMessage(f"Answer to: {question}")]
+
+    start = time.perf_counter()
+    run(replay())
+    return time.perf_counter() - start
+
+
+def test_replayed_trace_saves_llm_calls_and_latency(monkeypatch):
+    rewriter = QuestionRewriter(cache_size=100, ttl=60)
+    monkeypatch.setattr(question_answer, "question_rewriter", rewriter)
+    retriever = RunnableLambda(lambda query: [])
+    # Only the retriever chain is exercised, it needs the LLM and no vector store
+    service = QuestionAnswerService.__new__(QuestionAnswerService)
+
+    # langchain's chain, used before, rephrases every question asked with a history
+    always = FakeChatModel(respond=lambda prompt: "standalone question", delay=REWRITE_SECONDS)
+    always_seconds = _replay(create_history_aware_retriever(always, retriever, service.create_contextualize_q_prompt()))
+
+    skipping = FakeChatModel(respond=lambda prompt: "standalone question", delay=REWRITE_SECONDS)
+    service.llm_service = FakeLLMService(skipping)
+    skipping_seconds = _replay(service.create_history_aware_retriever(retriever))
+
+    snapshot = rewriter.snapshot()
+    print(f"\nrewrite LLM calls: {always.calls} -> {skipping.calls}, replay: {always_seconds:.2f}s -> {skipping_seconds:.2f}s, "
+          f"skipped: {snapshot['skipped']}")
+    assert always.calls == 10
+    assert skipping.calls == snapshot["rewrites"] == 5
+    assert snapshot["skipped"] == {"empty_history": 3, "standalone": 4, "cached": 1}
+    # Each of the 5 saved calls is a model round trip, leave some room for the scheduling noise
+    assert skipping_seconds < always_seconds - 3 * REWRITE_SECONDS
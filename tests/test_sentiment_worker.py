@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+import re
+import time
+
+from app.core.config.database.db import SessionLocal
+from app.crud.comment import CommentCRUD
+from app.models.comment import Comment, SentimentEnum
+from app.services.comment_analysis import CommentAnalysisService
+from app.services.sentiment_worker import SentimentWorkerPool
+from tests.conftest import auth_headers, make_comment, make_post
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+
+def _positive(prompt: str) -> str:
+    # Answers both the single comment and the batched prompt
+    ids = re.findall(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", prompt)
+    if ids:
+        return json.dumps([{"id": comment_id, "sentiment": "POSITIVE"} for comment_id in ids])
+    return json.dumps({"sentiment": "POSITIVE"})
+
+
+def _pool(llm, **kwargs) -> SentimentWorkerPool:
+    kwargs.setdefault("rescan_interval", 0.05)
+    return SentimentWorkerPool(
+        workers=2, queue_size=100, batch_size=5, max_retries=0, retry_backoff=0,
+        llm_registry=FakeLLMRegistry(llm), **kwargs,
+    )
+
+
+def _sentiments(comment_ids):
+    db = SessionLocal()
+    try:
+        return {str(comment.id): comment.sentiment for comment in db.query(Comment).filter(Comment.id.in_(comment_ids))}
+    finally:
+        db.close()
+
+
+def test_claimed_comments_are_skipped_until_the_lease_expires(db, author):
+    post = make_post(db, author)
+    comment_id = str(make_comment(db, post, author).id)
+    crud = CommentCRUD(db=db)
+
+    assert list(crud.claim_unanalyzed_comments([comment_id], "first", lease_seconds=60)) == [comment_id]
+    assert crud.claim_unanalyzed_comments([comment_id], "second", lease_seconds=60) == {}
+    assert crud.get_unanalyzed_comment_ids(limit=10) == []
+
+    # A worker dying mid-batch leaves its claim behind until the lease runs out
+    db.query(Comment).update({Comment.sentiment_claimed_until: datetime(2000, 1, 1)})
+    db.commit()
+    assert crud.get_unanalyzed_comment_ids(limit=10) == [comment_id]
+    assert list(crud.claim_unanalyzed_comments([comment_id], "third", lease_seconds=60)) == [comment_id]
+
+
+def test_each_comment_is_classified_once(db, author):
+    post = make_post(db, author)
+    comment_ids = [str(make_comment(db, post, author, content=f"comment {i}").id) for i in range(8)]
+    llm = FakeChatModel(respond=_positive)
+    pool = _pool(llm)
+
+    # Queued twice, as when the request and the rescan of another process race for the same comments
+    pool._process(comment_ids[:4])
+    pool._process(comment_ids[:4])
+    pool._process(comment_ids)
+
+    assert llm.calls == 2
+    assert set(_sentiments(comment_ids).values()) == {SentimentEnum.POSITIVE}
+
+
+def test_rescan_picks_up_comments_dropped_by_a_full_queue(db, author):
+    post = make_post(db, author)
+    comment_ids = [str(make_comment(db, post, author).id) for _ in range(3)]
+    llm = FakeChatModel(respond=_positive)
+    pool = _pool(llm)
+
+    pool.start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and SentimentEnum.NOT_ANALYZED in _sentiments(comment_ids).values():
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    assert set(_sentiments(comment_ids).values()) == {SentimentEnum.POSITIVE}
+
+
+def _p99(latencies) -> float:
+    return sorted(latencies)[int(len(latencies) * 0.99) - 1]
+
+
+def test_comment_create_latency_with_the_worker_pool(client, db, author):
+    post = make_post(db, author)
+    url, headers = f"/api/v1/posts/{post.id}/comments", auth_headers(author)
+    llm = FakeChatModel(respond=_positive, delay=0.1)
+    pool = _pool(llm)
+    client.app.state.sentiment_workers = pool
+    inline = CommentAnalysisService(llm_registry=FakeLLMRegistry(llm))
+
+    def timed(classify_inline: bool) -> float:
+        start = time.perf_counter()
+        response = client.post(url, json={"content": "Great post, thanks!"}, headers=headers)
+        if classify_inline:
+            # Before the pool, the request waited for the classification
+            inline.sentiment_analysis(response.json()["content"])
+        return time.perf_counter() - start
+
+    before = [timed(classify_inline=True) for _ in range(20)]
+    pool.start()
+    try:
+        after = [timed(classify_inline=False) for _ in range(100)]
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and CommentCRUD(db=db).get_unanalyzed_comment_ids(limit=200):
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    print(f"\ncomment create p99: {_p99(before) * 1000:.0f} ms classifying inline, {_p99(after) * 1000:.0f} ms with the worker pool")
+    assert _p99(before) >= llm.delay
+    assert _p99(after) < llm.delay / 2
+    # The comments are still classified, in the background
+    assert CommentCRUD(db=db).get_unanalyzed_comment_ids(limit=200) == []
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.core.config.database.db import AsyncSessionLocal, SessionLocal
+from app.core.config.llm.limiter import LLMConcurrencyLimiter
+from app.core.singleflight import AsyncSingleFlight, SingleFlight
+from app.models.post import Post
+from app.models.post_summary import PostSummary
+from app.services import summarization
+from app.services.post import aget_or_create_summary, get_or_create_summary
+from tests.conftest import make_post, run
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+CALLERS = 10
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_run_the_function_once():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    invocations = []
+
+    def work():
+        invocations.append(1)
+        release.wait()
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(single_flight.do("key", work))) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: single_flight.shared == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(invocations) == 1
+    assert results == ["result"] * CALLERS
+    assert single_flight.snapshot() == {"calls": 1, "shared": CALLERS - 1, "in_flight": 0}
+
+
+def test_waiting_callers_share_the_exception():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def work():
+        release.wait()
+        raise ValueError("failed")
+
+    errors = []
+
+    def call():
+        try:
+            single_flight.do("key", work)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: single_flight.shared == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3 and len({id(error) for error in errors}) == 1
+
+
+def test_concurrent_awaits_run_the_work_once_when_a_caller_is_cancelled():
+    single_flight = AsyncSingleFlight()
+    invocations = []
+
+    async def work():
+        invocations.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        callers = [asyncio.create_task(single_flight.do("key", work)) for _ in range(CALLERS)]
+        await asyncio.sleep(0.01)
+        # The leader gives up, the others keep waiting for the same work
+        callers[0].cancel()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert len(invocations) == 1
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ["result"] * (CALLERS - 1)
+    assert single_flight.snapshot() == {"calls": 1, "shared": CALLERS - 1, "in_flight": 0}
+
+
+def test_work_is_cancelled_once_every_caller_is():
+    single_flight = AsyncSingleFlight()
+    started, finished = [], []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "result"
+
+    async def main():
+        callers = [asyncio.create_task(single_flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.1)
+        # Nobody is waiting for the cancelled work, a new call starts it again
+        return await single_flight.do("key", work)
+
+    assert asyncio.run(main()) == "result"
+    assert (len(started), len(finished)) == (2, 1)
+
+
+@pytest.fixture
+def slow_summaries(monkeypatch):
+    llm = FakeChatModel(respond=lambda prompt: json.dumps({"summary": "A shared summary."}), delay=0.2)
+    monkeypatch.setattr(summarization, "llm_limiter", LLMConcurrencyLimiter(max_concurrency=8, queue_timeout=5))
+    return llm
+
+
+def _stored_summaries(db):
+    return dict(db.query(PostSummary.post_id, PostSummary.summary).all())
+
+
+def test_posts_with_the_same_content_share_one_call_and_store_their_summary(db, author, slow_summaries):
+    posts = [make_post(db, author, content="The same content") for _ in range(3)]
+    post_ids = [str(post.id) for post in posts]
+    registry = FakeLLMRegistry(slow_summaries)
+
+    def summarize(post_id):
+        session = SessionLocal()
+        try:
+            return get_or_create_summary(session, session.get(Post, post_id), registry)
+        finally:
+            session.close()
+
+    results = {}
+    threads = [threading.Thread(target=lambda post_id=post_id: results.update({post_id: summarize(post_id)})) for post_id in post_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert slow_summaries.calls == 1
+    assert set(results.values()) == {"A shared summary."}
+    assert {str(post_id) for post_id in _stored_summaries(db)} == set(post_ids)
+
+
+def test_async_posts_with_the_same_content_share_one_call_and_store_their_summary(db, author, slow_summaries):
+    posts = [make_post(db, author, content="The same content") for _ in range(3)]
+    post_ids = [post.id for post in posts]
+    registry = FakeLLMRegistry(slow_summaries)
+
+    async def summarize(post_id):
+        async with AsyncSessionLocal() as session:
+            return await aget_or_create_summary(session, await session.get(Post, post_id), registry)
+
+    async def main():
+        return await asyncio.gather(*(summarize(post_id) for post_id in post_ids))
+
+    assert run(main()) == ["A shared summary."] * 3
+    assert slow_summaries.calls == 1
+    assert {str(post_id) for post_id in _stored_summaries(db)} == {str(post_id) for post_id in post_ids}
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from app.core.config.config import settings
+from app.core.config.llm.limiter import LLMConcurrencyLimiter
+from app.exceptions.exceptions import ServiceBusyException
+from app.services import summarization
+from app.services.summarization import SummarizationService, estimate_tokens
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+MAX_CONCURRENCY = 3
+
+
+def _long_post(number: int) -> str:
+    paragraphs = [f"Paragraph {i} of post {number}. " + "Some words about the topic. " * 20 for i in range(60)]
+    return "\n\n".join(paragraphs)
+
+
+def test_map_reduce_calls_of_concurrent_long_posts_stay_within_the_limit(monkeypatch):
+    limiter = LLMConcurrencyLimiter(max_concurrency=MAX_CONCURRENCY, queue_timeout=30)
+    monkeypatch.setattr(summarization, "llm_limiter", limiter)
+    llm = FakeChatModel(respond=lambda prompt: json.dumps({"summary": "A summary."}), delay=0.01)
+    service = SummarizationService(llm_registry=FakeLLMRegistry(llm))
+    posts = [_long_post(number) for number in range(4)]
+    assert all(estimate_tokens(post) > settings.SUMMARY_LONG_POST_TOKENS for post in posts)
+
+    async def main():
+        summaries = [service.asummarize(post) for post in posts[:2]]
+
+        async def stream(post):
+            return "".join([part async for part in service.astream_summary(post)])
+
+        streams = [stream(post) for post in posts[2:]]
+        return await asyncio.gather(*summaries, *streams)
+
+    results = asyncio.run(main())
+
+    assert [result.summary for result in results[:2]] == ["A summary."] * 2
+    assert results[2:] == ["A summary."] * 2
+    # Map calls of several sections and the final summaries of other posts all ran
+    assert llm.calls > len(posts) * settings.SUMMARY_MAP_CONCURRENCY
+    # One slot per call: SUMMARY_MAP_CONCURRENCY calls of every post would have been in flight at once
+    assert llm.max_in_flight == MAX_CONCURRENCY
+
+
+def test_busy_limiter_is_not_reported_as_a_failed_summary(monkeypatch):
+    monkeypatch.setattr(summarization, "llm_limiter", LLMConcurrencyLimiter(max_concurrency=1, queue_timeout=0.01))
+    llm = FakeChatModel(respond=lambda prompt: json.dumps({"summary": "A summary."}), delay=0.2)
+    service = SummarizationService(llm_registry=FakeLLMRegistry(llm))
+
+    async def main():
+        return await asyncio.gather(service.asummarize("First post"), service.asummarize("Second post"), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert results[0].summary == "A summary."
+    assert isinstance(results[1], ServiceBusyException)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.cache import LRUCache, hash_text
+from app.core.config.config import settings
+from app.core.config.llm.limiter import LLMConcurrencyLimiter
+from app.exceptions.exceptions import SummarizationInvokeException
+from app.services import summarization
+from app.services.summarization import SummarizationService
+from tests.fakes import FakeChatModel, FakeLLMRegistry
+
+SECTIONS = 8
+
+
+def _paragraph(number: int, edit: str = "") -> str:
+    # About 600 characters, every paragraph is a section of its own
+    return f"Paragraph {number}{edit}. " + " ".join(f"word{number}x{i}" for i in range(70))
+
+
+class _Steps:
+    """
+    Answers the three summary prompts, recording which step every call was for.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt: str) -> str:
+        for step, tag in (("map", "<Section>"), ("reduce", "<Summaries>"), ("summary", "<Content>")):
+            if tag in prompt:
+                self.calls.append(step)
+                break
+        if step == "summary":
+            return json.dumps({"summary": "A summary."})
+        # 900 characters: the section summaries of the post only fit once combined by pairs
+        return f"[{hash_text(prompt)[:8]}] " + "s" * 889
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_LONG_POST_TOKENS", 1000)
+    monkeypatch.setattr(settings, "SUMMARY_REDUCE_FAN_IN", 2)
+    monkeypatch.setattr(summarization, "partial_summary_cache", LRUCache(maxsize=100))
+    monkeypatch.setattr(summarization, "llm_limiter", LLMConcurrencyLimiter(max_concurrency=8, queue_timeout=5))
+    return _Steps()
+
+
+def _summarize(steps: _Steps, content: str) -> list:
+    service = SummarizationService(llm_registry=FakeLLMRegistry(FakeChatModel(respond=steps)))
+    steps.calls = []
+    assert asyncio.run(service.asummarize(content)).summary == "A summary."
+    return sorted(steps.calls)
+
+
+def test_short_post_is_summarized_in_one_call(steps):
+    assert _summarize(steps, "\n\n".join(_paragraph(i) for i in range(2))) == ["summary"]
+
+
+def test_long_post_is_mapped_then_reduced_until_it_fits(steps):
+    calls = _summarize(steps, "\n\n".join(_paragraph(i) for i in range(SECTIONS)))
+
+    # Eight section summaries, combined by pairs into four that fit in the summary prompt
+    assert calls == ["map"] * SECTIONS + ["reduce"] * (SECTIONS // 2) + ["summary"]
+
+
+def test_editing_one_section_only_recomputes_its_branch(steps):
+    paragraphs = [_paragraph(i) for i in range(SECTIONS)]
+    _summarize(steps, "\n\n".join(paragraphs))
+
+    paragraphs[5] = _paragraph(5, edit=" with a typo fixed")
+    calls = _summarize(steps, "\n\n".join(paragraphs))
+
+    # The section, the pair it is combined in, and the final summary
+    assert calls == ["map", "reduce", "summary"]
+
+
+class _FailingSection(FakeChatModel):
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if any("Paragraph 0." in str(message.content) for message in messages):
+            raise ConnectionError("provider unavailable")
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def test_failed_section_cancels_the_other_calls_and_frees_their_slots(steps):
+    llm = _FailingSection(respond=steps, delay=5)
+    service = SummarizationService(llm_registry=FakeLLMRegistry(llm))
+
+    async def main():
+        with pytest.raises(SummarizationInvokeException):
+            await service.asummarize("\n\n".join(_paragraph(i) for i in range(SECTIONS)))
+        return llm.in_flight, summarization.llm_limiter.snapshot()["providers"]["fake"]["in_flight"]
+
+    assert asyncio.run(asyncio.wait_for(main(), timeout=2)) == (0, 0)
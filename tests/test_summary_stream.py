@@ -0,0 +1,43 @@
+import json
+
+from app.models.post_summary import PostSummary
+from tests.conftest import make_post
+
+
+def _events(response) -> list:
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _respond(client, respond):
+    client.app.state.llm_registry.service.llm.respond = respond
+
+
+def test_reply_without_a_summary_fails_the_stream_and_is_not_stored(client, db, author):
+    post = make_post(db, author)
+    url = f"/api/v1/posts/{post.id}"
+    _respond(client, lambda prompt: "Sorry, I can not summarize this post.")
+
+    events = _events(client.get(f"{url}/summarize/stream"))
+
+    assert [event for event, _ in events] == ["error"]
+    assert db.query(PostSummary).count() == 0
+
+    # The next request generates the summary instead of serving an empty one
+    _respond(client, lambda prompt: json.dumps({"summary": "A short summary."}))
+    assert client.get(f"{url}/summarize").json() == {"summary": "A short summary."}
+
+
+def test_streamed_summary_is_stored(client, db, author):
+    post = make_post(db, author)
+    url = f"/api/v1/posts/{post.id}"
+    _respond(client, lambda prompt: json.dumps({"summary": "A short summary."}))
+
+    events = _events(client.get(f"{url}/summarize/stream"))
+
+    assert "".join(data["text"] for event, data in events if event == "token") == "A short summary."
+    assert events[-1][0] == "done"
+    assert db.query(PostSummary.summary).scalar() == "A short summary."